@@ -0,0 +1,42 @@
+"""market_snapshot price column and market index for history reads
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("market_snapshot", sa.Column("price", sa.Float(), nullable=True))
+    op.create_index(
+        "ix_market_snapshot_market_captured",
+        "market_snapshot",
+        ["market", "captured_at"],
+    )
+    # Backfill from the JSON snapshot so history reads never parse JSON
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(
+            "UPDATE market_snapshot SET price = (snapshot::jsonb #>> '{outcomes,Yes}')::float "
+            "WHERE price IS NULL"
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            "UPDATE market_snapshot SET price = json_extract(snapshot, '$.outcomes.Yes') "
+            "WHERE price IS NULL"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_market_snapshot_market_captured", table_name="market_snapshot")
+    op.drop_column("market_snapshot", "price")
@@ -0,0 +1,54 @@
+"""market_price_rollup table and BRIN indexes for time-ordered history tables
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Append-only tables whose physical order follows the timestamp; a BRIN index
+# is a few pages per table and keeps retention deletes and range scans cheap.
+_TIME_INDEXES = (
+    ("ix_market_snapshot_captured", "market_snapshot", "captured_at"),
+    ("ix_odds_log_created", "odds_log", "created_at"),
+    ("ix_api_call_log_created", "api_call_log", "created_at"),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "market_price_rollup",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("source", sa.String(length=50), nullable=False),
+        sa.Column("market", sa.String(length=100), nullable=False),
+        sa.Column("resolution", sa.String(length=8), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("open", sa.Float(), nullable=False),
+        sa.Column("high", sa.Float(), nullable=False),
+        sa.Column("low", sa.Float(), nullable=False),
+        sa.Column("close", sa.Float(), nullable=False),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.UniqueConstraint(
+            "market", "resolution", "bucket_start", "source", name="uq_market_price_rollup_bucket"
+        ),
+    )
+
+    # BRIN on Postgres; other dialects ignore postgresql_using and build a
+    # plain index, which still serves the retention range deletes
+    for name, table, column in _TIME_INDEXES:
+        op.create_index(name, table, [column], postgresql_using="brin")
+
+
+def downgrade() -> None:
+    for name, table, _column in _TIME_INDEXES:
+        op.drop_index(name, table_name=table)
+    op.drop_table("market_price_rollup")
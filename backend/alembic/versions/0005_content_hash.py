@@ -0,0 +1,27 @@
+"""content_hash on market_snapshot and odds_log for change-only history writes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows keep NULL; the writer only compares hashes in memory
+    op.add_column("market_snapshot", sa.Column("content_hash", sa.String(length=32), nullable=True))
+    op.add_column("odds_log", sa.Column("content_hash", sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("odds_log", "content_hash")
+    op.drop_column("market_snapshot", "content_hash")
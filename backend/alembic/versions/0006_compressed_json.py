@@ -0,0 +1,110 @@
+"""binary CompressedJSON storage for history JSON columns, compression_dictionary table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    ("market_snapshot", "snapshot"),
+    ("odds_log", "raw_odds"),
+    ("odds_log", "normalized"),
+    ("api_call_log", "meta"),
+)
+_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.create_table(
+        "compression_dictionary",
+        sa.Column("dict_id", sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column("trained_on", sa.String(length=100), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+    )
+    # Existing JSON text becomes its UTF-8 bytes, which CompressedJSON reads as
+    # legacy plain JSON; `python -m app.db.compression recompress` re-encodes later
+    dialect = op.get_bind().dialect.name
+    for table, column in _COLUMNS:
+        if dialect == "postgresql":
+            op.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE bytea "
+                f"USING convert_to({column}::text, 'UTF8')"
+            )
+        elif dialect == "sqlite":
+            # Column types are advisory in SQLite; only the stored values change
+            op.execute(
+                f"UPDATE {table} SET {column} = CAST({column} AS BLOB) "
+                f"WHERE typeof({column}) = 'text'"
+            )
+        else:
+            op.alter_column(table, column, type_=sa.LargeBinary())
+
+
+def downgrade() -> None:
+    from app.db.compression import load_dictionaries
+    from app.db.types import JSONCompressor
+    from app.utils.json_codec import dumps
+
+    bind = op.get_bind()
+    compressor = JSONCompressor(enabled=False)
+    load_dictionaries(bind, compressor)
+    for table, column in _COLUMNS:
+        t = sa.table(table, sa.column("id", sa.Integer()), sa.column(column, sa.LargeBinary()))
+        # Rewrite every value as untagged UTF-8 JSON bytes, in id-keyset batches and
+        # bound as binary, so the type change below is a plain byte-to-text conversion
+        stmt = (
+            sa.update(t)
+            .where(t.c.id == sa.bindparam("row_id"))
+            .values({column: sa.bindparam("plain", type_=sa.LargeBinary())})
+        )
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(t.c.id, t.c[column])
+                .where(t.c.id > last_id, t.c[column].is_not(None))
+                .order_by(t.c.id)
+                .limit(_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            updates = [
+                {"row_id": row_id, "plain": dumps(compressor.decode(_as_bytes(raw)))}
+                for row_id, raw in rows
+            ]
+            bind.execute(stmt, updates)
+        if bind.dialect.name == "postgresql":
+            op.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE json "
+                f"USING convert_from({column}, 'UTF8')::json"
+            )
+        elif bind.dialect.name == "sqlite":
+            op.execute(
+                f"UPDATE {table} SET {column} = CAST({column} AS TEXT) "
+                f"WHERE typeof({column}) = 'blob'"
+            )
+        else:
+            op.alter_column(table, column, type_=sa.JSON())
+    op.drop_table("compression_dictionary")
+
+
+def _as_bytes(raw: object) -> bytes:
+    # SQLite may still hold legacy rows as TEXT
+    return raw.encode() if isinstance(raw, str) else bytes(raw)  # type: ignore[arg-type]
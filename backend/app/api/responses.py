@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Any, List
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.json_codec import dumps, loads
+
+_PRETTY_VALUES = {b"1", b"true", b"yes", b"on"}
+
+
+class FastJSONResponse(JSONResponse):
+    """Compact JSON rendering (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _wants_pretty(query_string: bytes) -> bool:
+    if b"pretty" not in query_string:
+        return False
+    for pair in query_string.split(b"&"):
+        key, _, value = pair.partition(b"=")
+        if key == b"pretty":
+            return value.lower() in _PRETTY_VALUES
+    return False
+
+
+class PrettyJSONMiddleware:
+    """Re-indent JSON bodies when the request opts in with ``?pretty=true``.
+
+    Requests without the parameter pass straight through, so the default path
+    pays only a substring check on the query string.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _wants_pretty(scope.get("query_string", b"")):
+            await self.app(scope, receive, send)
+            return
+
+        start: List[Message] = []
+        chunks: List[bytes] = []
+        is_json = False
+
+        async def buffered_send(message: Message) -> None:
+            nonlocal is_json
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers") or [])
+                is_json = headers.get(b"content-type", b"").startswith(b"application/json")
+                if not is_json:
+                    await send(message)
+                else:
+                    start.append(message)
+                return
+            if message["type"] != "http.response.body" or not is_json:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            try:
+                body = dumps(loads(body), pretty=True)
+            except ValueError:
+                pass
+            headers = [(k, v) for k, v in start[0].get("headers") or [] if k != b"content-length"]
+            headers.append((b"content-length", str(len(body)).encode("latin-1")))
+            await send({**start[0], "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, buffered_send)
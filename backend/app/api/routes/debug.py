@@ -1,24 +1,51 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Any, Dict
 
+from app.services import odds_api as odds_api_mod
+from app.services._cache import cache_stats
 from app.services.opportunities import OpportunityEngine
+from app.services.refresher import snapshot_for
 
 router = APIRouter()
 
 
 @router.get("/api/debug/opportunity/{opportunity_id}")
-async def debug_opportunity(opportunity_id: str) -> Dict[str, Any]:
-    eng = OpportunityEngine()
-    items = await eng.fetch_opportunities()
+async def debug_opportunity(opportunity_id: str, request: Request) -> Dict[str, Any]:
+    snap = await snapshot_for(request.app)
+    if snap is not None:
+        items = snap.select(include_non_sports=True)
+    else:
+        eng = OpportunityEngine()
+        items = await eng.fetch_opportunities()
     found = next((o for o in items if o.id == opportunity_id), None)
     if not found:
         raise HTTPException(status_code=404, detail="Opportunity not found")
 
     trace: Dict[str, Any] = found.model_dump()
     # Note: In this v1, we include compact provenance if present.
-    trace.setdefault("trace_info", {
-        "note": "Detailed intermediate sportsbook/PM inputs can be expanded in a later iteration.",
-    })
+    trace.setdefault(
+        "trace_info",
+        {
+            "note": (
+                "Detailed intermediate sportsbook/PM inputs can be expanded in a later iteration."
+            ),
+        },
+    )
     return trace
+
+
+@router.get("/api/debug/cache")
+async def debug_cache() -> Dict[str, Any]:
+    # Per-worker counters; hits on the odds_api namespace are Odds API credits saved
+    return {"stats": cache_stats(), "odds_api_quota": odds_api_mod.quota.as_dict()}
+
+
+@router.get("/api/debug/calls")
+async def debug_calls(request: Request, limit: int = Query(100, ge=1, le=1000)) -> Dict[str, Any]:
+    # Recent upstream attempts from this worker's ring buffer, newest last
+    recorder = getattr(request.app.state, "call_log", None)
+    if recorder is None:
+        return {"summary": {}, "calls": []}
+    return {"summary": recorder.summary(), "calls": recorder.recent_calls(limit)}
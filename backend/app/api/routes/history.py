@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.services import price_history
+
+router = APIRouter()
+
+
+@router.get("/api/history/{market_id}")
+async def get_market_history(
+    market_id: str,
+    interval: Literal["1m", "5m", "1h", "raw"] = Query("5m"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(500, ge=1, le=5000),
+    source: str = Query("polymarket"),
+    db: AsyncSession = Depends(get_db),
+) -> Dict[str, Any]:
+    """Price series of one market, bucketed to OHLC in SQL (or raw captures).
+
+    Snapshots are stored only when the price changes (plus periodic
+    keyframes), so buckets without a change are absent rather than filled.
+    """
+    try:
+        if interval == price_history.RAW:
+            after = price_history.parse_raw_cursor(cursor) if cursor else None
+        else:
+            # Bucket pages resume at the next bucket boundary
+            page_start = price_history.parse_ohlc_cursor(cursor) if cursor else start
+    except (ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if interval == price_history.RAW:
+        stmt = price_history.raw_query(
+            market_id, source=source, start=start, end=end, after=after, limit=limit
+        )
+        points, next_cursor = price_history.raw_page((await db.execute(stmt)).all(), limit)
+    else:
+        points, next_cursor = await _ohlc_page(
+            db, market_id, interval, source, page_start, end, limit
+        )
+    return {
+        "market_id": market_id,
+        "source": source,
+        "interval": interval,
+        "points": points,
+        "next_cursor": next_cursor,
+    }
+
+
+async def _ohlc_page(
+    db: AsyncSession,
+    market_id: str,
+    interval: str,
+    source: str,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    limit: int,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    # Anchor the page at its first capture so the window scan covers at most
+    # limit + 1 buckets, then probe for the capture that starts the next page
+    first = (
+        await db.execute(
+            price_history.first_capture_query(market_id, source=source, start=start, end=end)
+        )
+    ).scalar_one_or_none()
+    if first is None:
+        return [], None
+    scan_end = price_history.ohlc_scan_end(first, interval, limit, end)
+    stmt = price_history.ohlc_query(
+        market_id, interval, source=source, start=start, end=scan_end, limit=limit
+    )
+    rows = (await db.execute(stmt)).all()
+    next_start = None
+    if len(rows) <= limit:
+        next_start = (
+            await db.execute(
+                price_history.first_capture_query(market_id, source=source, start=scan_end, end=end)
+            )
+        ).scalar_one_or_none()
+    return price_history.ohlc_page(rows, interval, limit, next_start)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import List
+
+from fastapi import APIRouter, Response
+
+from app.services import odds_api as odds_api_mod
+from app.services._cache import cache_stats
+from app.services._metrics import Counter, Gauge, Metric, render_metrics
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _state_metrics() -> List[Metric]:
+    # Built per scrape from the counters the services already keep
+    cache = Counter(
+        "upstream_cache_events_total", "Upstream response cache events.", ("namespace", "event")
+    )
+    for namespace, stats in cache_stats().items():
+        for event, value in stats.items():
+            cache.inc(namespace, event, amount=value)
+    quota = Gauge("odds_api_requests_remaining", "Odds API credits left, as last reported.")
+    if odds_api_mod.quota.remaining is not None:
+        quota.set(odds_api_mod.quota.remaining)
+    return [cache, quota]
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    # Per-worker values; with several gunicorn workers each scrape sees one of them
+    return Response(content=render_metrics(_state_metrics()), media_type=CONTENT_TYPE)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request, Response
 from typing import List, Dict, Any
 from datetime import datetime, timezone
 
@@ -8,56 +8,57 @@ from app.schemas.opportunity import Opportunity
 from app.services.opportunities import OpportunityEngine
 from app.core.config import settings
 from app.services.polymarket import PolymarketService
+from app.services.refresher import is_stale, snapshot_for
+from app.utils.json_codec import dumps
 
 router = APIRouter()
 
 
 @router.get("/api/opportunities", response_model=List[Opportunity])
-async def get_opportunities(include_non_sports: bool = Query(False)) -> List[Opportunity]:
+async def get_opportunities(
+    request: Request, include_non_sports: bool = Query(False)
+) -> List[Opportunity]:
+    as_of = datetime.now(timezone.utc)
+    threshold_seconds = int(settings.refresh_interval_seconds)
+    snap = await snapshot_for(request.app)
+    if snap is not None:
+        # Pre-serialized body; skips per-request validation and encoding
+        body = snap.render_items(include_non_sports, as_of, threshold_seconds)
+        return Response(content=body, media_type="application/json")  # type: ignore[return-value]
+
     eng = OpportunityEngine()
     try:
-        items: List[Opportunity] = await eng.fetch_opportunities(include_non_sports=include_non_sports)
+        items = await eng.fetch_opportunities(include_non_sports=include_non_sports)
     except TypeError:
         # Backward-compat for test fakes without the kwarg
         items = await eng.fetch_opportunities()  # type: ignore[misc]
 
     # Compute staleness per item (additive field) without changing top-level shape
-    as_of = datetime.now(timezone.utc)
-    threshold_seconds = int(settings.refresh_interval_seconds)
+    out: List[Opportunity] = []
     for o in items:
-        is_stale = False
-        try:
-            if o.updated_at:
-                updated = datetime.fromisoformat(o.updated_at)
-                age = (as_of - updated).total_seconds()
-                is_stale = age > threshold_seconds
-        except Exception:
-            is_stale = True
-        # set attribute on model instance
-        o.is_stale = is_stale  # type: ignore[attr-defined]
-    return items
+        stale = is_stale(o.updated_at, as_of, threshold_seconds)
+        out.append(o.model_copy(update={"is_stale": stale}))
+    return out
 
 
 @router.get("/api/opportunities/meta")
-async def get_opportunities_with_meta() -> Dict[str, Any]:
-    eng = OpportunityEngine()
-    items: List[Opportunity] = await eng.fetch_opportunities()
-
+async def get_opportunities_with_meta(request: Request) -> Dict[str, Any]:
     as_of = datetime.now(timezone.utc)
     threshold_seconds = int(settings.refresh_interval_seconds)
+    snap = await snapshot_for(request.app)
+    if snap is not None:
+        head = dumps({"as_of": as_of.isoformat(), "staleness_seconds": threshold_seconds})
+        items_body = snap.render_items(False, as_of, threshold_seconds)
+        body = head[:-1] + b',"items":' + items_body + b"}"
+        return Response(content=body, media_type="application/json")  # type: ignore[return-value]
+
+    eng = OpportunityEngine()
+    items = await eng.fetch_opportunities()
 
     enriched: List[Dict[str, Any]] = []
     for o in items:
-        is_stale = False
-        try:
-            if o.updated_at:
-                updated = datetime.fromisoformat(o.updated_at)
-                age = (as_of - updated).total_seconds()
-                is_stale = age > threshold_seconds
-        except Exception:
-            is_stale = True
         od = o.model_dump()
-        od["is_stale"] = is_stale
+        od["is_stale"] = is_stale(o.updated_at, as_of, threshold_seconds)
         enriched.append(od)
 
     return {
@@ -67,11 +68,35 @@ async def get_opportunities_with_meta() -> Dict[str, Any]:
     }
 
 
+@router.get("/api/opportunities/changes")
+async def get_opportunity_changes(request: Request, since: int = Query(0, ge=0)) -> Dict[str, Any]:
+    """Incremental feed: what each refresh added, updated or removed after ``since``."""
+    snap = await snapshot_for(request.app)
+    if snap is None:
+        return {"version": 0, "reset": True, "changes": []}
+    reset, changes = request.app.state.refresher.changes_since(since)
+    return {
+        "version": snap.version,
+        "reset": reset,
+        "changes": [
+            {
+                "version": version,
+                "as_of": as_of.isoformat(),
+                "added": [o.model_dump() for o in delta.added],
+                "updated": [o.model_dump() for o in delta.updated],
+                "removed": delta.removed,
+            }
+            for version, as_of, delta in changes
+            if delta.changed
+        ],
+    }
+
+
 @router.get("/api/raw/polymarket")
 async def get_raw_polymarket() -> Dict[str, Any]:
     svc = PolymarketService()
     try:
-        raw_markets = await svc.fetch_markets_paginated()
+        raw_markets = await svc.fetch_markets_paginated(project=False)
     finally:
         await svc.close()
     return {"count": len(raw_markets), "markets": raw_markets}
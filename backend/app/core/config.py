@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,6 +14,16 @@ class Settings(BaseSettings):
     app_name: str = Field(default="Polymarket Edge API", description="Application name")
     # Default for local dev (run from backend/) writes under repo data/
     database_url: str = Field(default="sqlite:///../data/dev.db", alias="DATABASE_URL")
+    # Connection pool (Postgres; SQLite uses SQLAlchemy's per-file defaults)
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE", ge=1)
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW", ge=0)
+    db_pool_timeout_seconds: float = Field(
+        default=10.0,
+        alias="DB_POOL_TIMEOUT_SECONDS",
+        gt=0.0,
+        description="Wait for a pooled connection (also SQLite's busy timeout).",
+    )
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS", ge=-1)
 
     # External keys
     odds_api_key: str | None = Field(default=None, alias="ODDS_API_KEY")
@@ -22,6 +34,141 @@ class Settings(BaseSettings):
     refresh_interval_seconds: int = Field(
         default=600, alias="REFRESH_INTERVAL_SECONDS", ge=60, le=3600
     )
+    refresh_enabled: bool = Field(
+        default=True,
+        alias="REFRESH_ENABLED",
+        description="Run the opportunity pipeline in the background and serve its snapshot.",
+    )
+    refresh_change_history: int = Field(
+        default=50,
+        alias="REFRESH_CHANGE_HISTORY",
+        ge=1,
+        description="Number of refresh deltas kept for /api/opportunities/changes.",
+    )
+    refresh_startup_wait_seconds: float = Field(
+        default=30.0,
+        alias="REFRESH_STARTUP_WAIT_SECONDS",
+        ge=0.0,
+        description="How long a request waits for the first snapshot before computing inline.",
+    )
+
+    # History persistence (market_snapshot / odds_log)
+    history_enabled: bool = Field(
+        default=False,
+        alias="HISTORY_ENABLED",
+        description="Write each refresh's Polymarket markets and book lines to the database.",
+    )
+    history_batch_size: int = Field(default=1000, alias="HISTORY_BATCH_SIZE", ge=1)
+    history_flush_interval_seconds: float = Field(
+        default=5.0, alias="HISTORY_FLUSH_INTERVAL_SECONDS", gt=0.0
+    )
+    history_keyframe_seconds: float = Field(
+        default=1800.0,
+        alias="HISTORY_KEYFRAME_SECONDS",
+        ge=0.0,
+        description="Rewrite unchanged markets/lines this often; 0 stores every refresh.",
+    )
+
+    # Encoding of JSON history columns (market_snapshot, odds_log, api_call_log)
+    json_compression: Literal["none", "zstd"] = Field(
+        default="none",
+        alias="JSON_COMPRESSION",
+        description="zstd compresses new rows (needs the zstandard package); reads handle both.",
+    )
+    json_compression_level: int = Field(default=3, alias="JSON_COMPRESSION_LEVEL", ge=1, le=22)
+
+    # Retention: hourly/daily price rollups, then batched deletes of old rows
+    retention_enabled: bool = Field(
+        default=False,
+        alias="RETENTION_ENABLED",
+        description="Run the rollup and retention job in the background.",
+    )
+    retention_interval_seconds: float = Field(
+        default=3600.0, alias="RETENTION_INTERVAL_SECONDS", gt=0.0
+    )
+    retention_raw_days: int = Field(
+        default=14,
+        alias="RETENTION_RAW_DAYS",
+        ge=1,
+        description="Keep raw market_snapshot and odds_log rows this long.",
+    )
+    retention_call_log_days: int = Field(default=30, alias="RETENTION_CALL_LOG_DAYS", ge=1)
+    retention_hourly_days: int = Field(
+        default=90,
+        alias="RETENTION_HOURLY_DAYS",
+        ge=1,
+        description="Keep hourly rollups this long; daily rollups are kept indefinitely.",
+    )
+    retention_batch_size: int = Field(default=5000, alias="RETENTION_BATCH_SIZE", ge=1)
+    retention_rollup_max_buckets: int = Field(
+        default=168,
+        alias="RETENTION_ROLLUP_MAX_BUCKETS",
+        ge=1,
+        description="Buckets aggregated per rollup transaction; a backlog is worked off in steps.",
+    )
+    retention_rollup_grace_seconds: float = Field(
+        default=600.0,
+        alias="RETENTION_ROLLUP_GRACE_SECONDS",
+        ge=0.0,
+        description=(
+            "Roll a bucket up only this long after it ends, so late history flushes land first; "
+            "keep well above HISTORY_FLUSH_INTERVAL_SECONDS."
+        ),
+    )
+
+    # Upstream call log (api_call_log)
+    api_call_log_enabled: bool = Field(
+        default=False,
+        alias="API_CALL_LOG_ENABLED",
+        description="Persist every upstream HTTP attempt; recent calls are always kept in memory.",
+    )
+    api_call_log_ring_size: int = Field(default=1000, alias="API_CALL_LOG_RING_SIZE", ge=1)
+
+    # Upstream response cache
+    cache_backend: str = Field(
+        default="memory",
+        alias="CACHE_BACKEND",
+        description="memory (per worker) or sqlite (shared by all workers on the host).",
+    )
+    cache_path: str = Field(default="../data/cache.db", alias="CACHE_PATH")
+
+    # Shared upstream HTTP clients
+    http_max_connections: int = Field(default=20, alias="HTTP_MAX_CONNECTIONS", ge=1)
+    http_max_keepalive_connections: int = Field(
+        default=10, alias="HTTP_MAX_KEEPALIVE_CONNECTIONS", ge=0
+    )
+    http_keepalive_expiry: float = Field(default=60.0, alias="HTTP_KEEPALIVE_EXPIRY", ge=0.0)
+    http2_enabled: bool = Field(
+        default=True,
+        alias="HTTP2_ENABLED",
+        description="Negotiate HTTP/2 with upstreams when the h2 package is installed.",
+    )
+    http_host_max_connections: str = Field(
+        default="",
+        alias="HTTP_HOST_MAX_CONNECTIONS",
+        description="Comma-separated host=max overrides, e.g. api.the-odds-api.com=4.",
+    )
+
+    # Instrumentation
+    metrics_enabled: bool = Field(
+        default=True,
+        alias="METRICS_ENABLED",
+        description="Record per-stage and upstream timings exposed on /metrics.",
+    )
+
+    # Offline replay of recorded upstream responses
+    replay_dir: str = Field(
+        default="",
+        alias="REPLAY_DIR",
+        description="Serve Polymarket/Odds API calls from recordings in this directory.",
+    )
+    replay_speed: float = Field(
+        default=1.0,
+        alias="REPLAY_SPEED",
+        ge=0.0,
+        description="Divides recorded latency; 0 replays without any delay.",
+    )
+    replay_latency_ms: float = Field(default=0.0, alias="REPLAY_LATENCY_MS", ge=0.0)
 
     # Sports taxonomy
     supported_sports_allowlist: str = Field(
@@ -35,6 +182,15 @@ class Settings(BaseSettings):
         default="https://gamma-api.polymarket.com",
         alias="POLYMARKET_BASE_URL",
     )
+    polymarket_max_pages: int = Field(
+        default=40,
+        alias="POLYMARKET_MAX_PAGES",
+        ge=1,
+        description="Upper bound on /markets pages (500 markets each) per refresh.",
+    )
+    polymarket_page_concurrency: int = Field(
+        default=4, alias="POLYMARKET_PAGE_CONCURRENCY", ge=1, le=32
+    )
 
     # The Odds API
     odds_api_base_url: str = Field(
@@ -47,6 +203,30 @@ class Settings(BaseSettings):
         default="",
         alias="ODDS_API_BOOKMAKERS",
     )
+    odds_vig_method: Literal["multiplicative", "power", "shin"] = Field(
+        default="multiplicative",
+        alias="ODDS_VIG_METHOD",
+        description="How sportsbook margin is removed from H2H prices.",
+    )
+    odds_api_concurrency: int = Field(default=4, alias="ODDS_API_CONCURRENCY", ge=1, le=32)
+    odds_api_quota_low: int = Field(
+        default=100,
+        alias="ODDS_API_QUOTA_LOW",
+        ge=0,
+        description="Below this many remaining credits, sport fetches run one at a time.",
+    )
+    odds_api_quota_floor: int = Field(
+        default=10,
+        alias="ODDS_API_QUOTA_FLOOR",
+        ge=0,
+        description="At or below this many remaining credits, skip sportsbook fetches.",
+    )
+    odds_api_quota_recheck_seconds: float = Field(
+        default=3600.0,
+        alias="ODDS_API_QUOTA_RECHECK_SECONDS",
+        gt=0,
+        description="After this long without a fresh balance, one probe request re-reads it.",
+    )
 
     # DataGolf
     datagolf_base_url: str = Field(
@@ -0,0 +1,183 @@
+"""Dictionary management and backfill for CompressedJSON columns.
+
+python -m app.db.compression train market_snapshot snapshot
+python -m app.db.compression recompress market_snapshot snapshot
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import LargeBinary, Table, bindparam, select, type_coerce, update
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.base import Base
+from app.db.models import CompressionDictionary
+from app.db.types import MIN_COMPRESS_BYTES, PLAIN, ZSTD, JSONCompressor, codec, zstd
+from app.utils.json_codec import dumps
+
+# Every CompressedJSON column, as (table, column)
+COMPRESSED_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("market_snapshot", "snapshot"),
+    ("odds_log", "raw_odds"),
+    ("odds_log", "normalized"),
+    ("api_call_log", "meta"),
+)
+
+
+def _table(name: str) -> Table:
+    return Base.metadata.tables[name]
+
+
+def load_dictionaries(conn: Connection, compressor: JSONCompressor = codec) -> int:
+    """Load stored dictionaries; the newest becomes the one used for writes."""
+    if zstd is None:
+        return 0
+    d = CompressionDictionary.__table__.c
+    rows = conn.execute(select(d.data).order_by(d.created_at, d.dict_id)).all()
+    for (data,) in rows:
+        compressor.add_dictionary(bytes(data))
+    return len(rows)
+
+
+def train_dictionary(
+    conn: Connection,
+    table_name: str,
+    column: str,
+    *,
+    samples: int = 5000,
+    dict_size: int = 16 * 1024,
+    compressor: JSONCompressor = codec,
+) -> int:
+    """Train a dictionary on the newest ``samples`` values of a column and store it."""
+    if zstd is None:
+        raise RuntimeError("zstandard is not installed")
+    table = _table(table_name)
+    col = table.c[column]
+    values = conn.execute(
+        select(col).where(col.is_not(None)).order_by(table.c.id.desc()).limit(samples)
+    ).scalars()
+    payloads: List[bytes] = [dumps(v) for v in values]
+    if len(payloads) < 10:
+        raise ValueError(f"Not enough rows in {table_name}.{column} to train a dictionary")
+    trained = zstd.train_dictionary(dict_size, payloads)
+    data = trained.as_bytes()
+    conn.execute(
+        CompressionDictionary.__table__.insert().values(
+            dict_id=trained.dict_id(),
+            trained_on=f"{table_name}.{column}"[:100],
+            sample_count=len(payloads),
+            data=data,
+        )
+    )
+    return compressor.add_dictionary(data)
+
+
+def _needs_rewrite(raw: bytes, compressor: JSONCompressor) -> bool:
+    """Whether ``raw`` differs from the encoding ``compressor.encode`` would produce."""
+    head = raw[:1]
+    if not compressor.enabled:
+        return head != PLAIN
+    if head == PLAIN:
+        # encode keeps payloads this small uncompressed
+        return len(raw) - 1 >= MIN_COMPRESS_BYTES
+    if head != ZSTD:
+        return True
+    return zstd.get_frame_parameters(raw[1:]).dict_id != (compressor.active_dict_id or 0)
+
+
+def _batches(
+    engine: Engine, table: Table, column: str, batch_size: int
+) -> Iterator[List[Tuple[int, bytes]]]:
+    raw_col = type_coerce(table.c[column], LargeBinary)
+    last_id = 0
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(table.c.id, raw_col)
+                .where(table.c.id > last_id, table.c[column].is_not(None))
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [
+            (row_id, raw if isinstance(raw, bytes) else str(raw).encode()) for row_id, raw in rows
+        ]
+
+
+def recompress(
+    engine: Engine,
+    table_name: str,
+    column: str,
+    *,
+    batch_size: int = 1000,
+    compressor: JSONCompressor = codec,
+) -> int:
+    """Re-encode existing rows with the current settings and active dictionary.
+
+    Walks the table in id order, one short transaction per batch, and only
+    rewrites rows not already in the target encoding. Returns rows rewritten.
+    """
+    table = _table(table_name)
+    # Bound as raw bytes so CompressedJSON does not encode the value again
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values({column: bindparam("encoded", type_=LargeBinary)})
+    )
+    rewritten = 0
+    for batch in _batches(engine, table, column, batch_size):
+        updates = [
+            {"row_id": row_id, "encoded": compressor.encode(compressor.decode(raw))}
+            for row_id, raw in batch
+            if _needs_rewrite(raw, compressor)
+        ]
+        if not updates:
+            continue
+        with engine.begin() as conn:
+            conn.execute(stmt, updates)
+        rewritten += len(updates)
+    return rewritten
+
+
+async def load_dictionaries_async(compressor: JSONCompressor = codec) -> int:
+    from app.db.session import get_async_engine
+
+    async with get_async_engine().connect() as conn:
+        return await conn.run_sync(lambda c: load_dictionaries(c, compressor))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(prog="python -m app.db.compression")
+    parser.add_argument("command", choices=("train", "recompress"))
+    parser.add_argument("table", nargs="?")
+    parser.add_argument("column", nargs="?")
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--dict-size", type=int, default=16 * 1024)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    with engine.connect() as conn:
+        load_dictionaries(conn)
+    targets = [(args.table, args.column)] if args.table else list(COMPRESSED_COLUMNS)
+    if args.command == "train":
+        # One dictionary trained on the first target serves every column
+        table_name, column = targets[0]
+        with engine.begin() as conn:
+            dict_id = train_dictionary(
+                conn, table_name, column, samples=args.samples, dict_size=args.dict_size
+            )
+        print(f"Trained dictionary {dict_id} on {table_name}.{column}")
+        return
+    for table_name, column in targets:
+        n = recompress(engine, table_name, column, batch_size=args.batch_size)
+        print(f"{table_name}.{column}: rewrote {n} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,3 +3,5 @@
 from .api_call_log import APICallLog  # noqa: F401
 from .odds_log import OddsLog  # noqa: F401
 from .market_snapshot import MarketSnapshot  # noqa: F401
+from .market_price_rollup import MarketPriceRollup  # noqa: F401
+from .compression_dictionary import CompressionDictionary  # noqa: F401
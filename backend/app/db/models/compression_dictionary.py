@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, LargeBinary, String, func
+
+from app.db.base import Base
+
+
+class CompressionDictionary(Base):
+    """Trained zstd dictionaries; rows must be kept while data compressed with them exists."""
+
+    __tablename__ = "compression_dictionary"
+
+    # zstd's own dictionary id, as recorded in each compressed frame
+    dict_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    trained_on = Column(String(100), nullable=False)  # table.column the samples came from
+    sample_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
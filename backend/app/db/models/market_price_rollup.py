@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String, UniqueConstraint
+
+from app.db.base import Base
+
+
+class MarketPriceRollup(Base):
+    """Hourly/daily OHLC of market_snapshot prices, kept after raw rows expire."""
+
+    __tablename__ = "market_price_rollup"
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String(50), nullable=False)
+    market = Column(String(100), nullable=False)
+    resolution = Column(String(8), nullable=False)  # 1h, 1d
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    samples = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # Also the lookup path for one market's series
+        UniqueConstraint(
+            "market", "resolution", "bucket_start", "source", name="uq_market_price_rollup_bucket"
+        ),
+    )
@@ -1,24 +1,28 @@
-from sqlalchemy import Column, DateTime, Integer, String, JSON, Float, Index, func
+from sqlalchemy import Column, DateTime, Integer, String, Float, Index, func
 
 from app.db.base import Base
+from app.db.types import CompressedJSON
 
 
 class MarketSnapshot(Base):
     __tablename__ = "market_snapshot"
 
     id = Column(Integer, primary_key=True, index=True)
-    captured_at = Column(
-        DateTime(timezone=True), nullable=False, server_default=func.now()
-    )
+    captured_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     source = Column(String(50), nullable=False)  # polymarket, odds_api, datagolf
     sport = Column(String(50), nullable=True)
     event_id = Column(String(100), nullable=True)
     market = Column(String(100), nullable=True)  # market identifier/type
+    price = Column(Float, nullable=True)  # YES price of binary markets, for history reads
 
-    snapshot = Column(JSON, nullable=False)  # full normalized snapshot
+    snapshot = Column(CompressedJSON, nullable=False)  # full normalized snapshot
+    content_hash = Column(String(32), nullable=True)  # blake2b of the stored content
 
     __table_args__ = (
         Index("ix_market_snapshot_source_captured", "source", "captured_at"),
         Index("ix_market_snapshot_event_captured", "event_id", "captured_at"),
+        Index("ix_market_snapshot_market_captured", "market", "captured_at"),
+        # BRIN on Postgres (migration 0004): retention deletes scan by time
+        Index("ix_market_snapshot_captured", "captured_at", postgresql_using="brin"),
     )
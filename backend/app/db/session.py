@@ -1,7 +1,112 @@
-from sqlalchemy import create_engine
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
-engine = create_engine(settings.database_url, future=True)
+# Async driver per backend; sync URLs from DATABASE_URL are translated
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str) -> URL:
+    """Async driver URL for a sync one.
+
+    ``sqlite:///x.db`` -> ``sqlite+aiosqlite:///x.db``,
+    ``postgresql://`` -> ``postgresql+asyncpg://``.
+    """
+    parsed = make_url(url)
+    backend = (
+        "postgresql"
+        if parsed.get_backend_name() in ("postgres", "postgresql")
+        else parsed.get_backend_name()
+    )
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None or parsed.drivername == f"{backend}+{driver}":
+        return parsed
+    return parsed.set(drivername=f"{backend}+{driver}")
+
+
+def _is_sqlite_file(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def _pool_kwargs(url: URL) -> Dict[str, Any]:
+    if url.get_backend_name() == "sqlite":
+        # SQLite has one writer; SQLAlchemy picks a suitable pool per file/memory DB
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": True,
+    }
+
+
+def _enable_sqlite_wal(sync_engine: Engine) -> None:
+    # WAL lets API reads proceed while the history writers insert
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_conn: Any, _record: Any) -> None:
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.db_pool_timeout_seconds * 1000)}")
+        cursor.close()
+
+
+# Synchronous engine for alembic, scripts and thread-offloaded work
+engine = create_engine(
+    settings.database_url, future=True, **_pool_kwargs(make_url(settings.database_url))
+)
+if _is_sqlite_file(engine.url):
+    _enable_sqlite_wal(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """Process-wide async engine, created on first use.
+
+    Created lazily so processes that never touch the database do not need
+    the async driver (aiosqlite/asyncpg) installed.
+    """
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        url = async_database_url(settings.database_url)
+        _async_engine = create_async_engine(url, **_pool_kwargs(url))
+        if _is_sqlite_file(url):
+            _enable_sqlite_wal(_async_engine.sync_engine)
+        _async_sessionmaker = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    get_async_engine()
+    assert _async_sessionmaker is not None
+    return _async_sessionmaker
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one session per request, closed afterwards."""
+    async with get_async_sessionmaker()() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled connections; called on app shutdown."""
+    global _async_engine, _async_sessionmaker
+    eng, _async_engine, _async_sessionmaker = _async_engine, None, None
+    if eng is not None:
+        await eng.dispose()
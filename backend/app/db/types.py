@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.engine import Dialect
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+from app.utils.json_codec import dumps, loads
+
+try:  # optional: without it values are stored as uncompressed JSON
+    import zstandard as zstd
+except ImportError:  # pragma: no cover - exercised only without zstandard installed
+    zstd = None  # type: ignore[assignment]
+
+# First byte of a stored value. Neither can start a JSON document, so rows
+# written before the column became binary (plain JSON text) stay readable.
+PLAIN = b"\x00"
+ZSTD = b"\x01"
+# Below this many bytes compression rarely pays for the frame header
+MIN_COMPRESS_BYTES = 64
+
+
+def zstd_available() -> bool:
+    return zstd is not None
+
+
+class JSONCompressor:
+    """Encodes JSON values, zstd-compressed with a shared dictionary when enabled.
+
+    Our payloads are small and repetitive (same keys, team names, bookmakers),
+    which is where a trained dictionary gives most of its gain. Frames record
+    the dictionary id, so rows written with an older dictionary still decode
+    as long as it is loaded.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, level: Optional[int] = None) -> None:
+        want = settings.json_compression == "zstd" if enabled is None else enabled
+        self.enabled = want and zstd is not None
+        self.level = level or settings.json_compression_level
+        self._dicts: Dict[int, Any] = {}
+        self.active_dict_id: Optional[int] = None
+
+    def add_dictionary(self, data: bytes, *, activate: bool = True) -> int:
+        if zstd is None:
+            raise RuntimeError("zstandard is not installed")
+        d = zstd.ZstdCompressionDict(data)
+        dict_id = d.dict_id()
+        self._dicts[dict_id] = d
+        if activate:
+            self.active_dict_id = dict_id
+        return dict_id
+
+    def encode(self, value: Any) -> bytes:
+        raw = dumps(value)
+        if not self.enabled or len(raw) < MIN_COMPRESS_BYTES:
+            return PLAIN + raw
+        d = self._dicts.get(self.active_dict_id) if self.active_dict_id is not None else None
+        # Compressor objects are cheap and not thread-safe; writers may run in threads
+        cctx = (
+            zstd.ZstdCompressor(level=self.level, dict_data=d)
+            if d is not None
+            else zstd.ZstdCompressor(level=self.level)
+        )
+        return ZSTD + cctx.compress(raw)
+
+    def decode(self, data: bytes) -> Any:
+        data = bytes(data)
+        head = data[:1]
+        if head == PLAIN:
+            return loads(data[1:])
+        if head == ZSTD:
+            if zstd is None:
+                raise RuntimeError("Compressed JSON row found but zstandard is not installed")
+            frame = data[1:]
+            dict_id = zstd.get_frame_parameters(frame).dict_id
+            d = self._dicts.get(dict_id) if dict_id else None
+            if dict_id and d is None:
+                raise RuntimeError(f"Compression dictionary {dict_id} is not loaded")
+            dctx = zstd.ZstdDecompressor(dict_data=d) if d is not None else zstd.ZstdDecompressor()
+            return loads(dctx.decompress(frame))
+        # Legacy plain JSON text
+        return loads(data)
+
+
+# Process-wide codec used by every CompressedJSON column
+codec = JSONCompressor()
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON stored as bytes, optionally zstd-compressed (JSON_COMPRESSION=zstd).
+
+    Reads and writes Python values like ``JSON``; the encoding is chosen on
+    write and detected on read, so compressed and plain rows can coexist.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return codec.encode(value)
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, str):  # SQLite rows that were never converted to BLOB
+            return loads(value)
+        return codec.decode(value)
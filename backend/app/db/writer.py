@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import Table, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+
+
+class BulkInsertWriter:
+    """Buffers rows for one table and flushes them in batches.
+
+    ``enqueue`` never blocks the caller. A background task flushes whenever
+    ``batch_size`` rows are pending or ``flush_interval`` seconds have passed;
+    each flush is one executemany INSERT per batch. With an AsyncEngine (the
+    default) the insert awaits the async driver; a sync Engine runs in a
+    worker thread. Either way the event loop keeps serving requests.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        *,
+        engine: Optional[Union[Engine, AsyncEngine]] = None,
+        batch_size: int = 1000,
+        flush_interval: float = 5.0,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        self.table = table
+        self._engine = engine
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending or self.batch_size * 50
+        self._pending: List[Row] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def engine(self) -> Union[Engine, AsyncEngine]:
+        if self._engine is None:
+            from app.db.session import get_async_engine
+
+            self._engine = get_async_engine()
+        return self._engine
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, rows: Iterable[Row]) -> None:
+        self._pending.extend(rows)
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            # Database is not keeping up; shed the oldest rows rather than grow unbounded
+            del self._pending[:overflow]
+            self.dropped += overflow
+            logger.warning("%s writer dropped %s rows", self.table.name, overflow)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _write(self, batches: List[List[Row]]) -> None:
+        with self.engine.begin() as conn:  # type: ignore[union-attr]
+            for batch in batches:
+                conn.execute(insert(self.table), batch)
+
+    async def _write_async(self, batches: List[List[Row]]) -> None:
+        async with self.engine.begin() as conn:  # type: ignore[union-attr]
+            for batch in batches:
+                await conn.execute(insert(self.table), batch)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            batches = [rows[i : i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+            try:
+                if isinstance(self.engine, AsyncEngine):
+                    await self._write_async(batches)
+                else:
+                    await asyncio.to_thread(self._write, batches)
+            except Exception:
+                # Put rows back (ahead of anything enqueued meanwhile) for the next attempt
+                self._pending[:0] = rows
+                raise
+            self.written += len(rows)
+            return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Flushing %s failed", self.table.name)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"writer-{self.table.name}")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final flush of %s failed", self.table.name)
@@ -1,32 +1,43 @@
+import logging
+
 from fastapi import FastAPI
-import json
-from starlette.responses import JSONResponse
 
 from app.core.config import settings
+from app.api.responses import FastJSONResponse, PrettyJSONMiddleware
 from app.api.routes.opportunities import router as opp_router
 from app.api.routes.odds import router as odds_router
 from app.api.routes.golf import router as golf_router
 from app.api.routes.debug import router as debug_router
-
-
-class PrettyJSONResponse(JSONResponse):
-    def render(self, content) -> bytes:  # type: ignore[override]
-        return json.dumps(
-            content,
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=2,
-            separators=(", ", ": "),
-        ).encode("utf-8")
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.history import router as history_router
+from app.db.compression import load_dictionaries_async
+from app.db.session import dispose_async_engine
+from app.db.types import zstd_available
+from app.services._http import close_http_pool, open_http_pool, set_call_recorder
+from app.services.call_log import APICallRecorder
+from app.services.history import HistoryRecorder
+from app.services.refresher import OpportunityRefresher
+from app.services.retention import RetentionJob
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.app_name, default_response_class=PrettyJSONResponse)
+    # Compact by default; append ?pretty=true to any JSON endpoint for indented output
+    app = FastAPI(title=settings.app_name, default_response_class=FastJSONResponse)
+    app.add_middleware(PrettyJSONMiddleware)
+    app.state.refresher = OpportunityRefresher()
+    app.state.history = None
+    app.state.call_log = APICallRecorder(persist=settings.api_call_log_enabled)
+    app.state.retention = RetentionJob() if settings.retention_enabled else None
+    if settings.history_enabled:
+        app.state.history = HistoryRecorder()
+        app.state.refresher.add_listener(app.state.history.record)
 
     app.include_router(opp_router)
     app.include_router(odds_router)
     app.include_router(golf_router)
     app.include_router(debug_router)
+    app.include_router(metrics_router)
+    app.include_router(history_router)
 
     @app.get("/health")
     async def health() -> dict:
@@ -42,6 +53,34 @@ def create_app() -> FastAPI:
                 settings.refresh_interval_seconds,
                 settings.fee_cushion,
             )
+        open_http_pool()
+        set_call_recorder(app.state.call_log)
+        if zstd_available():
+            # Needed to read dictionary-compressed rows even when writes are plain
+            try:
+                await load_dictionaries_async()
+            except Exception:
+                logging.getLogger(__name__).exception("Loading compression dictionaries failed")
+        app.state.call_log.start()
+        if app.state.history is not None:
+            app.state.history.start()
+        if settings.refresh_enabled:
+            app.state.refresher.start()
+        if app.state.retention is not None:
+            app.state.retention.start()
+
+    @app.on_event("shutdown")
+    async def on_shutdown() -> None:
+        await app.state.refresher.stop()
+        if app.state.retention is not None:
+            await app.state.retention.stop()
+        if app.state.history is not None:
+            await app.state.history.stop()
+        await close_http_pool()
+        set_call_recorder(None)
+        await app.state.call_log.stop()
+        # After the writers' final flush
+        await dispose_async_engine()
 
     return app
 
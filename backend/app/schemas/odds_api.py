@@ -20,6 +20,7 @@ class EventLines(BaseModel):
     event_id: str
     title: str
     lines: List[BookLine]
+    commence_time: Optional[str] = None  # ISO-8601, as reported by the Odds API
     # Join helpers and attribution
     canonical_event_key: Optional[str] = None
     home_team_key: Optional[str] = None
@@ -23,4 +23,5 @@ class PMEvent(BaseModel):
     title: str
     ticker: Optional[str] = None
     slug: Optional[str] = None
+    start_time: Optional[str] = None  # ISO-8601 game start when known
     markets: List[PMMarket] = []
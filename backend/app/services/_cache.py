@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Tuple, TypeVar
+
+from app.core.config import settings
+from app.services._singleflight import SingleFlight
+
+CacheKey = Tuple[str, ...]
+T = TypeVar("T")
+
+
+class CacheBackend(Protocol):
+    # True when calls do disk I/O and must be kept off the event loop
+    blocking: bool
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]: ...
+
+    def set(self, key: str, stored_at: float, value: Any) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryCacheBackend:
+    """Process-wide dict store; shared by every service instance in a worker."""
+
+    blocking = False
+
+    def __init__(self) -> None:
+        self._store: Dict[str, Tuple[float, Any]] = {}
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        return self._store.get(key)
+
+    def set(self, key: str, stored_at: float, value: Any) -> None:
+        self._store[key] = (stored_at, value)
+
+    def delete(self, key: str) -> None:
+        self._store.pop(key, None)
+
+    def clear(self) -> None:
+        self._store.clear()
+
+
+class SQLiteCacheBackend:
+    """On-disk store shared by all gunicorn workers on a host.
+
+    Values are pickled; SQLite's WAL mode gives concurrent readers with a
+    single writer, which matches one refresh writing and many requests reading.
+    Calls block on the file (up to the 5s busy timeout), so async callers run
+    them in a worker thread.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str) -> None:
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stored_at, value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return float(row[0]), pickle.loads(row[1])
+        except Exception:
+            self.delete(key)
+            return None
+
+    def set(self, key: str, stored_at: float, value: Any) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, stored_at, value) VALUES (?, ?, ?)",
+                (key, stored_at, blob),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    sets: int = 0
+    coalesced: int = 0
+
+
+_backend: Optional[CacheBackend] = None
+_stats: Dict[str, CacheStats] = {}
+_inflight = SingleFlight()
+
+
+def get_cache_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        kind = settings.cache_backend.strip().lower()
+        if kind == "sqlite":
+            _backend = SQLiteCacheBackend(settings.cache_path)
+        elif kind == "memory":
+            _backend = MemoryCacheBackend()
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND {settings.cache_backend!r}")
+    return _backend
+
+
+def reset_cache(backend: Optional[CacheBackend] = None) -> None:
+    """Drop cached values and counters; optionally install a different backend."""
+    global _backend
+    if _backend is not None:
+        _backend.clear()
+    _backend = backend
+    _stats.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {ns: asdict(s) for ns, s in sorted(_stats.items())}
+
+
+class TTLCache:
+    """Namespaced TTL view over the process-wide cache backend."""
+
+    def __init__(
+        self, namespace: str, ttl_seconds: int, backend: Optional[CacheBackend] = None
+    ) -> None:
+        self.namespace = namespace
+        self.ttl = ttl_seconds
+        self._backend = backend
+
+    @property
+    def stats(self) -> CacheStats:
+        return _stats.setdefault(self.namespace, CacheStats())
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend or get_cache_backend()
+
+    def _key(self, key: CacheKey) -> str:
+        return "\x1f".join((self.namespace, *key))
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        k = self._key(key)
+        stats = self.stats
+        entry = self.backend.get(k)
+        if entry is not None:
+            ts, val = entry
+            if time.time() - ts <= self.ttl:
+                stats.hits += 1
+                return val
+            self.backend.delete(k)
+            stats.expired += 1
+        stats.misses += 1
+        return None
+
+    def set(self, key: CacheKey, val: Any) -> None:
+        self.backend.set(self._key(key), time.time(), val)
+        self.stats.sets += 1
+
+    async def _offload(self, fn: Callable[..., T], *args: Any) -> T:
+        if getattr(self.backend, "blocking", False):
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def get_or_load(self, key: CacheKey, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value or load it once for all concurrent callers."""
+        cached = await self._offload(self.get, key)
+        if cached is not None:
+            return cached
+        k = self._key(key)
+        if _inflight.in_flight(k):
+            self.stats.coalesced += 1
+
+        async def load() -> Any:
+            val = await loader()
+            await self._offload(self.set, key, val)
+            return val
+
+        return await _inflight.do(k, load)
@@ -1,10 +1,214 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Dict, Optional
+import importlib.util
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
 
 import httpx
 
+from app.core.config import settings
+from app.services._metrics import count_retry, observe_upstream
+from app.services.call_log import APICallRecorder, quota_headers, redact_params
+
+USER_AGENT = "polymarket-edge/0.1"
+DEFAULT_TIMEOUT = 20.0
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _parse_host_limits(raw: str) -> Dict[str, int]:
+    # "gamma-api.polymarket.com=16,api.the-odds-api.com=4"
+    limits: Dict[str, int] = {}
+    for part in raw.split(","):
+        host, sep, value = part.partition("=")
+        if not sep:
+            continue
+        try:
+            limits[host.strip().lower()] = int(value)
+        except ValueError:
+            continue
+    return limits
+
+
+class HTTPClientPool:
+    """Process-wide httpx clients, one per upstream base URL.
+
+    Each client owns its own connection pool, so limits are effectively per
+    host. Clients live for the app lifespan and keep TLS sessions and
+    keep-alive connections warm across requests and refresh cycles.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        host_limits: Optional[Dict[str, int]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.max_connections = (
+            max_connections if max_connections is not None else settings.http_max_connections
+        )
+        self.max_keepalive_connections = (
+            max_keepalive_connections
+            if max_keepalive_connections is not None
+            else settings.http_max_keepalive_connections
+        )
+        self.keepalive_expiry = (
+            keepalive_expiry if keepalive_expiry is not None else settings.http_keepalive_expiry
+        )
+        want_http2 = settings.http2_enabled if http2 is None else http2
+        self.http2 = bool(want_http2) and _http2_available()
+        self.host_limits = (
+            host_limits
+            if host_limits is not None
+            else _parse_host_limits(settings.http_host_max_connections)
+        )
+        self.timeout = timeout
+        # A custom transport (e.g. replay) replaces the network for every client
+        self.transport = transport
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _limits_for(self, base_url: str) -> httpx.Limits:
+        host = (urlsplit(base_url).hostname or "").lower()
+        max_conn = self.host_limits.get(host, self.max_connections)
+        return httpx.Limits(
+            max_connections=max_conn,
+            max_keepalive_connections=min(self.max_keepalive_connections, max_conn),
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def client_for(self, base_url: str) -> httpx.AsyncClient:
+        key = base_url.rstrip("/")
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=key,
+                timeout=self.timeout,
+                headers={"User-Agent": USER_AGENT},
+                limits=self._limits_for(key),
+                http2=self.http2,
+                transport=self.transport,
+            )
+            self._clients[key] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+_pool: Optional[HTTPClientPool] = None
+
+
+def get_http_pool() -> Optional[HTTPClientPool]:
+    return _pool
+
+
+def open_http_pool(**kwargs: Any) -> HTTPClientPool:
+    global _pool
+    if _pool is None:
+        if "transport" not in kwargs and settings.replay_dir:
+            from app.services._replay import ReplayTransport
+
+            kwargs["transport"] = ReplayTransport(
+                settings.replay_dir,
+                speed=settings.replay_speed,
+                latency_ms=settings.replay_latency_ms,
+            )
+        _pool = HTTPClientPool(**kwargs)
+    return _pool
+
+
+def replaying() -> bool:
+    """True while the shared pool serves recorded responses instead of the network."""
+    from app.services._replay import ReplayTransport
+
+    return _pool is not None and isinstance(_pool.transport, ReplayTransport)
+
+
+async def close_http_pool() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.aclose()
+
+
+_call_recorder: Optional[APICallRecorder] = None
+
+
+def set_call_recorder(recorder: Optional[APICallRecorder]) -> None:
+    """Route a row for every upstream attempt to ``recorder`` (None to stop)."""
+    global _call_recorder
+    _call_recorder = recorder
+
+
+def get_call_recorder() -> Optional[APICallRecorder]:
+    return _call_recorder
+
+
+def _record_call(
+    service: str,
+    path: str,
+    params: Optional[Dict[str, Any]],
+    attempt: int,
+    started: float,
+    resp: Optional[httpx.Response] = None,
+    exc: Optional[Exception] = None,
+) -> float:
+    elapsed = time.perf_counter() - started
+    observe_upstream(
+        service, f"{resp.status_code // 100}xx" if resp is not None else "error", elapsed
+    )
+    recorder = _call_recorder
+    if recorder is not None:
+        meta: Dict[str, Any] = {"attempt": attempt + 1}
+        safe_params = redact_params(params)
+        if safe_params:
+            meta["params"] = safe_params
+        if resp is not None:
+            meta.update(quota_headers(resp.headers))
+        recorder.record(
+            service,
+            path,
+            status_code=resp.status_code if resp is not None else None,
+            duration_ms=elapsed * 1000.0,
+            error=f"{type(exc).__name__}: {exc}" if exc is not None else None,
+            meta=meta,
+        )
+    return elapsed
+
+
+def acquire_client(
+    base_url: str, client: Optional[httpx.AsyncClient] = None
+) -> Tuple[httpx.AsyncClient, bool]:
+    """Return ``(client, owned)`` for a service.
+
+    An injected client or the shared pool's client is borrowed (``owned`` is
+    False) and must not be closed by the service. Outside the app lifespan
+    (scripts, tests) a private client is created as before.
+    """
+    if client is not None:
+        return client, False
+    if _pool is not None:
+        return _pool.client_for(base_url), False
+    return (
+        httpx.AsyncClient(
+            base_url=base_url,
+            timeout=DEFAULT_TIMEOUT,
+            headers={"User-Agent": USER_AGENT},
+        ),
+        True,
+    )
+
 
 async def http_get_with_retry(
     client: httpx.AsyncClient,
@@ -13,22 +217,45 @@ async def http_get_with_retry(
     *,
     retries: int = 3,
     backoff_base: float = 0.5,
+    stream: bool = False,
+    service: Optional[str] = None,
 ) -> httpx.Response:
+    """GET with retries on 5xx and transport errors.
+
+    With ``stream=True`` the body is not read; the caller iterates it and must
+    ``aclose()`` the response. Every attempt is timed under ``service``
+    (default: the client's host) and, when a call recorder is set, logged
+    with credential parameters removed.
+    """
+    upstream = service or client.base_url.host or "unknown"
     last_exc: Optional[Exception] = None
     for attempt in range(retries):
+        started = time.perf_counter()
         try:
-            resp = await client.get(path, params=params)
-            # Retry on 5xx; return otherwise (including 4xx) so caller can handle
-            if 500 <= resp.status_code < 600:
-                if attempt == retries - 1:
-                    return resp
-                await asyncio.sleep(backoff_base * (2**attempt))
-                continue
-            return resp
+            if stream:
+                request = client.build_request("GET", path, params=params)
+                resp = await client.send(request, stream=True)
+            else:
+                resp = await client.get(path, params=params)
         except Exception as exc:  # network/transport errors
+            _record_call(upstream, path, params, attempt, started, exc=exc)
             last_exc = exc
             if attempt == retries - 1:
                 raise
+            count_retry(upstream, type(exc).__name__)
+            await asyncio.sleep(backoff_base * (2**attempt))
+            continue
+        # With stream=True this is time to response headers
+        _record_call(upstream, path, params, attempt, started, resp=resp)
+        # Retry on 5xx; return otherwise (including 4xx) so caller can handle
+        if 500 <= resp.status_code < 600:
+            if attempt == retries - 1:
+                return resp
+            if stream:
+                await resp.aclose()
+            count_retry(upstream, str(resp.status_code))
             await asyncio.sleep(backoff_base * (2**attempt))
+            continue
+        return resp
     assert last_exc is not None
     raise last_exc
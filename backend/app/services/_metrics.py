@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import math
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from app.core.config import settings
+
+Labels = Tuple[str, ...]
+
+# Seconds; spans range from sub-millisecond CPU stages to multi-second fetches
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    __slots__ = ("name", "help", "labelnames", "_values")
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def reset(self) -> None:
+        self._values.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_label_str(self.labelnames, labels)} {_fmt(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class _Series:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, n_buckets: int) -> None:
+        self.counts = [0] * (n_buckets + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` is one bisect and three additions."""
+
+    __slots__ = ("name", "help", "labelnames", "buckets", "_series")
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, _Series] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _Series(len(self.buckets))
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.total += value
+        series.count += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series.count if series else 0
+
+    def sum(self, *labels: str) -> float:
+        series = self._series.get(labels)
+        return series.total if series else 0.0
+
+    def reset(self) -> None:
+        self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bounds = self.buckets + (math.inf,)
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(bounds, series.counts):
+                cumulative += n
+                le = _label_str(self.labelnames, labels, f'le="{_fmt(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_str = _label_str(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_fmt(series.total)}")
+            lines.append(f"{self.name}_count{label_str} {series.count}")
+        return lines
+
+
+Metric = Union[Counter, Gauge, Histogram]
+M = TypeVar("M", Counter, Gauge, Histogram)
+_registry: Dict[str, Metric] = {}
+
+
+def register(metric: M) -> M:
+    _registry[metric.name] = metric
+    return metric
+
+
+STAGE_SECONDS = register(
+    Histogram(
+        "pipeline_stage_seconds",
+        "Wall time of opportunity pipeline stages.",
+        ("stage",),
+    )
+)
+UPSTREAM_SECONDS = register(
+    Histogram(
+        "upstream_request_seconds",
+        "Latency of each upstream HTTP attempt.",
+        ("upstream", "outcome"),
+    )
+)
+UPSTREAM_RETRIES = register(
+    Counter(
+        "upstream_retries_total",
+        "Upstream HTTP attempts that were retried.",
+        ("upstream", "reason"),
+    )
+)
+
+
+class span:
+    """Times a block into ``pipeline_stage_seconds{stage=...}``.
+
+    Two ``perf_counter`` calls and a histogram update, cheap enough to wrap
+    every stage of every refresh. Disabled by METRICS_ENABLED=false.
+    """
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self._start = 0.0
+
+    def __enter__(self) -> "span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if settings.metrics_enabled:
+            STAGE_SECONDS.observe(time.perf_counter() - self._start, self.stage)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record time accumulated outside a single block (e.g. interleaved decoding)."""
+    if settings.metrics_enabled:
+        STAGE_SECONDS.observe(seconds, stage)
+
+
+def observe_upstream(upstream: str, outcome: str, seconds: float) -> None:
+    if settings.metrics_enabled:
+        UPSTREAM_SECONDS.observe(seconds, upstream, outcome)
+
+
+def count_retry(upstream: str, reason: str) -> None:
+    if settings.metrics_enabled:
+        UPSTREAM_RETRIES.inc(upstream, reason)
+
+
+def render_metrics(extra: Optional[Sequence[Metric]] = None) -> str:
+    """Prometheus text exposition (format 0.0.4) of every registered metric."""
+    lines: List[str] = []
+    for metric in list(_registry.values()) + list(extra or ()):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    for metric in _registry.values():
+        metric.reset()
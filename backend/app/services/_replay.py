@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Pattern, Sequence, Tuple, Union
+
+import httpx
+
+from app.utils.json_codec import dumps, loads
+
+
+@dataclass(frozen=True)
+class ReplayRoute:
+    """Maps request paths to recorded response files.
+
+    ``files`` are tried in order and may use named groups from ``path``,
+    e.g. ``sb_odds_{sport}.json``. With ``paginate`` the recording must be a
+    JSON array, served in ``limit``/``offset`` slices like the live API.
+    """
+
+    path: Pattern[str]
+    files: Tuple[str, ...]
+    paginate: bool = False
+    latency_ms: Optional[float] = None
+
+
+DEFAULT_ROUTES: Tuple[ReplayRoute, ...] = (
+    ReplayRoute(
+        re.compile(r"/sports/(?P<sport>[^/]+)/odds$"), ("sb_odds_{sport}.json", "sb_odds.json")
+    ),
+    ReplayRoute(re.compile(r"^/sports$"), ("pm_sports.json",)),
+    ReplayRoute(re.compile(r"^/markets$"), ("pm_markets.json",), paginate=True),
+)
+
+
+def _load_manifest(directory: Path) -> Optional[List[ReplayRoute]]:
+    # Optional replay.json:
+    # {"routes": [{"path": "...", "file": "...", "paginate": bool, "latency_ms": n}]}
+    manifest = directory / "replay.json"
+    if not manifest.is_file():
+        return None
+    routes: List[ReplayRoute] = []
+    for r in loads(manifest.read_bytes()).get("routes", []):
+        files = r.get("files") or [r["file"]]
+        routes.append(
+            ReplayRoute(
+                re.compile(r["path"]),
+                tuple(files),
+                paginate=bool(r.get("paginate", False)),
+                latency_ms=r.get("latency_ms"),
+            )
+        )
+    return routes
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves recorded upstream responses from a snapshot directory.
+
+    Plugged into the shared HTTP clients so every service runs unchanged
+    without network. ``latency_ms`` (or a route's own) is divided by
+    ``speed``; speed 0 disables the delay entirely.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        *,
+        speed: float = 1.0,
+        latency_ms: float = 0.0,
+        routes: Optional[Sequence[ReplayRoute]] = None,
+    ) -> None:
+        self.directory = Path(directory)
+        if not self.directory.is_dir():
+            raise FileNotFoundError(f"Replay directory not found: {self.directory}")
+        self.speed = speed
+        self.latency_ms = latency_ms
+        self.routes = tuple(routes or _load_manifest(self.directory) or DEFAULT_ROUTES)
+        self.requests = 0
+        self._documents: Dict[str, Any] = {}
+
+    def _document(self, name: str) -> Any:
+        if name not in self._documents:
+            path = self.directory / name
+            self._documents[name] = loads(path.read_bytes()) if path.is_file() else None
+        return self._documents[name]
+
+    def _resolve(self, path: str) -> Tuple[Optional[ReplayRoute], Any]:
+        for route in self.routes:
+            match = route.path.search(path)
+            if match is None:
+                continue
+            for template in route.files:
+                doc = self._document(template.format(**match.groupdict()))
+                if doc is not None:
+                    return route, doc
+            return route, None
+        return None, None
+
+    def _delay(self, route: ReplayRoute) -> float:
+        latency = route.latency_ms if route.latency_ms is not None else self.latency_ms
+        if self.speed <= 0 or latency <= 0:
+            return 0.0
+        return latency / 1000.0 / self.speed
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        route, doc = self._resolve(request.url.path)
+        if route is None or doc is None:
+            return httpx.Response(
+                404,
+                content=dumps({"error": f"No recording for {request.url.path}"}),
+                headers={"content-type": "application/json"},
+                request=request,
+            )
+        if route.paginate and isinstance(doc, list):
+            params = request.url.params
+            offset = int(params.get("offset") or 0)
+            limit = int(params.get("limit") or len(doc) or 1)
+            doc = doc[offset : offset + limit]
+        delay = self._delay(route)
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(
+            200,
+            content=dumps(doc),
+            headers={"content-type": "application/json"},
+            request=request,
+        )
+
+
+@asynccontextmanager
+async def replay_session(
+    directory: Union[str, Path], *, speed: float = 0.0, latency_ms: float = 0.0
+) -> AsyncIterator[ReplayTransport]:
+    """Run the pipeline against recordings, e.g. in CI or benchmarks.
+
+    Opens the shared HTTP pool on a ReplayTransport and clears the upstream
+    cache on entry and exit so live and recorded data never mix.
+    """
+    from app.services._cache import reset_cache
+    from app.services._http import close_http_pool, get_http_pool, open_http_pool
+
+    if get_http_pool() is not None:
+        raise RuntimeError("replay_session needs the shared HTTP pool to be closed")
+    transport = ReplayTransport(directory, speed=speed, latency_ms=latency_ms)
+    reset_cache()
+    open_http_pool(transport=transport)
+    try:
+        yield transport
+    finally:
+        await close_http_pool()
+        reset_cache()
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import math
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from app.schemas.odds_api import BookLine, EventLines
+
+H2H = "h2h"
+
+# (bookmaker, market, side, american, decimal, point, fair_probability)
+LineRow = Tuple[str, str, str, Optional[int], Optional[float], Optional[float], Optional[float]]
+
+
+class StringPool:
+    """Interns strings to dense integer ids."""
+
+    __slots__ = ("ids", "values")
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def id(self, value: str) -> int:
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.ids[value] = idx
+            self.values.append(sys.intern(value))
+        return idx
+
+    def get(self, value: str) -> int:
+        return self.ids.get(value, -1)
+
+    def __getitem__(self, idx: int) -> str:
+        return self.values[idx]
+
+
+@dataclass(slots=True)
+class EventRecord:
+    sport: str
+    event_id: str
+    title: str
+    start: int  # first row of this event's lines
+    stop: int
+    commence_time: Optional[str] = None
+    canonical_event_key: Optional[str] = None
+    home_team_key: Optional[str] = None
+    away_team_key: Optional[str] = None
+    selected_bookmaker: Optional[str] = None
+
+
+class SportLines:
+    """Book lines for a batch of events, stored column-wise.
+
+    Each line is a row across parallel arrays; bookmaker, market and side are
+    ids into per-table string pools, and missing floats are NaN. The pipeline
+    works on these arrays directly; ``to_event_lines`` materializes the API
+    models only when a response needs them.
+    """
+
+    __slots__ = (
+        "events",
+        "bookmakers",
+        "markets",
+        "sides",
+        "event",
+        "bookmaker",
+        "market",
+        "side",
+        "american",
+        "decimal",
+        "point",
+        "fair_probability",
+    )
+
+    def __init__(
+        self,
+        events: List[EventRecord],
+        bookmakers: StringPool,
+        markets: StringPool,
+        sides: StringPool,
+        event: NDArray[np.int32],
+        bookmaker: NDArray[np.int32],
+        market: NDArray[np.int32],
+        side: NDArray[np.int32],
+        american: NDArray[np.float64],
+        decimal: NDArray[np.float64],
+        point: NDArray[np.float64],
+        fair_probability: NDArray[np.float64],
+    ) -> None:
+        self.events = events
+        self.bookmakers = bookmakers
+        self.markets = markets
+        self.sides = sides
+        self.event = event
+        self.bookmaker = bookmaker
+        self.market = market
+        self.side = side
+        self.american = american
+        self.decimal = decimal
+        self.point = point
+        self.fair_probability = fair_probability
+
+    def __len__(self) -> int:
+        return len(self.event)
+
+    def h2h_fair(self, idx: int) -> Dict[str, float]:
+        """Vig-removed H2H probabilities of event ``idx`` by side."""
+        ev = self.events[idx]
+        h2h = self.markets.get(H2H)
+        probs: Dict[str, float] = {}
+        if h2h < 0:
+            return probs
+        for row in range(ev.start, ev.stop):
+            fp = self.fair_probability[row]
+            if self.market[row] == h2h and not math.isnan(fp):
+                probs[self.sides[int(self.side[row])]] = float(fp)
+        return probs
+
+    def rows(self, idx: int) -> Iterator[LineRow]:
+        """Lines of event ``idx`` as plain tuples."""
+        ev = self.events[idx]
+        sl = slice(ev.start, ev.stop)
+        columns = zip(
+            self.bookmaker[sl].tolist(),
+            self.market[sl].tolist(),
+            self.side[sl].tolist(),
+            self.american[sl].tolist(),
+            self.decimal[sl].tolist(),
+            self.point[sl].tolist(),
+            self.fair_probability[sl].tolist(),
+        )
+        for b, m, s, a, d, p, f in columns:
+            yield (
+                self.bookmakers[b],
+                self.markets[m],
+                self.sides[s],
+                _int_or_none(a),
+                _float_or_none(d),
+                _float_or_none(p),
+                _float_or_none(f),
+            )
+
+    def to_event_lines(self) -> List[EventLines]:
+        out: List[EventLines] = []
+        for idx, ev in enumerate(self.events):
+            lines = [
+                BookLine(
+                    bookmaker=b,
+                    market=m,
+                    side=s,
+                    american_odds=a,
+                    decimal_odds=d,
+                    point=p,
+                    fair_probability=f,
+                    fair_decimal_odds=(1.0 / f) if f is not None and f > 0 else None,
+                )
+                for b, m, s, a, d, p, f in self.rows(idx)
+            ]
+            out.append(
+                EventLines(
+                    sport=ev.sport,
+                    event_id=ev.event_id,
+                    title=ev.title,
+                    lines=lines,
+                    commence_time=ev.commence_time,
+                    canonical_event_key=ev.canonical_event_key,
+                    home_team_key=ev.home_team_key,
+                    away_team_key=ev.away_team_key,
+                    selected_bookmaker=ev.selected_bookmaker,
+                )
+            )
+        return out
+
+    @classmethod
+    def from_event_lines(cls, events: Iterable[EventLines]) -> "SportLines":
+        builder = SportLinesBuilder()
+        for ev in events:
+            builder.start_event(
+                ev.sport,
+                ev.event_id,
+                ev.title,
+                commence_time=ev.commence_time,
+                canonical_event_key=ev.canonical_event_key,
+                home_team_key=ev.home_team_key,
+                away_team_key=ev.away_team_key,
+                selected_bookmaker=ev.selected_bookmaker,
+            )
+            for bl in ev.lines:
+                builder.add_line(
+                    bl.bookmaker,
+                    bl.market,
+                    bl.side,
+                    bl.american_odds,
+                    bl.point,
+                    decimal_odds=bl.decimal_odds,
+                    fair_probability=bl.fair_probability,
+                )
+        return builder.build()
+
+
+def _int_or_none(value: float) -> Optional[int]:
+    return None if math.isnan(value) else int(value)
+
+
+def _float_or_none(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class SportLinesBuilder:
+    """Accumulates events and lines in plain lists, then freezes them into arrays."""
+
+    def __init__(self) -> None:
+        self.events: List[EventRecord] = []
+        self.bookmakers = StringPool()
+        self.markets = StringPool()
+        self.sides = StringPool()
+        self._event: List[int] = []
+        self._bookmaker: List[int] = []
+        self._market: List[int] = []
+        self._side: List[int] = []
+        self._american: List[float] = []
+        self._decimal: List[float] = []
+        self._point: List[float] = []
+        self._fair: List[float] = []
+
+    def start_event(
+        self, sport: str, event_id: str, title: str, **fields: Optional[str]
+    ) -> EventRecord:
+        if self.events:
+            self.events[-1].stop = len(self._event)
+        row = len(self._event)
+        rec = EventRecord(
+            sport=sport, event_id=event_id, title=title, start=row, stop=row, **fields
+        )
+        self.events.append(rec)
+        return rec
+
+    def add_line(
+        self,
+        bookmaker: str,
+        market: str,
+        side: str,
+        american: Optional[int],
+        point: Optional[float] = None,
+        *,
+        decimal_odds: Optional[float] = None,
+        fair_probability: Optional[float] = None,
+    ) -> None:
+        self._event.append(len(self.events) - 1)
+        self._bookmaker.append(self.bookmakers.id(bookmaker))
+        self._market.append(self.markets.id(market))
+        self._side.append(self.sides.id(side))
+        self._american.append(math.nan if american is None else american)
+        self._decimal.append(math.nan if decimal_odds is None else decimal_odds)
+        self._point.append(math.nan if point is None else point)
+        self._fair.append(math.nan if fair_probability is None else fair_probability)
+
+    def build(self) -> SportLines:
+        if self.events:
+            self.events[-1].stop = len(self._event)
+        return SportLines(
+            events=self.events,
+            bookmakers=self.bookmakers,
+            markets=self.markets,
+            sides=self.sides,
+            event=np.asarray(self._event, dtype=np.int32),
+            bookmaker=np.asarray(self._bookmaker, dtype=np.int32),
+            market=np.asarray(self._market, dtype=np.int32),
+            side=np.asarray(self._side, dtype=np.int32),
+            american=np.asarray(self._american, dtype=np.float64),
+            decimal=np.asarray(self._decimal, dtype=np.float64),
+            point=np.asarray(self._point, dtype=np.float64),
+            fair_probability=np.asarray(self._fair, dtype=np.float64),
+        )
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Mapping, Optional, Union
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.models import APICallLog
+from app.db.writer import BulkInsertWriter
+
+# Query parameters that carry credentials; never logged
+SECRET_PARAMS = frozenset({"apikey", "api_key", "key", "token", "access_token"})
+# Response headers worth keeping, e.g. Odds API credit usage
+_QUOTA_HEADER_PREFIXES = ("x-requests-", "x-ratelimit-")
+
+
+def redact_params(params: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    if not params:
+        return {}
+    return {k: v for k, v in params.items() if k.lower() not in SECRET_PARAMS}
+
+
+def quota_headers(headers: Mapping[str, str]) -> Dict[str, str]:
+    return {
+        k.lower(): v for k, v in headers.items() if k.lower().startswith(_QUOTA_HEADER_PREFIXES)
+    }
+
+
+class APICallRecorder:
+    """Collects one api_call_log row per upstream HTTP attempt.
+
+    ``record`` only builds a dict: the row goes to an in-memory ring of recent
+    calls and, when a database writer is attached, to its batch buffer. If
+    the writer falls behind (its buffer is full) rows are kept only in the
+    ring instead of displacing older unwritten rows.
+    """
+
+    def __init__(
+        self,
+        *,
+        persist: bool = False,
+        engine: Optional[Union[Engine, AsyncEngine]] = None,
+        ring_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        self.recent: Deque[Dict[str, Any]] = deque(
+            maxlen=ring_size or settings.api_call_log_ring_size
+        )
+        self.writer: Optional[BulkInsertWriter] = None
+        if persist:
+            self.writer = BulkInsertWriter(
+                APICallLog.__table__,
+                engine=engine,
+                batch_size=batch_size or settings.history_batch_size,
+                flush_interval=flush_interval or settings.history_flush_interval_seconds,
+            )
+        self.recorded = 0
+        self.ring_only = 0
+
+    def record(
+        self,
+        service: str,
+        endpoint: str,
+        *,
+        status_code: Optional[int],
+        duration_ms: float,
+        error: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        method: str = "GET",
+    ) -> None:
+        row = {
+            "created_at": datetime.now(timezone.utc),
+            "service": service[:50],
+            "endpoint": endpoint[:255],
+            "request_method": method,
+            "status_code": status_code,
+            "duration_ms": duration_ms,
+            "error": error,
+            "meta": meta or None,
+        }
+        self.recent.append(row)
+        self.recorded += 1
+        writer = self.writer
+        if writer is not None:
+            if writer.pending < writer.max_pending:
+                writer.enqueue((row,))
+            else:
+                self.ring_only += 1
+
+    def recent_calls(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        rows = list(self.recent)
+        return rows[-limit:] if limit else rows
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-service call count, error count and mean latency over the ring."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for row in self.recent:
+            s = out.setdefault(row["service"], {"calls": 0, "errors": 0, "total_ms": 0.0})
+            s["calls"] += 1
+            status = row["status_code"]
+            if status is None or status >= 500:
+                s["errors"] += 1
+            s["total_ms"] += row["duration_ms"]
+        for s in out.values():
+            s["mean_ms"] = s.pop("total_ms") / s["calls"]
+        return out
+
+    def start(self) -> None:
+        if self.writer is not None:
+            self.writer.start()
+
+    async def stop(self) -> None:
+        if self.writer is not None:
+            await self.writer.stop()
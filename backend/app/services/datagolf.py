@@ -6,6 +6,7 @@ import httpx
 
 from app.core.config import settings
 from app.schemas.datagolf import DGTournament, DGPlayerPred, DGEventPreds
+from app.services._http import acquire_client, http_get_with_retry
 
 
 class DataGolfError(RuntimeError):
@@ -14,32 +15,30 @@ class DataGolfError(RuntimeError):
 
 class DataGolfService:
     def __init__(
-        self, base_url: Optional[str] = None, api_key: Optional[str] = None
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
     ) -> None:
         self.base_url = base_url or settings.datagolf_base_url
         self.api_key = api_key or settings.datagolf_api_key
         if not self.api_key:
             raise DataGolfError("DATAGOLF_API_KEY is required")
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=20.0,
-            headers={"User-Agent": "polymarket-edge/0.1"},
-        )
+        self._client, self._owns_client = acquire_client(self.base_url, client)
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._owns_client:
+            await self._client.aclose()
 
     async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         p = params.copy() if params else {}
         p["key"] = self.api_key
-        resp = await self._client.get(path, params=p)
+        resp = await http_get_with_retry(self._client, path, p, service="datagolf")
         try:
             resp.raise_for_status()
         except httpx.HTTPStatusError as exc:
             detail = exc.response.text
-            raise DataGolfError(
-                f"DataGolf error {exc.response.status_code}: {detail}"
-            ) from exc
+            raise DataGolfError(f"DataGolf error {exc.response.status_code}: {detail}") from exc
         return resp.json()
 
     async def fetch_schedule(self, tour: str = "pga") -> List[DGTournament]:
@@ -49,9 +48,7 @@ class DataGolfService:
             events.append(
                 DGTournament(
                     tour=tour,
-                    event_id=str(
-                        ev.get("event_id") or ev.get("dg_id") or ev.get("id") or ""
-                    ),
+                    event_id=str(ev.get("event_id") or ev.get("dg_id") or ev.get("id") or ""),
                     name=str(ev.get("event_name") or ev.get("name") or ""),
                     start_date=str(ev.get("start_date") or ""),
                     end_date=str(ev.get("end_date") or ""),
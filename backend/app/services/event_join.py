@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, FrozenSet, Iterable, List, Optional, Protocol, Set, Tuple
+
+from app.utils.canonical import (
+    canonical_event_key,
+    canonical_team_key,
+    normalize_free_text,
+    parse_event_title_teams,
+)
+from app.utils.sports_config import infer_team_keys
+
+# Words that separate or decorate team names and carry no identity
+_STOPWORDS = frozenset({"vs", "v", "at", "the", "fc", "game", "match", "will", "win", "beat"})
+
+# "Lakers vs. Celtics" -> "Lakers vs Celtics" so the separator split applies
+_VS_DOT_RE = re.compile(r"\b(vs?)\.(?=\s)", re.IGNORECASE)
+
+# Tokens shared by more sportsbook events than this are too common to block on
+_MAX_POSTINGS = 64
+
+
+class JoinableEvent(Protocol):
+    """Sportsbook event fields the index reads (EventLines or EventRecord)."""
+
+    sport: str
+    event_id: str
+    title: str
+    commence_time: Optional[str]
+    canonical_event_key: Optional[str]
+
+
+@dataclass(frozen=True)
+class JoinMatch:
+    event: JoinableEvent
+    method: str  # exact | teams | similarity
+    score: float = 1.0
+
+
+def _date_of(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+    except ValueError:
+        return None
+
+
+def _team_key(league: str, name: str) -> str:
+    # Resolve aliases ("lakers", "LAL") through the league roster when it is known
+    keys = infer_team_keys(league, "", name)
+    return keys[0] if len(keys) == 1 else canonical_team_key(name)
+
+
+def _team_pair(league: str, title: str) -> Optional[FrozenSet[str]]:
+    teams = parse_event_title_teams(_VS_DOT_RE.sub(r"\1", title))
+    if teams is None:
+        return None
+    pair = frozenset(_team_key(league, t) for t in teams)
+    return pair if len(pair) == 2 else None
+
+
+def _tokens(title: str) -> FrozenSet[str]:
+    return frozenset(t for t in normalize_free_text(title).split() if t not in _STOPWORDS)
+
+
+class EventJoinIndex:
+    """Finds the sportsbook event for a Polymarket event.
+
+    Built once per refresh. Lookups try, in order: the exact canonical key,
+    the unordered team pair (plus commence date when both sides have one),
+    and token-set Jaccard similarity. Similarity only compares events that
+    share a sport and at least one uncommon title token, so a lookup never
+    scans every sportsbook event.
+    """
+
+    def __init__(self, events: Iterable[JoinableEvent], min_similarity: float = 0.6) -> None:
+        self.min_similarity = min_similarity
+        self._events: List[JoinableEvent] = []
+        self._dates: List[Optional[date]] = []
+        self._tokens: List[FrozenSet[str]] = []
+        self._by_key: Dict[str, int] = {}
+        self._by_teams: Dict[Tuple[str, FrozenSet[str]], List[int]] = defaultdict(list)
+        self._postings: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for ev in events:
+            idx = len(self._events)
+            sport = ev.sport.lower()
+            self._events.append(ev)
+            self._dates.append(_date_of(ev.commence_time))
+            key = ev.canonical_event_key or canonical_event_key(ev.sport, ev.title)
+            self._by_key.setdefault(key, idx)
+            pair = _team_pair(sport, ev.title)
+            if pair is not None:
+                self._by_teams[(sport, pair)].append(idx)
+            toks = _tokens(ev.title)
+            self._tokens.append(toks)
+            for tok in toks:
+                self._postings[(sport, tok)].append(idx)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _date_ok(self, idx: int, day: Optional[date]) -> bool:
+        sb_day = self._dates[idx]
+        if day is None or sb_day is None:
+            return True
+        # Allow for timezone differences between the two sources
+        return abs((sb_day - day).days) <= 1
+
+    def _pick(self, candidates: List[int], day: Optional[date]) -> Optional[int]:
+        ok = [i for i in candidates if self._date_ok(i, day)]
+        if not ok:
+            return None
+        if day is not None:
+            dated = [i for i in ok if self._dates[i] is not None]
+            if dated:
+                return min(
+                    dated, key=lambda i: abs((self._dates[i] - day).days)  # type: ignore[operator]
+                )
+        # Without a date to disambiguate, only a unique candidate is safe
+        return ok[0] if len(ok) == 1 else None
+
+    def match(
+        self, league: Optional[str], title: str, start_time: Optional[str] = None
+    ) -> Optional[JoinMatch]:
+        if not league or not self._events:
+            return None
+        sport = league.lower()
+        day = _date_of(start_time)
+
+        idx = self._by_key.get(canonical_event_key(league, title))
+        if idx is not None and self._date_ok(idx, day):
+            return JoinMatch(self._events[idx], "exact")
+
+        pair = _team_pair(sport, title)
+        if pair is not None:
+            candidates_for_pair = self._by_teams.get((sport, pair), [])
+            idx = self._pick(candidates_for_pair, day)
+            if idx is not None:
+                return JoinMatch(self._events[idx], "teams")
+            if candidates_for_pair:
+                # Known matchup but no single fixture fits; fuzzier tiers would only guess
+                return None
+
+        toks = _tokens(title)
+        candidates: Set[int] = set()
+        for tok in toks:
+            posting = self._postings.get((sport, tok))
+            if posting and len(posting) <= _MAX_POSTINGS:
+                candidates.update(posting)
+        best: Optional[int] = None
+        best_score = 0.0
+        tied = False
+        for i in candidates:
+            if not self._date_ok(i, day):
+                continue
+            other = self._tokens[i]
+            score = len(toks & other) / len(toks | other)
+            if score > best_score:
+                best, best_score, tied = i, score, False
+            elif score == best_score:
+                tied = True
+        if best is None or tied or best_score < self.min_similarity:
+            return None
+        return JoinMatch(self._events[best], "similarity", round(best_score, 4))
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.models import MarketSnapshot, OddsLog
+from app.db.writer import BulkInsertWriter
+from app.services.book_lines import SportLines
+from app.services.pm_records import binary_prices
+from app.utils.json_codec import dumps
+
+Row = Dict[str, Any]
+
+
+def _clip(value: Optional[str], length: int) -> Optional[str]:
+    return value[:length] if value is not None else None
+
+
+def content_hash(content: Any) -> str:
+    """Stable 128-bit digest of a row's stored content (timestamps excluded)."""
+    return hashlib.blake2b(dumps(content), digest_size=16).hexdigest()
+
+
+def market_snapshot_rows(events: Iterable[Any], captured_at: datetime) -> List[Row]:
+    """One market_snapshot row per normalized Polymarket market."""
+    rows: List[Row] = []
+    for ev in events:
+        for m in ev.markets:
+            prices = binary_prices(m)
+            sport = _clip(ev.sport, 50)
+            event_id = _clip(ev.event_id, 100)
+            snapshot = {
+                "event_title": ev.title,
+                "question": m.question,
+                "slug": m.slug,
+                "outcomes": {"Yes": prices[0], "No": prices[1]} if prices else {},
+            }
+            rows.append(
+                {
+                    "captured_at": captured_at,
+                    "source": "polymarket",
+                    "sport": sport,
+                    "event_id": event_id,
+                    "market": _clip(m.market_id, 100),
+                    "price": prices[0] if prices else None,
+                    "snapshot": snapshot,
+                    "content_hash": content_hash((sport, event_id, snapshot)),
+                }
+            )
+    return rows
+
+
+def odds_log_rows(sport_lines: Iterable[SportLines], captured_at: datetime) -> List[Row]:
+    """One odds_log row per sportsbook line."""
+    rows: List[Row] = []
+    for table in sport_lines:
+        for idx, ev in enumerate(table.events):
+            sport = _clip(ev.sport, 50)
+            event_id = _clip(ev.event_id, 100)
+            for line in table.rows(idx):
+                bookmaker, market, side, american, decimal, point, fair = line
+                rows.append(
+                    {
+                        "created_at": captured_at,
+                        "sport": sport,
+                        "event_id": event_id,
+                        "bookmaker": _clip(bookmaker, 50),
+                        "market_type": _clip(market, 50),
+                        "side": _clip(side, 50),
+                        "raw_odds": {"american": american, "point": point},
+                        "normalized": {
+                            "decimal_odds": decimal,
+                            "fair_probability": fair,
+                            "fair_decimal_odds": (1.0 / fair) if fair else None,
+                        },
+                        "content_hash": content_hash((sport, event_id, line)),
+                    }
+                )
+    return rows
+
+
+class ChangeFilter:
+    """Drops rows whose content hash matches the last one written for their key.
+
+    A key is written again after ``keyframe_seconds`` even if unchanged, so
+    every series keeps a regular anchor point (0 disables deduplication).
+    Only keys present in the latest batch are remembered, which bounds the
+    map to the current market universe.
+    """
+
+    def __init__(
+        self, key: Callable[[Row], Hashable], time_column: str, keyframe_seconds: float
+    ) -> None:
+        self.key = key
+        self.time_column = time_column
+        self.keyframe_seconds = keyframe_seconds
+        self._last: Dict[Hashable, Tuple[str, datetime]] = {}
+        self.skipped = 0
+
+    def filter(self, rows: List[Row]) -> List[Row]:
+        if self.keyframe_seconds <= 0:
+            return rows
+        seen: Dict[Hashable, Tuple[str, datetime]] = {}
+        out: List[Row] = []
+        for row in rows:
+            k = self.key(row)
+            digest, ts = row["content_hash"], row[self.time_column]
+            prev = self._last.get(k)
+            if (
+                prev is not None
+                and prev[0] == digest
+                and (ts - prev[1]).total_seconds() < self.keyframe_seconds
+            ):
+                seen[k] = prev
+                self.skipped += 1
+                continue
+            seen[k] = (digest, ts)
+            out.append(row)
+        self._last = seen
+        return out
+
+
+class HistoryRecorder:
+    """Persists every refresh's inputs to market_snapshot and odds_log.
+
+    Register ``record`` as a refresher listener; it only converts and queues
+    rows, the writers insert them in the background.
+    """
+
+    def __init__(
+        self,
+        *,
+        engine: Optional[Union[Engine, AsyncEngine]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        keyframe_seconds: Optional[float] = None,
+    ) -> None:
+        batch_size = batch_size or settings.history_batch_size
+        if keyframe_seconds is None:
+            keyframe_seconds = settings.history_keyframe_seconds
+        flush_interval = flush_interval or settings.history_flush_interval_seconds
+        self.markets = BulkInsertWriter(
+            MarketSnapshot.__table__,
+            engine=engine,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+        )
+        self.lines = BulkInsertWriter(
+            OddsLog.__table__,
+            engine=engine,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+        )
+
+        self.market_changes = ChangeFilter(
+            lambda r: (r["source"], r["event_id"], r["market"]), "captured_at", keyframe_seconds
+        )
+        self.line_changes = ChangeFilter(
+            lambda r: (r["sport"], r["event_id"], r["bookmaker"], r["market_type"], r["side"]),
+            "created_at",
+            keyframe_seconds,
+        )
+
+    def record(self, engine: Any, snapshot: Any) -> None:
+        captured_at = snapshot.as_of
+        markets = market_snapshot_rows(getattr(engine, "last_events", []), captured_at)
+        lines = odds_log_rows(getattr(engine, "last_sport_lines", []), captured_at)
+        self.markets.enqueue(self.market_changes.filter(markets))
+        self.lines.enqueue(self.line_changes.filter(lines))
+
+    def start(self) -> None:
+        self.markets.start()
+        self.lines.start()
+
+    async def flush(self) -> None:
+        await self.markets.flush()
+        await self.lines.flush()
+
+    async def stop(self) -> None:
+        await self.markets.stop()
+        await self.lines.stop()
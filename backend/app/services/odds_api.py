@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
 import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import httpx
+import numpy as np
 
 from app.core.config import settings
-from app.schemas.odds_api import BookLine, EventLines
-from app.utils.odds import american_to_decimal
-from app.services._http import http_get_with_retry
+from app.schemas.odds_api import EventLines
+from app.services.book_lines import H2H, SportLines, SportLinesBuilder
+from app.utils import odds_batch
+from app.services._cache import TTLCache
+from app.services._http import acquire_client, http_get_with_retry, replaying
+from app.services._metrics import span
 from app.utils.canonical import canonical_event_key
 
 
@@ -18,53 +23,99 @@ class OddsAPIError(RuntimeError):
         self.status_code = status_code
 
 
-def _vig_removed_pair(p1: float, p2: float) -> tuple[float, float]:
-    total = p1 + p2
-    if total <= 0:
-        return 0.0, 0.0
-    return p1 / total, p2 / total
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    raw = headers.get(name)
+    if raw is None:
+        return None
+    try:
+        return int(float(raw))
+    except ValueError:
+        return None
 
 
-class _TTLCache:
-    def __init__(self, ttl_seconds: int) -> None:
-        self.ttl = ttl_seconds
-        self._store: Dict[Tuple[str, ...], Tuple[float, Any]] = {}
+@dataclass
+class OddsAPIQuota:
+    """Request credits reported by the Odds API on every response.
+
+    The balance only changes when a response arrives, so an exhausted reading
+    expires after ``ODDS_API_QUOTA_RECHECK_SECONDS``; the next fan-out then
+    sends a single probe request whose headers refresh it.
+    """
+
+    remaining: Optional[int] = None
+    used: Optional[int] = None
+    last_cost: Optional[int] = None
+    # time.monotonic() of the last header reading
+    updated_at: Optional[float] = None
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        remaining = _int_header(headers, "x-requests-remaining")
+        if remaining is None:
+            return
+        self.remaining = remaining
+        self.used = _int_header(headers, "x-requests-used")
+        self.last_cost = _int_header(headers, "x-requests-last")
+        self.updated_at = time.monotonic()
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self.updated_at is not None
+            and time.monotonic() - self.updated_at >= settings.odds_api_quota_recheck_seconds
+        )
+
+    @property
+    def exhausted(self) -> bool:
+        return (
+            self.remaining is not None
+            and self.remaining <= settings.odds_api_quota_floor
+            and not self.stale
+        )
+
+    @property
+    def low(self) -> bool:
+        return self.remaining is not None and self.remaining <= settings.odds_api_quota_low
+
+    def allowed_concurrency(self, requested: int) -> int:
+        if self.exhausted:
+            return 0
+        if self.low:
+            return 1
+        return max(1, requested)
+
+    def as_dict(self) -> Dict[str, Optional[int]]:
+        return {"remaining": self.remaining, "used": self.used, "last_cost": self.last_cost}
 
-    def get(self, key: Tuple[str, ...]) -> Optional[Any]:
-        now = time.time()
-        if key in self._store:
-            ts, val = self._store[key]
-            if now - ts <= self.ttl:
-                return val
-            del self._store[key]
-        return None
 
-    def set(self, key: Tuple[str, ...], val: Any) -> None:
-        self._store[key] = (time.time(), val)
+# Credits are per API key, so the view is shared by every service instance
+quota = OddsAPIQuota()
 
 
 class OddsAPIService:
     def __init__(
-        self, base_url: Optional[str] = None, api_key: Optional[str] = None
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
     ) -> None:
         self.base_url = base_url or settings.odds_api_base_url
-        self.api_key = api_key or settings.odds_api_key
+        # Recordings need no credentials
+        self.api_key = api_key or settings.odds_api_key or ("replay" if replaying() else None)
         if not self.api_key:
             raise OddsAPIError("ODDS_API_KEY is required", status_code=503)
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=20.0,
-            headers={"User-Agent": "polymarket-edge/0.1"},
-        )
-        self._cache = _TTLCache(ttl_seconds=settings.refresh_interval_seconds)
+        self._client, self._owns_client = acquire_client(self.base_url, client)
+        self._cache = TTLCache("odds_api", ttl_seconds=settings.refresh_interval_seconds)
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._owns_client:
+            await self._client.aclose()
 
     async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         p = params.copy() if params else {}
         p["apiKey"] = self.api_key
-        resp = await http_get_with_retry(self._client, path, p)
+        with span("odds_api.fetch"):
+            resp = await http_get_with_retry(self._client, path, p, service="odds_api")
+        quota.update_from_headers(resp.headers)
         try:
             resp.raise_for_status()
         except httpx.HTTPStatusError as exc:
@@ -73,9 +124,15 @@ class OddsAPIService:
                 f"Odds API error {resp.status_code}: {detail}",
                 status_code=resp.status_code,
             ) from exc
-        return resp.json()
+        with span("odds_api.decode"):
+            return resp.json()
 
     async def fetch_sport_odds(self, sport_key: str) -> List[EventLines]:
+        """API models for one sport; the pipeline uses ``fetch_sport_table`` instead."""
+        table = await self.fetch_sport_table(sport_key)
+        return table.to_event_lines()
+
+    async def fetch_sport_table(self, sport_key: str) -> SportLines:
         params: Dict[str, Any] = {
             "regions": settings.odds_api_regions,
             "markets": settings.odds_api_markets,
@@ -91,22 +148,37 @@ class OddsAPIService:
             params.get("markets", ""),
             params.get("bookmakers", ""),
         )
-        cached = self._cache.get(cache_key)
-        if cached is not None:
-            return cached
+        return await self._cache.get_or_load(
+            cache_key, lambda: self._load_sport_odds(sport_key, params)
+        )
 
+    async def _load_sport_odds(self, sport_key: str, params: Dict[str, Any]) -> SportLines:
         data = await self._get(f"/sports/{sport_key}/odds", params=params)
         if not isinstance(data, list):
-            raise OddsAPIError(
-                "Unexpected odds response shape; expected list.", status_code=503
-            )
-
-        results: List[EventLines] = []
+            raise OddsAPIError("Unexpected odds response shape; expected list.", status_code=503)
+        with span("odds_api.parse"):
+            table, two_way = self._build_table(sport_key, data)
+        with span("odds_api.devig"):
+            table.decimal = odds_batch.american_to_decimal(table.american)
+            if two_way and len(table):
+                _annotate_h2h_fair(table, two_way)
+        return table
+
+    def _build_table(
+        self, sport_key: str, data: List[Any]
+    ) -> Tuple[SportLines, List[Tuple[int, str, str, int, int]]]:
+        # Collect every line into columns, then convert odds and remove vig for
+        # the whole sport in array operations instead of per line.
+        builder = SportLinesBuilder()
+        two_way: List[Tuple[int, str, str, int, int]] = []
         for ev in data:
-            eid = str(
-                ev.get("id") or ev.get("event_id") or ev.get("commence_time") or ""
+            eid = str(ev.get("id") or ev.get("event_id") or ev.get("commence_time") or "")
+            rec = builder.start_event(
+                sport_key,
+                eid,
+                str(ev.get("title") or ev.get("home_team") or ""),
+                commence_time=ev.get("commence_time") or None,
             )
-            lines: List[BookLine] = []
             bookmakers = ev.get("bookmakers") or []
 
             per_side_h2h: Dict[str, Tuple[str, int]] = {}
@@ -121,10 +193,7 @@ class OddsAPIService:
                         side = str(o.get("name") or o.get("description") or "")
                         american = o.get("price")
                         point = None
-                        if (
-                            mk_key in ("spreads", "totals")
-                            and o.get("point") is not None
-                        ):
+                        if mk_key in ("spreads", "totals") and o.get("point") is not None:
                             try:
                                 point = float(o.get("point"))
                             except Exception:
@@ -135,6 +204,8 @@ class OddsAPIService:
                             american = int(american)
                         except Exception:
                             continue
+                        if american == 0:
+                            continue
                         if mk_key == "h2h":
                             if side not in per_side_h2h:
                                 per_side_h2h[side] = (bkey, american)
@@ -142,71 +213,51 @@ class OddsAPIService:
                                 current_b, current = per_side_h2h[side]
                                 pick_b, pick = current_b, current
                                 if (
-                                    (
-                                        american < 0
-                                        and current < 0
-                                        and american < current
-                                    )
-                                    or (
-                                        american > 0
-                                        and current > 0
-                                        and american < current
-                                    )
+                                    (american < 0 and current < 0 and american < current)
+                                    or (american > 0 and current > 0 and american < current)
                                     or (american < 0 and current > 0)
                                 ):
                                     pick_b, pick = bkey, american
                                 per_side_h2h[side] = (pick_b, pick)
-                        lines.append(
-                            BookLine(
-                                bookmaker=bkey,
-                                market=mk_key,
-                                side=side,
-                                american_odds=american,
-                                decimal_odds=american_to_decimal(american),
-                                point=point,
-                            )
-                        )
-
-            selected_bookmaker: Optional[str] = None
-            event_title: str = str(ev.get("title") or ev.get("home_team") or "")
+                        builder.add_line(bkey, mk_key, side, american, point)
+
             if len(per_side_h2h) == 2:
                 sides = list(per_side_h2h.keys())
                 (b1, a_1), (b2, a_2) = per_side_h2h[sides[0]], per_side_h2h[sides[1]]
-                selected_bookmaker = f"{b1}|{b2}"
+                rec.selected_bookmaker = f"{b1}|{b2}"
                 # Always construct a canonical H2H title from sides to ensure join alignment
-                event_title = f"{sides[0]} vs {sides[1]}"
-
-                def implied_from_american(a: int) -> float:
-                    dec = american_to_decimal(a)
-                    return 1.0 / dec
-
-                p1 = implied_from_american(a_1)
-                p2 = implied_from_american(a_2)
-                f1, f2 = _vig_removed_pair(p1, p2)
-
-                for bl in lines:
-                    if bl.market != "h2h":
-                        continue
-                    if bl.side == sides[0]:
-                        bl.fair_probability = f1
-                        bl.fair_decimal_odds = (1.0 / f1) if f1 > 0 else None
-                    elif bl.side == sides[1]:
-                        bl.fair_probability = f2
-                        bl.fair_decimal_odds = (1.0 / f2) if f2 > 0 else None
-
-            results.append(
-                EventLines(
-                    sport=sport_key,
-                    event_id=eid,
-                    title=event_title,
-                    lines=lines,
-                    canonical_event_key=canonical_event_key(sport_key, event_title),
-                    selected_bookmaker=selected_bookmaker,
-                )
-            )
-
-        self._cache.set(cache_key, results)
-        return results
+                rec.title = f"{sides[0]} vs {sides[1]}"
+                two_way.append((len(builder.events) - 1, sides[0], sides[1], a_1, a_2))
+            rec.canonical_event_key = canonical_event_key(sport_key, rec.title)
+
+        return builder.build(), two_way
+
+
+def _annotate_h2h_fair(table: SportLines, two_way: List[Tuple[int, str, str, int, int]]) -> None:
+    """Fill ``fair_probability`` on the H2H lines of each two-way event."""
+    n_events = len(table.events)
+    side_a = np.full(n_events, -1, dtype=np.int32)
+    side_b = np.full(n_events, -1, dtype=np.int32)
+    fair_a = np.full(n_events, np.nan)
+    fair_b = np.full(n_events, np.nan)
+
+    idx = np.array([t[0] for t in two_way], dtype=np.int32)
+    fair = odds_batch.remove_vig(
+        odds_batch.implied_probability_from_american([[t[3], t[4]] for t in two_way]),
+        settings.odds_vig_method,
+    )
+    side_a[idx] = [table.sides.get(t[1]) for t in two_way]
+    side_b[idx] = [table.sides.get(t[2]) for t in two_way]
+    fair_a[idx] = fair[:, 0]
+    fair_b[idx] = fair[:, 1]
+
+    ev = table.event
+    is_h2h = table.market == table.markets.get(H2H)
+    table.fair_probability = np.where(
+        is_h2h & (table.side == side_a[ev]),
+        fair_a[ev],
+        np.where(is_h2h & (table.side == side_b[ev]), fair_b[ev], np.nan),
+    )
 
 
 async def main_smoke() -> None:
@@ -1,124 +1,269 @@
 from __future__ import annotations
 
-from typing import List, Dict
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime, timezone
 
 from app.schemas.opportunity import Opportunity
+from app.services.book_lines import EventRecord, SportLines
+from app.services.event_join import EventJoinIndex, JoinMatch
+from app.services.pm_records import binary_prices
 from app.services.polymarket import PolymarketService
+from app.services import odds_api as odds_api_mod
+from app.services._http import replaying
+from app.services._metrics import observe_stage, span
 from app.services.odds_api import OddsAPIService, OddsAPIError
 from app.core.config import settings
 from app.utils.canonical import canonical_event_key
 from app.utils.sports_config import infer_league_from_fields, infer_team_keys
 
 
+@dataclass
+class OpportunityDelta:
+    """What one fetch_opportunities() call changed relative to the previous call."""
+
+    added: List[Opportunity] = field(default_factory=list)
+    updated: List[Opportunity] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+def _sb_event_key(ev: Any) -> Tuple[str, str]:
+    # Same-matchup games share a canonical key; the Odds API id tells them apart
+    return (ev.sport, ev.event_id)
+
+
 class OpportunityEngine:
+    """Joins Polymarket markets with sportsbook fair probabilities.
+
+    An instance remembers the inputs behind each opportunity, so calling
+    ``fetch_opportunities`` repeatedly on the same engine only rebuilds
+    opportunities whose market price, event or sportsbook line moved.
+    """
+
+    def __init__(self) -> None:
+        self._events: Dict[str, Tuple[Tuple[Any, ...], Optional[str], str]] = {}
+        self._markets: Dict[str, Tuple[Tuple[Any, ...], Opportunity]] = {}
+        self._sb_fair: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.last_delta: Optional[OpportunityDelta] = None
+        # Raw inputs of the last call, for history persistence
+        self.last_events: List[Any] = []
+        self.last_sport_lines: List[SportLines] = []
+
+    async def _fetch_sport_lines(
+        self, sb: OddsAPIService, sport_keys: List[str]
+    ) -> List[SportLines]:
+        """Fetch every sport concurrently, throttled by the Odds API credit balance."""
+        quota = odds_api_mod.quota
+        limit = quota.allowed_concurrency(settings.odds_api_concurrency)
+        if limit == 0:
+            return []
+        sem = asyncio.Semaphore(limit)
+        serial = asyncio.Lock()
+
+        async def fetch(sk: str) -> Optional[SportLines]:
+            async with sem:
+                # Earlier responses in this fan-out may have drained the balance
+                if quota.exhausted:
+                    return None
+                try:
+                    if quota.low:
+                        async with serial:
+                            return await sb.fetch_sport_table(sk)
+                    return await sb.fetch_sport_table(sk)
+                except OddsAPIError:
+                    return None
+
+        results = await asyncio.gather(*(fetch(sk) for sk in sport_keys))
+        return [table for table in results if table is not None]
+
     async def fetch_opportunities(self, include_non_sports: bool = False) -> List[Opportunity]:
         # Fetch PM
         pm = PolymarketService()
         try:
-            events = await pm.fetch_events_with_binary_markets()
+            with span("engine.polymarket"):
+                events = await pm.fetch_event_records()
         finally:
             await pm.close()
 
         # Attempt sportsbook fair probs for configured sports if any
-        sb_fair: Dict[str, Dict[str, float]] = {}
+        sb_fair: Dict[Tuple[str, str], Dict[str, float]] = {}
+        sport_lines: List[SportLines] = []
+        fair_events: List[EventRecord] = []
         try:
             sport_keys = sorted({(e.sport or "").lower() for e in events if e.sport})
-            if sport_keys and settings.odds_api_key:
+            if sport_keys and (settings.odds_api_key or replaying()):
                 sb = OddsAPIService()
                 try:
-                    for sk in sport_keys:
-                        try:
-                            lines = await sb.fetch_sport_odds(sk)
-                        except OddsAPIError:
-                            continue
-                        for ev in lines:
+                    with span("engine.odds"):
+                        sport_lines = await self._fetch_sport_lines(sb, sport_keys)
+                    for table in sport_lines:
+                        for idx, ev in enumerate(table.events):
                             if not ev.canonical_event_key:
                                 ev.canonical_event_key = canonical_event_key(ev.sport, ev.title)
-                            probs: Dict[str, float] = {}
-                            for bl in ev.lines:
-                                if bl.market == "h2h" and bl.fair_probability is not None:
-                                    probs[bl.side] = bl.fair_probability
+                            probs = table.h2h_fair(idx)
                             if len(probs) == 2:
-                                sb_fair[ev.canonical_event_key] = probs
+                                sb_fair[_sb_event_key(ev)] = probs
+                                fair_events.append(ev)
                 finally:
                     await sb.close()
         except Exception:
             sb_fair = {}
+            sport_lines = []
+            fair_events = []
+        with span("engine.join_index"):
+            join_index = EventJoinIndex(fair_events)
 
         now_iso = datetime.now(timezone.utc).isoformat()
+        fee = max(0.0, min(settings.fee_cushion, 1.0))
+        # Sportsbook events whose fair probabilities moved (or appeared/vanished)
+        changed_sb = {
+            k for k in set(sb_fair) | set(self._sb_fair) if sb_fair.get(k) != self._sb_fair.get(k)
+        }
+        delta = OpportunityDelta()
+        markets: Dict[str, Tuple[Tuple[Any, ...], Opportunity]] = {}
+        events_state: Dict[str, Tuple[Tuple[Any, ...], Optional[str], str]] = {}
         opps: List[Opportunity] = []
+        # Joining and EV computation interleave per market; timed as one stage
+        evaluate_started = time.perf_counter()
         for ev in events:
-            league_code = ev.sport
-            if not league_code:
-                league_code = infer_league_from_fields(
-                    question=" ".join(m.question for m in ev.markets),
-                    title=ev.title,
-                    ticker=ev.ticker,
-                )
+            ev_fp: Tuple[Any, ...] = (ev.sport, ev.title, ev.ticker)
+            if not ev.sport:
+                ev_fp += tuple(m.question for m in ev.markets)
+            cached_ev = self._events.get(ev.event_id)
+            if cached_ev is not None and cached_ev[0] == ev_fp:
+                _, league_code, ce_key = cached_ev
+            else:
+                league_code = ev.sport
+                if not league_code:
+                    league_code = infer_league_from_fields(
+                        question=" ".join(m.question for m in ev.markets),
+                        title=ev.title,
+                        ticker=ev.ticker,
+                    )
+                ce_key = canonical_event_key(league_code, ev.title)
+            events_state[ev.event_id] = (ev_fp, league_code, ce_key)
             if not include_non_sports and not league_code:
                 # Filter out if still not identified as sports
                 continue
 
+            match = join_index.match(league_code, ev.title, getattr(ev, "start_time", None))
+            sb_key = _sb_event_key(match.event) if match else None
             for m in ev.markets:
-                yes = next((o for o in m.outcomes if o.name.lower() == "yes"), None)
-                no = next((o for o in m.outcomes if o.name.lower() == "no"), None)
-                if not yes or not no:
+                prices = binary_prices(m)
+                if prices is None:
                     continue
-                p_true_pm = yes.price
+                p_true_pm = prices[0]
+                opp_id = f"polymarket:{m.market_id}"
+                fp = (ev.event_id, league_code, ce_key, sb_key, m.question, p_true_pm, fee)
+                prev = self._markets.get(opp_id)
+                if prev is not None and prev[0] == fp and sb_key not in changed_sb:
+                    # Inputs unchanged: reuse the previous result, only re-stamp freshness
+                    opp = prev[1].model_copy(update={"updated_at": now_iso})
+                    delta.unchanged += 1
+                else:
+                    built = self._build_opportunity(
+                        opp_id,
+                        ev,
+                        m,
+                        league_code,
+                        ce_key,
+                        p_true_pm,
+                        fee,
+                        sb_fair,
+                        match,
+                        now_iso,
+                    )
+                    if built is None:
+                        continue
+                    opp = built
+                    (delta.updated if prev is not None else delta.added).append(opp)
+                markets[opp_id] = (fp, opp)
+                opps.append(opp)
 
-                fee = max(0.0, min(settings.fee_cushion, 1.0))
-                denom = (1.0 - fee) if (1.0 - fee) > 0 else 1.0
-                raw_price = max(0.0, min(1.0, p_true_pm / denom))
+        observe_stage("engine.evaluate", time.perf_counter() - evaluate_started)
 
-                price = raw_price
-                if price <= 0 or p_true_pm < 0 or p_true_pm > 1:
-                    continue
-
-                ce_key = canonical_event_key(league_code, ev.title)
-                ev_usd = 0.0
-                ev_percent = 0.0
-                basis = "none"
-                sources: List[str] = []
-                inputs = {"pm_price": price, "pm_yes_probability": p_true_pm, "fee_cushion": fee}
-                source_attr: Dict[str, str] = {}
-                calc_notes = None
-
-                probs = sb_fair.get(ce_key)
-                if probs:
-                    p_true = max(probs.values()) if probs else None
-                    if p_true is not None and 0.0 < p_true < 1.0:
-                        ev_usd = p_true * (1.0 - price) - (1.0 - p_true) * price
-                        ev_percent = (ev_usd / price) * 100.0 if price > 0 else 0.0
-                        basis = "sportsbook_fair"
-                        sources = ["odds_api"]
-                        inputs["sb_fair_probs"] = probs
-                        calc_notes = "EV computed using sportsbook fair probability against PM price"
-
-                opps.append(
-                    Opportunity(
-                        id=f"polymarket:{m.market_id}",
-                        source="polymarket",
-                        title=m.question,
-                        sport=league_code,
-                        event_id=ev.event_id,
-                        market_id=m.market_id,
-                        canonical_event_key=ce_key,
-                        yes_probability=p_true_pm,
-                        price=price,
-                        ev_usd_per_share=ev_usd,
-                        ev_percent=ev_percent,
-                        comparison_basis=basis,
-                        comparison_sources=sources,
-                        source_attribution=source_attr,
-                        inputs=inputs,
-                        calc_notes=calc_notes,
-                        updated_at=now_iso,
-                    )
-                )
+        delta.removed = [oid for oid in self._markets if oid not in markets]
+        self._markets = markets
+        self._events = events_state
+        self._sb_fair = sb_fair
+        self.last_delta = delta
+        self.last_events = events
+        self.last_sport_lines = sport_lines
         opps.sort(key=lambda o: (o.ev_percent or -1e9), reverse=True)
         return opps
 
+    def _build_opportunity(
+        self,
+        opp_id: str,
+        ev: Any,
+        m: Any,
+        league_code: Optional[str],
+        ce_key: str,
+        p_true_pm: float,
+        fee: float,
+        sb_fair: Dict[Tuple[str, str], Dict[str, float]],
+        match: Optional[JoinMatch],
+        now_iso: str,
+    ) -> Optional[Opportunity]:
+        denom = (1.0 - fee) if (1.0 - fee) > 0 else 1.0
+        raw_price = max(0.0, min(1.0, p_true_pm / denom))
+
+        price = raw_price
+        if price <= 0 or p_true_pm < 0 or p_true_pm > 1:
+            return None
+
+        ev_usd = 0.0
+        ev_percent = 0.0
+        basis = "none"
+        sources: List[str] = []
+        inputs = {"pm_price": price, "pm_yes_probability": p_true_pm, "fee_cushion": fee}
+        source_attr: Dict[str, Any] = {}
+        calc_notes = None
+
+        probs = sb_fair.get(_sb_event_key(match.event)) if match else None
+        if probs:
+            p_true = max(probs.values()) if probs else None
+            if p_true is not None and 0.0 < p_true < 1.0:
+                ev_usd = p_true * (1.0 - price) - (1.0 - p_true) * price
+                ev_percent = (ev_usd / price) * 100.0 if price > 0 else 0.0
+                basis = "sportsbook_fair"
+                sources = ["odds_api"]
+                inputs["sb_fair_probs"] = probs
+                calc_notes = "EV computed using sportsbook fair probability against PM price"
+                source_attr = {
+                    "odds_api_event_id": match.event.event_id,
+                    "join_method": match.method,
+                }
+                if match.method == "similarity":
+                    source_attr["join_score"] = match.score
+
+        return Opportunity(
+            id=opp_id,
+            source="polymarket",
+            title=m.question,
+            sport=league_code,
+            event_id=ev.event_id,
+            market_id=m.market_id,
+            canonical_event_key=ce_key,
+            yes_probability=p_true_pm,
+            price=price,
+            ev_usd_per_share=ev_usd,
+            ev_percent=ev_percent,
+            comparison_basis=basis,
+            comparison_sources=sources,
+            source_attribution=source_attr,
+            inputs=inputs,
+            calc_notes=calc_notes,
+            updated_at=now_iso,
+        )
+
 
 async def main_smoke() -> None:
     eng = OpportunityEngine()
@@ -129,6 +274,4 @@ async def main_smoke() -> None:
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(main_smoke())
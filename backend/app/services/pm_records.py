@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+from app.schemas.polymarket import PMEvent, PMMarket, PMOutcome
+
+
+@dataclass(slots=True)
+class PMMarketRecord:
+    """Normalized binary market, without Pydantic overhead."""
+
+    market_id: str
+    event_id: Optional[str]
+    question: str
+    slug: Optional[str]
+    yes_price: float
+    no_price: float
+
+    def to_model(self) -> PMMarket:
+        # Values were validated during normalization; skip re-validation
+        return PMMarket.model_construct(
+            market_id=self.market_id,
+            event_id=self.event_id,
+            question=self.question,
+            slug=self.slug,
+            outcomes=[
+                PMOutcome.model_construct(name="Yes", price=self.yes_price),
+                PMOutcome.model_construct(name="No", price=self.no_price),
+            ],
+        )
+
+
+@dataclass(slots=True)
+class PMEventRecord:
+    event_id: str
+    title: str
+    sport: Optional[str] = None
+    ticker: Optional[str] = None
+    slug: Optional[str] = None
+    start_time: Optional[str] = None
+    markets: List[PMMarketRecord] = field(default_factory=list)
+
+    def to_model(self) -> PMEvent:
+        return PMEvent.model_construct(
+            event_id=self.event_id,
+            sport=self.sport,
+            title=self.title,
+            ticker=self.ticker,
+            slug=self.slug,
+            start_time=self.start_time,
+            markets=[m.to_model() for m in self.markets],
+        )
+
+
+def binary_prices(market: Any) -> Optional[Tuple[float, float]]:
+    """(yes, no) prices of a PMMarketRecord or a PMMarket model."""
+    if isinstance(market, PMMarketRecord):
+        return market.yes_price, market.no_price
+    yes = next((o for o in market.outcomes if o.name.lower() == "yes"), None)
+    no = next((o for o in market.outcomes if o.name.lower() == "no"), None)
+    if not yes or not no:
+        return None
+    return yes.price, no.price
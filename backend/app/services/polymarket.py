@@ -3,59 +3,98 @@ from __future__ import annotations
 import asyncio
 import time
 from collections import defaultdict
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set
 import datetime as dt
 
 import httpx
 
 from app.core.config import settings
-from app.schemas.polymarket import PMEvent, PMMarket, PMOutcome
+from app.schemas.polymarket import PMEvent
 from app.utils.odds import apply_fee_to_probability, clamp
-from app.services._http import http_get_with_retry
+from app.services._cache import TTLCache
+from app.services._http import acquire_client, http_get_with_retry
+from app.services._metrics import observe_stage, span
+from app.services.pm_records import PMEventRecord, PMMarketRecord
+from app.utils.json_stream import JSONArrayItemDecoder
 
 
 class PolymarketAPIError(RuntimeError):
     pass
 
 
-class _TTLCache:
-    def __init__(self, ttl_seconds: int) -> None:
-        self.ttl = ttl_seconds
-        self._store: Dict[Tuple[str, ...], Tuple[float, Any]] = {}
-
-    def get(self, key: Tuple[str, ...]) -> Optional[Any]:
-        now = time.time()
-        if key in self._store:
-            ts, val = self._store[key]
-            if now - ts <= self.ttl:
-                return val
-            del self._store[key]
-        return None
-
-    def set(self, key: Tuple[str, ...], val: Any) -> None:
-        self._store[key] = (time.time(), val)
+# Fields the normalization pipeline reads from a raw /markets item
+_MARKET_FIELDS = (
+    "id",
+    "marketId",
+    "slug",
+    "question",
+    "title",
+    "name",
+    "eventName",
+    "archived",
+    "closed",
+    "endDate",
+    "endDateIso",
+    "endTime",
+    "gameStartTime",
+    "outcomes",
+    "outcomePrices",
+    "lastTradePrice",
+    "bestBid",
+    "bestAsk",
+    "tags",
+    "eventTags",
+    "sportsTags",
+)
+_EVENT_FIELDS = (
+    "id",
+    "slug",
+    "eventId",
+    "title",
+    "name",
+    "ticker",
+    "startDate",
+    "startTime",
+    "tags",
+    "eventTags",
+    "sportsTags",
+)
+
+
+def _project_market(m: Any) -> Any:
+    """Keep only the fields normalization needs so the raw page can be freed."""
+    if not isinstance(m, dict):
+        return m
+    out = {k: m[k] for k in _MARKET_FIELDS if k in m}
+    ev_list = m.get("events")
+    if isinstance(ev_list, list) and ev_list:
+        ev0 = ev_list[0]
+        if isinstance(ev0, dict):
+            ev0 = {k: ev0[k] for k in _EVENT_FIELDS if k in ev0}
+        out["events"] = [ev0]
+    elif ev_list is not None:
+        out["events"] = ev_list
+    return out
 
 
 class PolymarketService:
     def __init__(
-        self, base_url: Optional[str] = None, fee_cushion: Optional[float] = None
+        self,
+        base_url: Optional[str] = None,
+        fee_cushion: Optional[float] = None,
+        client: Optional[httpx.AsyncClient] = None,
     ) -> None:
         self.base_url = base_url or settings.polymarket_base_url
-        self.fee_cushion = (
-            fee_cushion if fee_cushion is not None else settings.fee_cushion
-        )
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=20.0,
-            headers={"User-Agent": "polymarket-edge/0.1"},
-        )
-        self._cache = _TTLCache(ttl_seconds=settings.refresh_interval_seconds)
+        self.fee_cushion = fee_cushion if fee_cushion is not None else settings.fee_cushion
+        self._client, self._owns_client = acquire_client(self.base_url, client)
+        self._cache = TTLCache("polymarket", ttl_seconds=settings.refresh_interval_seconds)
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._owns_client:
+            await self._client.aclose()
 
     async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
-        resp = await http_get_with_retry(self._client, path, params)
+        resp = await http_get_with_retry(self._client, path, params, service="polymarket")
         return resp.json()
 
     def _extract_markets_array(self, data: Any) -> List[Dict[str, Any]]:
@@ -68,9 +107,9 @@ class PolymarketService:
         )
 
     async def fetch_sports_map(self) -> Dict[str, str]:
-        cached = self._cache.get(("sports",))
-        if cached is not None:
-            return cached
+        return await self._cache.get_or_load(("sports",), self._load_sports_map)
+
+    async def _load_sports_map(self) -> Dict[str, str]:
         data = await self._get("/sports")
         tag_to_code: Dict[str, str] = {}
         items: List[Dict[str, Any]] = []
@@ -80,18 +119,13 @@ class PolymarketService:
             items = data["sports"]  # type: ignore[index]
         for s in items:
             tid = str(
-                s.get("id")
-                or s.get("tagId")
-                or s.get("tag_id")
-                or s.get("tag")
-                or ""
+                s.get("id") or s.get("tagId") or s.get("tag_id") or s.get("tag") or ""
             ).strip()
             name = str(
                 s.get("name") or s.get("key") or s.get("slug") or s.get("sport") or ""
             ).strip()
             if tid and name:
                 tag_to_code[tid] = self._normalize_sport_code(name)
-        self._cache.set(("sports",), tag_to_code)
         return tag_to_code
 
     def _normalize_sport_code(self, name: str) -> str:
@@ -111,7 +145,9 @@ class PolymarketService:
                             continue
         return tags
 
-    def _sport_code_for_market(self, m: Dict[str, Any], sports_map: Dict[str, str]) -> Optional[str]:
+    def _sport_code_for_market(
+        self, m: Dict[str, Any], sports_map: Dict[str, str]
+    ) -> Optional[str]:
         # Check market-level tags
         for t in self._extract_tags(m):
             if t in sports_map:
@@ -126,43 +162,119 @@ class PolymarketService:
         return None
 
     async def fetch_markets_paginated(
-        self, page_limit: int = 500, max_pages: int = 5
+        self,
+        page_limit: int = 500,
+        max_pages: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        project: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Fetch open markets.
+
+        With ``project`` (the default) each market is trimmed to the fields the
+        normalization pipeline reads as it is decoded; pass ``project=False``
+        for the untouched upstream payload.
+        """
+        if max_pages is None:
+            max_pages = settings.polymarket_max_pages
+        if concurrency is None:
+            concurrency = settings.polymarket_page_concurrency
+        cache_key = (
+            "markets",
+            f"limit={page_limit}",
+            f"max_pages={max_pages}",
+            "projected" if project else "raw",
+        )
+        return await self._cache.get_or_load(
+            cache_key,
+            lambda: self._fetch_markets_timed(page_limit, max_pages, concurrency, project),
+        )
+
+    async def _fetch_markets_timed(
+        self, page_limit: int, max_pages: int, concurrency: int, project: bool
     ) -> List[Dict[str, Any]]:
-        cache_key = ("markets", f"limit={page_limit}", f"max_pages={max_pages}")
-        cached = self._cache.get(cache_key)
-        if cached is not None:
-            return cached
+        with span("polymarket.fetch"):
+            return await self._load_markets(page_limit, max_pages, concurrency, project)
 
+    async def _fetch_markets_page(
+        self, page_limit: int, offset: int, project: bool = True
+    ) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"limit": str(page_limit), "closed": "false"}
+        if offset:
+            params["offset"] = str(offset)
+        # Stream the body and decode market by market so only projected dicts
+        # are retained, instead of holding the page bytes plus every raw dict.
+        resp = await http_get_with_retry(
+            self._client, "/markets", params, stream=True, service="polymarket"
+        )
+        decoder = JSONArrayItemDecoder()
+        batch: List[Dict[str, Any]] = []
+        # Decoding is interleaved with reading, so only the CPU share is summed
+        decode_seconds = 0.0
+        try:
+            async for text in resp.aiter_text():
+                started = time.perf_counter()
+                for m in decoder.feed(text):
+                    batch.append(_project_market(m) if project else m)
+                decode_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            document = decoder.close()
+            decode_seconds += time.perf_counter() - started
+        except ValueError as exc:
+            raise PolymarketAPIError(f"Malformed /markets response: {exc}") from exc
+        finally:
+            await resp.aclose()
+        if document is not None:
+            batch = self._extract_markets_array(document)
+            if project:
+                batch = [_project_market(m) for m in batch]
+        observe_stage("polymarket.decode", decode_seconds)
+        return batch
+
+    async def _load_markets(
+        self, page_limit: int, max_pages: int, concurrency: int, project: bool = True
+    ) -> List[Dict[str, Any]]:
         all_markets: List[Dict[str, Any]] = []
         seen_ids: Set[str] = set()
-        offset = 0
-        for _ in range(max_pages):
-            params: Dict[str, Any] = {"limit": str(page_limit), "closed": "false"}
-            if offset:
-                params["offset"] = str(offset)
-            data = await self._get("/markets", params=params)
-            batch = self._extract_markets_array(data)
-            if not batch:
-                break
-            new_count = 0
-            for m in batch:
-                mid = str(m.get("id") or m.get("marketId") or m.get("slug") or "")
-                if mid and mid not in seen_ids:
-                    seen_ids.add(mid)
-                    all_markets.append(m)
-                    new_count += 1
-            if len(batch) < page_limit or new_count == 0:
-                break
-            offset += page_limit
+        next_page = 0
+        # Adaptive prefetch: start with one page so small universes cost a single
+        # round trip, then double the in-flight window while pages come back full.
+        window = 1
+        done = False
+        while not done and next_page < max_pages:
+            pages = range(next_page, min(next_page + window, max_pages))
+            next_page = pages.stop
+            batches = await asyncio.gather(
+                *(self._fetch_markets_page(page_limit, p * page_limit, project) for p in pages),
+                return_exceptions=True,
+            )
+            # Consume in offset order; anything past the first short page is discarded,
+            # including errors from speculative pages beyond the end
+            for batch in batches:
+                if isinstance(batch, BaseException):
+                    raise batch
+                if not batch:
+                    done = True
+                    break
+                new_count = 0
+                for m in batch:
+                    mid = str(m.get("id") or m.get("marketId") or m.get("slug") or "")
+                    if mid and mid not in seen_ids:
+                        seen_ids.add(mid)
+                        all_markets.append(m)
+                        new_count += 1
+                if len(batch) < page_limit or new_count == 0:
+                    done = True
+                    break
+            window = min(window * 2, max(1, concurrency))
         if not all_markets:
             raise PolymarketAPIError(
                 "No markets returned from /markets (closed=false). Check API availability."
             )
-
-        self._cache.set(cache_key, all_markets)
         return all_markets
 
-    def _extract_event_info(self, m: Dict[str, Any]) -> tuple[str, str, Optional[str], Optional[str]]:
+    def _extract_event_info(
+        self, m: Dict[str, Any]
+    ) -> tuple[str, str, Optional[str], Optional[str]]:
         ev_list = m.get("events")
         if not isinstance(ev_list, list) or not ev_list:
             raise PolymarketAPIError(
@@ -181,11 +293,19 @@ class PolymarketService:
         ticker = str(ev0.get("ticker") or "").strip() or None
         eslug = str(ev0.get("slug") or "").strip() or None
         if not eid:
-            raise PolymarketAPIError(
-                "Embedded event does not contain an 'id' or 'slug'."
-            )
+            raise PolymarketAPIError("Embedded event does not contain an 'id' or 'slug'.")
         return eid, title, ticker, eslug
 
+    def _event_start_time(self, m: Dict[str, Any]) -> Optional[str]:
+        # Game start, not startDate (which is when the event was listed)
+        ev_list = m.get("events")
+        ev0 = ev_list[0] if isinstance(ev_list, list) and ev_list else None
+        raw = m.get("gameStartTime") or (ev0.get("startTime") if isinstance(ev0, dict) else None)
+        parsed = self._parse_dt(raw)
+        if parsed is None and isinstance(raw, str) and " " in raw:
+            parsed = self._parse_dt(raw.replace(" ", "T", 1))
+        return parsed.isoformat() if parsed is not None else None
+
     def _parse_dt(self, value: Any) -> Optional[dt.datetime]:
         if value is None:
             return None
@@ -206,9 +326,7 @@ class PolymarketService:
             return False
         if bool(m.get("closed")):
             return False
-        end_dt = self._parse_dt(
-            m.get("endDate") or m.get("endDateIso") or m.get("endTime")
-        )
+        end_dt = self._parse_dt(m.get("endDate") or m.get("endDateIso") or m.get("endTime"))
         if end_dt is not None:
             now = dt.datetime.now(dt.timezone.utc)
             if end_dt < now:
@@ -250,7 +368,7 @@ class PolymarketService:
                     continue
         return None
 
-    def _normalize_market(self, m: Dict[str, Any], event_id: str) -> Optional[PMMarket]:
+    def _normalize_market(self, m: Dict[str, Any], event_id: str) -> Optional[PMMarketRecord]:
         if not self._is_future_or_live(m):
             return None
         yes_prob = self._yes_probability_from_outcomes(m.get("outcomes"))
@@ -263,19 +381,21 @@ class PolymarketService:
             return None
         yes_prob = apply_fee_to_probability(yes_prob, self.fee_cushion)
         no_prob = apply_fee_to_probability(1.0 - yes_prob, self.fee_cushion)
-        outcomes = [
-            PMOutcome(name="Yes", price=yes_prob),
-            PMOutcome(name="No", price=no_prob),
-        ]
-        return PMMarket(
+        return PMMarketRecord(
             market_id=str(m.get("id") or m.get("marketId") or m.get("slug") or ""),
             event_id=event_id,
             question=str(m.get("question") or m.get("title") or m.get("name") or ""),
             slug=str(m.get("slug") or "") or None,
-            outcomes=outcomes,
+            yes_price=yes_prob,
+            no_price=no_prob,
         )
 
     async def fetch_events_with_binary_markets(self) -> List[PMEvent]:
+        """API models for every event with binary markets."""
+        return [ev.to_model() for ev in await self.fetch_event_records()]
+
+    async def fetch_event_records(self) -> List[PMEventRecord]:
+        """Events with binary markets as plain records, for the opportunity pipeline."""
         sports_map = {}
         try:
             sports_map = await self.fetch_sports_map()
@@ -283,49 +403,54 @@ class PolymarketService:
             sports_map = {}
 
         markets_raw = await self.fetch_markets_paginated()
-        grouped: Dict[str, List[PMMarket]] = defaultdict(list)
+        grouped: Dict[str, List[PMMarketRecord]] = defaultdict(list)
         titles: Dict[str, str] = {}
         event_sport: Dict[str, Optional[str]] = {}
         event_ticker: Dict[str, Optional[str]] = {}
         event_slug: Dict[str, Optional[str]] = {}
+        event_start: Dict[str, Optional[str]] = {}
 
         allowlist_raw = settings.supported_sports_allowlist.strip()
         allowlist: Optional[Set[str]] = None
         if allowlist_raw:
             allowlist = {s.strip().lower() for s in allowlist_raw.split(",") if s.strip()}
 
-        for m in markets_raw:
-            try:
-                eid, etitle, eticker, eslug = self._extract_event_info(m)
-            except PolymarketAPIError:
-                continue
-            nm = self._normalize_market(m, eid)
-            if nm:
-                sport_code = self._sport_code_for_market(m, sports_map)
-                titles.setdefault(eid, etitle)
-                event_ticker.setdefault(eid, eticker)
-                event_slug.setdefault(eid, eslug)
-                if eid not in event_sport and sport_code:
-                    event_sport[eid] = sport_code
-                grouped[eid].append(nm)
-
-        events: List[PMEvent] = []
-        for eid, mkts in grouped.items():
-            if not mkts:
-                continue
-            sport = (event_sport.get(eid) or None)
-            if allowlist is not None and (sport or "").lower() not in allowlist:
-                continue
-            events.append(
-                PMEvent(
-                    event_id=eid,
-                    title=titles.get(eid, ""),
-                    sport=sport,
-                    ticker=event_ticker.get(eid),
-                    slug=event_slug.get(eid),
-                    markets=mkts,
+        with span("polymarket.normalize"):
+            for m in markets_raw:
+                try:
+                    eid, etitle, eticker, eslug = self._extract_event_info(m)
+                except PolymarketAPIError:
+                    continue
+                nm = self._normalize_market(m, eid)
+                if nm:
+                    sport_code = self._sport_code_for_market(m, sports_map)
+                    titles.setdefault(eid, etitle)
+                    event_ticker.setdefault(eid, eticker)
+                    event_slug.setdefault(eid, eslug)
+                    if not event_start.get(eid):
+                        event_start[eid] = self._event_start_time(m)
+                    if eid not in event_sport and sport_code:
+                        event_sport[eid] = sport_code
+                    grouped[eid].append(nm)
+
+            events: List[PMEventRecord] = []
+            for eid, mkts in grouped.items():
+                if not mkts:
+                    continue
+                sport = event_sport.get(eid) or None
+                if allowlist is not None and (sport or "").lower() not in allowlist:
+                    continue
+                events.append(
+                    PMEventRecord(
+                        event_id=eid,
+                        title=titles.get(eid, ""),
+                        sport=sport,
+                        ticker=event_ticker.get(eid),
+                        slug=event_slug.get(eid),
+                        start_time=event_start.get(eid),
+                        markets=mkts,
+                    )
                 )
-            )
         return events
 
 
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, and_, case, func, or_, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import ColumnElement, Select
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.db.models import MarketSnapshot
+
+# Bucket widths in seconds; "raw" returns individual captures
+INTERVALS: Dict[str, int] = {"1m": 60, "5m": 300, "1h": 3600}
+RAW = "raw"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class epoch_seconds(FunctionElement):
+    """Whole seconds since the Unix epoch of a timestamp column."""
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(epoch_seconds)
+def _epoch_default(element: epoch_seconds, compiler: Any, **kw: Any) -> str:
+    return f"CAST(EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)}) AS BIGINT)"
+
+
+@compiles(epoch_seconds, "sqlite")
+def _epoch_sqlite(element: epoch_seconds, compiler: Any, **kw: Any) -> str:
+    return f"CAST(strftime('%s', {compiler.process(element.clauses, **kw)}) AS INTEGER)"
+
+
+def _utc(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+def _micros(ts: datetime) -> int:
+    return (_utc(ts) - _EPOCH) // timedelta(microseconds=1)
+
+
+def bucket_floor(ts: datetime, interval: str) -> datetime:
+    width = INTERVALS[interval]
+    epoch = int(_utc(ts).timestamp())
+    return datetime.fromtimestamp(epoch - epoch % width, tz=timezone.utc)
+
+
+def _market_range(
+    market_id: str, source: str, start: Optional[datetime], end: Optional[datetime]
+) -> List[ColumnElement[bool]]:
+    # Equality on market plus a captured_at range: a range scan on
+    # ix_market_snapshot_market_captured
+    t = MarketSnapshot.__table__.c
+    conds: List[ColumnElement[bool]] = [
+        t.market == market_id,
+        t.source == source,
+        t.price.is_not(None),
+    ]
+    if start is not None:
+        conds.append(t.captured_at >= _utc(start))
+    if end is not None:
+        conds.append(t.captured_at < _utc(end))
+    return conds
+
+
+def first_capture_query(
+    market_id: str,
+    *,
+    source: str = "polymarket",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Select[Any]:
+    """Earliest capture in range: an index probe that anchors each OHLC page."""
+    t = MarketSnapshot.__table__.c
+    return select(func.min(t.captured_at)).where(*_market_range(market_id, source, start, end))
+
+
+def ohlc_scan_end(
+    first: datetime, interval: str, limit: int, end: Optional[datetime] = None
+) -> datetime:
+    """Upper bound covering at most ``limit + 1`` buckets from ``first``'s bucket.
+
+    Passed as ``end`` to ``ohlc_query`` so a page scans only its own rows
+    instead of everything up to the end of the series.
+    """
+    bound = bucket_floor(first, interval) + timedelta(seconds=INTERVALS[interval] * (limit + 1))
+    return bound if end is None else min(bound, _utc(end))
+
+
+def ohlc_query(
+    market_id: str,
+    interval: str,
+    *,
+    source: str = "polymarket",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 500,
+) -> Select[Any]:
+    """One OHLC row per bucket, oldest first, at most ``limit + 1`` rows.
+
+    ``start`` doubles as the keyset cursor: pages continue from the first
+    bucket boundary after the last bucket returned. Callers paging through
+    long ranges bound ``end`` with ``ohlc_scan_end``.
+    """
+    width = INTERVALS[interval]
+    t = MarketSnapshot.__table__.c
+    bucket = (epoch_seconds(t.captured_at) // width).label("bucket")
+    ranked = (
+        select(
+            bucket,
+            t.price,
+            func.row_number()
+            .over(partition_by=bucket, order_by=(t.captured_at, t.id))
+            .label("rn_first"),
+            func.row_number()
+            .over(partition_by=bucket, order_by=(t.captured_at.desc(), t.id.desc()))
+            .label("rn_last"),
+        )
+        .where(*_market_range(market_id, source, start, end))
+        .subquery()
+    )
+    return (
+        select(
+            ranked.c.bucket,
+            func.max(case((ranked.c.rn_first == 1, ranked.c.price))).label("open"),
+            func.max(ranked.c.price).label("high"),
+            func.min(ranked.c.price).label("low"),
+            func.max(case((ranked.c.rn_last == 1, ranked.c.price))).label("close"),
+            func.count().label("samples"),
+        )
+        .group_by(ranked.c.bucket)
+        .order_by(ranked.c.bucket)
+        .limit(limit + 1)
+    )
+
+
+def raw_query(
+    market_id: str,
+    *,
+    source: str = "polymarket",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = 500,
+) -> Select[Any]:
+    """Individual captures ordered by (captured_at, id), keyset-paged by ``after``."""
+    t = MarketSnapshot.__table__.c
+    conds = _market_range(market_id, source, start, end)
+    if after is not None:
+        ts, row_id = _utc(after[0]), after[1]
+        conds.append(or_(t.captured_at > ts, and_(t.captured_at == ts, t.id > row_id)))
+    return (
+        select(t.id, t.captured_at, t.price)
+        .where(*conds)
+        .order_by(t.captured_at, t.id)
+        .limit(limit + 1)
+    )
+
+
+def ohlc_page(
+    rows: Sequence[Any], interval: str, limit: int, next_start: Optional[datetime] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Points plus the cursor for the next page (None on the last page).
+
+    The cursor is the epoch second of the bucket the next page starts at.
+
+    ``next_start`` is the first capture after a bounded scan that returned
+    ``limit`` or fewer buckets; the next page resumes at its bucket.
+    """
+    width = INTERVALS[interval]
+    points = [
+        {
+            "t": datetime.fromtimestamp(int(r.bucket) * width, tz=timezone.utc).isoformat(),
+            "open": r.open,
+            "high": r.high,
+            "low": r.low,
+            "close": r.close,
+            "samples": r.samples,
+        }
+        for r in rows[:limit]
+    ]
+    cursor = None
+    if len(rows) > limit:
+        cursor = str(int(rows[limit].bucket) * width)
+    elif next_start is not None:
+        cursor = str(int(bucket_floor(next_start, interval).timestamp()))
+    return points, cursor
+
+
+def parse_ohlc_cursor(cursor: str) -> datetime:
+    return datetime.fromtimestamp(int(cursor), tz=timezone.utc)
+
+
+def raw_page(rows: Sequence[Any], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Captures plus a ``<epoch microseconds>_<id>`` keyset cursor."""
+    points = [{"t": _utc(r.captured_at).isoformat(), "price": r.price} for r in rows[:limit]]
+    cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        cursor = f"{_micros(last.captured_at)}_{last.id}"
+    return points, cursor
+
+
+def parse_raw_cursor(cursor: str) -> Tuple[datetime, int]:
+    micros, _, row_id = cursor.partition("_")
+    return _EPOCH + timedelta(microseconds=int(micros)), int(row_id)
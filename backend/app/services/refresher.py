@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.opportunity import Opportunity
+from app.services._metrics import observe_stage, span
+from app.services.opportunities import OpportunityDelta, OpportunityEngine
+from app.utils.json_codec import dumps
+
+logger = logging.getLogger(__name__)
+
+# Called after each published refresh with (engine, snapshot); must not block
+RefreshListener = Callable[[Any, "OpportunitySnapshot"], None]
+
+
+def is_stale(updated_at: Optional[str], as_of: datetime, threshold_seconds: int) -> bool:
+    if not updated_at:
+        return False
+    try:
+        updated = datetime.fromisoformat(updated_at)
+        return (as_of - updated).total_seconds() > threshold_seconds
+    except Exception:
+        return True
+
+
+@dataclass(frozen=True)
+class OpportunitySnapshot:
+    """Immutable result of one refresh cycle, swapped in atomically."""
+
+    items: Tuple[Opportunity, ...]
+    as_of: datetime
+    duration_seconds: float
+    version: int
+    # Serialized response bodies, keyed by (include_non_sports, stale timestamps)
+    _rendered: Dict[Any, bytes] = field(default_factory=dict, init=False, compare=False, repr=False)
+    _stamps: FrozenSet[Optional[str]] = field(
+        default=frozenset(), init=False, compare=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_stamps", frozenset(o.updated_at for o in self.items))
+
+    def render_items(
+        self, include_non_sports: bool, as_of: datetime, threshold_seconds: int
+    ) -> bytes:
+        """JSON array of items with ``is_stale``, serialized once per variant.
+
+        Staleness only depends on ``updated_at``, which is shared by every item
+        computed in the same cycle, so a snapshot has very few distinct bodies.
+        """
+        stale = frozenset(ts for ts in self._stamps if is_stale(ts, as_of, threshold_seconds))
+        key = (include_non_sports, stale)
+        body = self._rendered.get(key)
+        if body is None:
+            with span("serialize"):
+                rows: List[Dict[str, Any]] = []
+                for o in self.select(include_non_sports):
+                    row = o.model_dump(mode="json")
+                    row["is_stale"] = o.updated_at in stale
+                    rows.append(row)
+                body = dumps(rows)
+            self._rendered[key] = body
+        return body
+
+    def select(self, include_non_sports: bool = False) -> List[Opportunity]:
+        # The refresher always computes with include_non_sports=True; sports
+        # opportunities are exactly those with a resolved league code.
+        if include_non_sports:
+            return list(self.items)
+        return [o for o in self.items if o.sport]
+
+
+class OpportunityRefresher:
+    """Runs the opportunity pipeline on a fixed interval in the background.
+
+    Routes read ``snapshot`` instead of running the pipeline per request, so
+    request latency no longer depends on upstream latency and concurrent
+    requests do not stampede Polymarket or the Odds API.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: Optional[int] = None,
+        engine_factory: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.interval_seconds = interval_seconds or settings.refresh_interval_seconds
+        self._engine_factory = engine_factory
+        # One engine for the refresher's lifetime so it can diff against the last cycle
+        self._engine: Any = None
+        self._changes: Deque[Tuple[int, datetime, OpportunityDelta]] = deque(
+            maxlen=settings.refresh_change_history
+        )
+        self._snapshot: Optional[OpportunitySnapshot] = None
+        self._version = 0
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._listeners: List[RefreshListener] = []
+        self.last_error: Optional[str] = None
+
+    @property
+    def snapshot(self) -> Optional[OpportunitySnapshot]:
+        return self._snapshot
+
+    def add_listener(self, listener: RefreshListener) -> None:
+        self._listeners.append(listener)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def refresh_once(self) -> OpportunitySnapshot:
+        async with self._lock:
+            started = time.perf_counter()
+            if self._engine is None:
+                self._engine = (self._engine_factory or OpportunityEngine)()
+            items = await self._engine.fetch_opportunities(include_non_sports=True)
+            self._version += 1
+            snap = OpportunitySnapshot(
+                items=tuple(items),
+                as_of=datetime.now(timezone.utc),
+                duration_seconds=time.perf_counter() - started,
+                version=self._version,
+            )
+            observe_stage("refresh", snap.duration_seconds)
+            # Warm the default response body before publishing
+            snap.render_items(False, snap.as_of, settings.refresh_interval_seconds)
+            delta = getattr(self._engine, "last_delta", None)
+            if delta is not None:
+                self._changes.append((snap.version, snap.as_of, delta))
+            # Single reference assignment: readers see either the old or the new snapshot
+            self._snapshot = snap
+            for listener in self._listeners:
+                try:
+                    listener(self._engine, snap)
+                except Exception:
+                    logger.exception("Refresh listener %r failed", listener)
+            return snap
+
+    def changes_since(
+        self, version: int
+    ) -> Tuple[bool, List[Tuple[int, datetime, OpportunityDelta]]]:
+        """Deltas published after ``version``.
+
+        The first element is True when ``version`` predates the retained
+        history, meaning the caller must reload the full list instead.
+        """
+        changes = [c for c in self._changes if c[0] > version]
+        oldest = self._changes[0][0] if self._changes else self._version + 1
+        return version < oldest - 1, changes
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                snap = await self.refresh_once()
+                self.last_error = None
+                logger.info(
+                    "Opportunity refresh v%s: %s items in %.2fs",
+                    snap.version,
+                    len(snap.items),
+                    snap.duration_seconds,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.last_error = repr(exc)
+                logger.exception("Opportunity refresh failed")
+            finally:
+                self._ready.set()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="opportunity-refresher")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> Optional[OpportunitySnapshot]:
+        if self._snapshot is None and self.running:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._ready.wait(), timeout)
+        return self._snapshot
+
+
+async def snapshot_for(app: Any) -> Optional[OpportunitySnapshot]:
+    """Return the published snapshot for ``app``, or None when routes should compute inline."""
+    refresher: Optional[OpportunityRefresher] = getattr(app.state, "refresher", None)
+    if refresher is None:
+        return None
+    return await refresher.wait_ready(timeout=settings.refresh_startup_wait_seconds)
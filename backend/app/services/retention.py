@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, TypeVar, Union
+
+from sqlalchemy import Table, and_, case, delete, func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import ColumnElement
+
+from app.core.config import settings
+from app.db.models import APICallLog, MarketPriceRollup, MarketSnapshot, OddsLog
+from app.services.price_history import epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+ROLLUP_RESOLUTIONS: Dict[str, int] = {"1h": 3600, "1d": 86400}
+
+
+def _utc(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+def _floor(ts: datetime, width: int) -> datetime:
+    epoch = int(_utc(ts).timestamp())
+    return datetime.fromtimestamp(epoch - epoch % width, tz=timezone.utc)
+
+
+def rollup_watermark(conn: Connection, resolution: str) -> Optional[datetime]:
+    """End of the newest rolled-up bucket, or None before the first rollup."""
+    r = MarketPriceRollup.__table__.c
+    last = conn.execute(
+        select(func.max(r.bucket_start)).where(r.resolution == resolution)
+    ).scalar_one_or_none()
+    if last is None:
+        return None
+    return _utc(last) + timedelta(seconds=ROLLUP_RESOLUTIONS[resolution])
+
+
+def rollup_prices(
+    conn: Connection,
+    resolution: str,
+    now: datetime,
+    grace_seconds: float = 0.0,
+    max_buckets: Optional[int] = None,
+) -> int:
+    """Aggregate complete buckets past the watermark into market_price_rollup.
+
+    Buckets are computed in SQL (open/close via window functions, as in the
+    history API) for every market at once. A bucket counts as complete only
+    ``grace_seconds`` after it ends: history rows are stamped at capture time
+    but reach the table on a later flush, and rows landing behind the
+    watermark would never be rolled up. One call covers at most
+    ``max_buckets`` buckets starting at the first capture past the watermark,
+    so gaps are skipped; call again until it returns 0. Returns the number of
+    rows written.
+    """
+    width = ROLLUP_RESOLUTIONS[resolution]
+    t = MarketSnapshot.__table__.c
+    until = _floor(now - timedelta(seconds=grace_seconds), width)
+    since = rollup_watermark(conn, resolution)
+    probe = select(func.min(t.captured_at)).where(t.market.is_not(None), t.price.is_not(None))
+    if since is not None:
+        probe = probe.where(t.captured_at >= since)
+    first = conn.execute(probe).scalar_one_or_none()
+    if first is None:
+        return 0
+    since = _floor(first, width)
+    if since >= until:
+        return 0
+    if max_buckets is not None:
+        until = min(until, since + timedelta(seconds=width * max_buckets))
+
+    bucket = (epoch_seconds(t.captured_at) // width).label("bucket")
+    series = (t.source, t.market, bucket)
+    ranked = (
+        select(
+            t.source,
+            t.market,
+            bucket,
+            t.price,
+            func.row_number()
+            .over(partition_by=series, order_by=(t.captured_at, t.id))
+            .label("rn_first"),
+            func.row_number()
+            .over(partition_by=series, order_by=(t.captured_at.desc(), t.id.desc()))
+            .label("rn_last"),
+        )
+        .where(
+            t.captured_at >= since,
+            t.captured_at < until,
+            t.market.is_not(None),
+            t.price.is_not(None),
+        )
+        .subquery()
+    )
+    stmt = select(
+        ranked.c.source,
+        ranked.c.market,
+        ranked.c.bucket,
+        func.max(case((ranked.c.rn_first == 1, ranked.c.price))).label("open"),
+        func.max(ranked.c.price).label("high"),
+        func.min(ranked.c.price).label("low"),
+        func.max(case((ranked.c.rn_last == 1, ranked.c.price))).label("close"),
+        func.count().label("samples"),
+    ).group_by(ranked.c.source, ranked.c.market, ranked.c.bucket)
+
+    rows = [
+        {
+            "source": row.source,
+            "market": row.market,
+            "resolution": resolution,
+            "bucket_start": datetime.fromtimestamp(int(row.bucket) * width, tz=timezone.utc),
+            "open": row.open,
+            "high": row.high,
+            "low": row.low,
+            "close": row.close,
+            "samples": row.samples,
+        }
+        for row in conn.execute(stmt)
+    ]
+    rollup = MarketPriceRollup.__table__
+    if rows:
+        conn.execute(rollup.insert(), rows)
+    return len(rows)
+
+
+def purge_batch(
+    conn: Connection,
+    table: Table,
+    column: str,
+    cutoff: datetime,
+    batch_size: int,
+    where: Optional[ColumnElement[bool]] = None,
+) -> int:
+    """Delete up to ``batch_size`` of the oldest-id rows with ``column < cutoff``."""
+    cond = table.c[column] < cutoff
+    if where is not None:
+        cond = and_(cond, where)
+    ids = select(table.c.id).where(cond).order_by(table.c.id).limit(batch_size)
+    return conn.execute(delete(table).where(table.c.id.in_(ids.scalar_subquery()))).rowcount
+
+
+@dataclass
+class RetentionReport:
+    rolled_up: Dict[str, int] = field(default_factory=dict)
+    purged: Dict[str, int] = field(default_factory=dict)
+
+
+class RetentionJob:
+    """Rolls market prices up and trims history tables on an interval.
+
+    Raw market snapshots are only purged once both rollups cover them, so
+    the hourly and daily series outlive the raw rows. Rollups advance at most
+    ``rollup_max_buckets`` buckets and deletes at most ``batch_size`` rows per
+    transaction, so locks and WAL growth stay bounded while the history
+    writers keep inserting.
+    """
+
+    def __init__(
+        self,
+        *,
+        engine: Optional[Union[Engine, AsyncEngine]] = None,
+        interval_seconds: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        rollup_grace_seconds: Optional[float] = None,
+        rollup_max_buckets: Optional[int] = None,
+    ) -> None:
+        self._engine = engine
+        self.interval_seconds = interval_seconds or settings.retention_interval_seconds
+        self.batch_size = batch_size or settings.retention_batch_size
+        self.rollup_grace_seconds = (
+            rollup_grace_seconds
+            if rollup_grace_seconds is not None
+            else settings.retention_rollup_grace_seconds
+        )
+        self.rollup_max_buckets = rollup_max_buckets or settings.retention_rollup_max_buckets
+        self._task: Optional[asyncio.Task] = None
+        self.last_report: Optional[RetentionReport] = None
+
+    @property
+    def engine(self) -> Union[Engine, AsyncEngine]:
+        if self._engine is None:
+            from app.db.session import get_async_engine
+
+            self._engine = get_async_engine()
+        return self._engine
+
+    async def _transaction(self, fn: Callable[[Connection], T]) -> T:
+        engine = self.engine
+        if isinstance(engine, AsyncEngine):
+            async with engine.begin() as conn:
+                return await conn.run_sync(fn)
+
+        def run() -> T:
+            with engine.begin() as conn:
+                return fn(conn)
+
+        return await asyncio.to_thread(run)
+
+    async def _purge(
+        self,
+        table: Table,
+        column: str,
+        cutoff: datetime,
+        where: Optional[ColumnElement[bool]] = None,
+    ) -> int:
+        deleted = 0
+        while True:
+            n = await self._transaction(
+                lambda conn: purge_batch(conn, table, column, cutoff, self.batch_size, where)
+            )
+            deleted += n
+            if n < self.batch_size:
+                return deleted
+
+    async def _rollup(self, resolution: str, now: datetime) -> int:
+        written = 0
+        while True:
+            n = await self._transaction(
+                lambda conn: rollup_prices(
+                    conn, resolution, now, self.rollup_grace_seconds, self.rollup_max_buckets
+                )
+            )
+            written += n
+            if n == 0:
+                return written
+
+    async def run_once(self, now: Optional[datetime] = None) -> RetentionReport:
+        now = _utc(now or datetime.now(timezone.utc))
+        report = RetentionReport()
+        covered = now
+        for resolution in ROLLUP_RESOLUTIONS:
+            report.rolled_up[resolution] = await self._rollup(resolution, now)
+            mark = await self._transaction(lambda conn: rollup_watermark(conn, resolution))
+            covered = (
+                min(covered, mark)
+                if mark is not None
+                else datetime.min.replace(tzinfo=timezone.utc)
+            )
+
+        day = timedelta(days=1)
+        raw_cutoff = now - settings.retention_raw_days * day
+        rollup = MarketPriceRollup.__table__
+        report.purged = {
+            "market_snapshot": await self._purge(
+                MarketSnapshot.__table__, "captured_at", min(raw_cutoff, covered)
+            ),
+            "odds_log": await self._purge(OddsLog.__table__, "created_at", raw_cutoff),
+            "api_call_log": await self._purge(
+                APICallLog.__table__, "created_at", now - settings.retention_call_log_days * day
+            ),
+            "market_price_rollup": await self._purge(
+                rollup,
+                "bucket_start",
+                now - settings.retention_hourly_days * day,
+                rollup.c.resolution == "1h",
+            ),
+        }
+        self.last_report = report
+        return report
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                report = await self.run_once()
+                logger.info(
+                    "Retention pass: rolled up %s, purged %s", report.rolled_up, report.purged
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Retention pass failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="history-retention")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+
+async def main() -> None:
+    from app.db.session import dispose_async_engine
+
+    try:
+        report = await RetentionJob().run_once()
+    finally:
+        await dispose_async_engine()
+    print(f"Rolled up: {report.rolled_up}")
+    print(f"Purged: {report.purged}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
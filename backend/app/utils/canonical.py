@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import re
 import unicodedata
+from functools import lru_cache
 from typing import Optional, Tuple
 
-
 _ALIAS_MAP = {
     # basketball
     "la clippers": "los angeles clippers",
@@ -15,16 +15,34 @@ _ALIAS_MAP = {
 }
 
 
+# Titles and team names recur every refresh cycle, so results are memoized
+_CACHE_SIZE = 8192
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_TITLE_SEPARATORS = tuple(
+    re.compile(sep, flags=re.IGNORECASE)
+    for sep in (r"\s+vs\s+", r"\s+v\s+", r"\s+@\s+", r"\s+at\s+", r"\s+-\s+")
+)
+
+# ASCII fast path: lowercase letters, keep digits and whitespace, drop everything else
+_ASCII_TABLE = {
+    i: (chr(i).lower() if chr(i).isalnum() or chr(i).isspace() else None) for i in range(128)
+}
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
 def _normalize_string(value: str) -> str:
-    s = value.strip().lower()
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = re.sub(r"[^a-z0-9\s]", "", s)
-    s = re.sub(r"\s+", " ", s)
-    s = s.strip()
-    return s
+    if value.isascii():
+        s = value.translate(_ASCII_TABLE)
+    else:
+        s = unicodedata.normalize("NFKD", value.lower())
+        s = "".join(ch for ch in s if not unicodedata.combining(ch))
+        s = _NON_ALNUM_RE.sub("", s)
+    # split() collapses and trims whitespace runs exactly like \s+
+    return " ".join(s.split())
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
 def normalize_team_name(name: str) -> str:
     base = _normalize_string(name)
     return _ALIAS_MAP.get(base, base)
@@ -34,6 +52,7 @@ def canonical_team_key(name: str) -> str:
     return normalize_team_name(name).replace(" ", "_")
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
 def canonical_event_key(sport: Optional[str], title: str, date_hint: Optional[str] = None) -> str:
     sport_part = (sport or "").strip().lower().replace(" ", "_")
     title_part = _normalize_string(title).replace(" ", "_")
@@ -43,17 +62,11 @@ def canonical_event_key(sport: Optional[str], title: str, date_hint: Optional[st
     return f"{sport_part}:{title_part}"
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
 def parse_event_title_teams(title: str) -> Optional[Tuple[str, str]]:
     # Try common separators: ' vs ', ' v ', ' @ ', ' at '
-    candidates = [
-        r"\s+vs\s+",
-        r"\s+v\s+",
-        r"\s+@\s+",
-        r"\s+at\s+",
-        r"\s+-\s+",
-    ]
-    for sep in candidates:
-        parts = re.split(sep, title, flags=re.IGNORECASE)
+    for sep in _TITLE_SEPARATORS:
+        parts = sep.split(title)
         if len(parts) == 2:
             a = normalize_team_name(parts[0])
             b = normalize_team_name(parts[1])
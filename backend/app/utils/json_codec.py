@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # optional fast path
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None  # type: ignore[assignment]
+
+_ORJSON_OPTS = 0
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any, pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes; compact unless ``pretty``."""
+    if orjson is not None:
+        opts = _ORJSON_OPTS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(content, option=opts)
+        except (TypeError, orjson.JSONEncodeError):
+            pass  # e.g. ints beyond 64 bits; the stdlib encoder handles them
+    if pretty:
+        return json.dumps(content, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+from typing import Any, List, Optional
+
+_WS = " \t\r\n"
+_NUMBER_TAIL = "0123456789.eE+-"
+_decoder = json.JSONDecoder()
+
+
+class JSONArrayItemDecoder:
+    """Incrementally decode the items of a top-level JSON array.
+
+    Text is fed in arbitrary chunks; each complete item is decoded with the C
+    scanner (``raw_decode``) as soon as it has fully arrived, so callers can
+    project and drop it before the rest of the document is read. An item that
+    straddles a chunk boundary is simply retried once more text arrives.
+
+    If the document is not an array (e.g. ``{"markets": [...]}``), the text is
+    buffered and the whole document is returned by ``close()`` instead.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._pos = 0
+        # start -> first -> (item -> sep)* -> done, or "document" for non-arrays
+        self._state = "start"
+
+    def _skip_ws(self) -> None:
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in _WS:
+            pos += 1
+        self._pos = pos
+
+    def feed(self, text: str) -> List[Any]:
+        if self._state == "document":
+            self._buf += text
+            return []
+        self._buf = self._buf[self._pos :] + text
+        self._pos = 0
+        items: List[Any] = []
+        while self._state != "done":
+            self._skip_ws()
+            if self._pos >= len(self._buf):
+                break
+            ch = self._buf[self._pos]
+            if self._state == "start":
+                if ch != "[":
+                    self._state = "document"
+                    break
+                self._pos += 1
+                self._state = "first"
+                continue
+            if self._state == "sep" or (self._state == "first" and ch == "]"):
+                if ch == "]":
+                    self._pos += 1
+                    self._state = "done"
+                elif ch == ",":
+                    self._pos += 1
+                    self._state = "item"
+                else:
+                    raise ValueError(f"Expected ',' or ']' at offset {self._pos}")
+                continue
+            try:
+                obj, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                break  # incomplete item; wait for more text
+            if not isinstance(obj, (dict, list, str)) and (
+                end >= len(self._buf) or self._buf[end] in _NUMBER_TAIL
+            ):
+                break  # a number may continue in the next chunk ("1" + "2.5e3")
+            items.append(obj)
+            self._pos = end
+            self._state = "sep"
+        return items
+
+    def close(self) -> Optional[Any]:
+        """Finish decoding; returns the whole document in non-array mode, else None."""
+        if self._state == "document":
+            return json.loads(self._buf)
+        self._skip_ws()
+        if self._state != "done":
+            raise ValueError("Truncated JSON array")
+        if self._pos != len(self._buf):
+            raise ValueError("Trailing data after JSON array")
+        return None
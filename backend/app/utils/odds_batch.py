@@ -0,0 +1,99 @@
+"""Array counterparts of ``app.utils.odds`` odds conversion and vig removal.
+
+Probability arrays may be 1-D (one market) or 2-D (one market per row, one
+outcome per column); vig removal always normalizes along the last axis.
+Invalid inputs yield NaN instead of raising, so one bad line does not fail
+a batch.
+"""
+
+from __future__ import annotations
+
+from typing import Literal
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+VigMethod = Literal["multiplicative", "power", "shin"]
+
+_SOLVER_ITERATIONS = 60
+
+
+def american_to_decimal(american: ArrayLike) -> NDArray[np.float64]:
+    a = np.asarray(american, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(a > 0, 1.0 + a / 100.0, 1.0 + 100.0 / np.abs(a))
+    return np.where(a == 0, np.nan, out)
+
+
+def implied_probability_from_american(american: ArrayLike) -> NDArray[np.float64]:
+    return 1.0 / american_to_decimal(american)
+
+
+def implied_probability_from_decimal(decimal_odds: ArrayLike) -> NDArray[np.float64]:
+    d = np.asarray(decimal_odds, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(d > 1.0, 1.0 / d, np.nan)
+
+
+def _remove_vig_multiplicative(p: NDArray[np.float64]) -> NDArray[np.float64]:
+    total = p.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, p / total, 0.0)
+
+
+def _remove_vig_power(p: NDArray[np.float64]) -> NDArray[np.float64]:
+    # Find k per market with sum(p_i ** k) == 1. The sum decreases in k, and
+    # k >= 1 whenever the book is overround (sum(p) >= 1).
+    lo = np.full(p.shape[:-1] + (1,), 1e-6)
+    hi = np.full_like(lo, 1.0)
+    # Grow the upper bracket until it overshoots (sum < 1)
+    for _ in range(_SOLVER_ITERATIONS):
+        grow = (p**hi).sum(axis=-1, keepdims=True) > 1.0
+        if not grow.any():
+            break
+        hi = np.where(grow, hi * 2.0, hi)
+    for _ in range(_SOLVER_ITERATIONS):
+        mid = (lo + hi) / 2.0
+        over = (p**mid).sum(axis=-1, keepdims=True) > 1.0
+        lo = np.where(over, mid, lo)
+        hi = np.where(over, hi, mid)
+    return _remove_vig_multiplicative(p ** ((lo + hi) / 2.0))
+
+
+def _shin_probabilities(
+    q: NDArray[np.float64], total: NDArray[np.float64], z: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    return (np.sqrt(z**2 + 4.0 * (1.0 - z) * q**2 / total) - z) / (2.0 * (1.0 - z))
+
+
+def _remove_vig_shin(p: NDArray[np.float64]) -> NDArray[np.float64]:
+    # Shin (1993): solve for the insider share z in [0, 1) so the implied
+    # fair probabilities sum to one; the sum decreases in z.
+    total = p.sum(axis=-1, keepdims=True)
+    lo = np.zeros(p.shape[:-1] + (1,))
+    hi = np.full_like(lo, 0.999)
+    for _ in range(_SOLVER_ITERATIONS):
+        mid = (lo + hi) / 2.0
+        over = _shin_probabilities(p, total, mid).sum(axis=-1, keepdims=True) > 1.0
+        lo = np.where(over, mid, lo)
+        hi = np.where(over, hi, mid)
+    fair = _shin_probabilities(p, total, (lo + hi) / 2.0)
+    # An underround book (sum < 1) has no insider share; fall back to scaling
+    return np.where(total > 1.0, _remove_vig_multiplicative(fair), _remove_vig_multiplicative(p))
+
+
+def remove_vig(
+    probabilities: ArrayLike, method: VigMethod = "multiplicative"
+) -> NDArray[np.float64]:
+    """Fair probabilities for n-way markets from implied probabilities."""
+    p = np.asarray(probabilities, dtype=np.float64)
+    if p.size == 0:
+        return p.copy()
+    if method == "multiplicative":
+        return _remove_vig_multiplicative(p)
+    if method == "power":
+        return _remove_vig_power(p)
+    if method == "shin":
+        return _remove_vig_shin(p)
+    raise ValueError(f"Unknown vig removal method: {method}")
+
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
 import re
 
 
@@ -42,30 +43,96 @@ LEAGUES: Dict[str, League] = {
 }
 
 
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_WS_RE = re.compile(r"\s+")
+
+
 def normalize_text(value: str) -> str:
     v = value.lower().strip()
-    v = re.sub(r"[^a-z0-9\s]", " ", v)
-    v = re.sub(r"\s+", " ", v)
+    v = _NON_ALNUM_RE.sub(" ", v)
+    v = _WS_RE.sub(" ", v)
     return v
 
 
-def infer_league_from_fields(question: str, title: str, ticker: Optional[str]) -> Optional[str]:
-    hay = " ".join(filter(None, [question, title, ticker]))
-    hay_n = normalize_text(hay)
+class _TrieNode:
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        self.values: List[str] = []
+
+
+class TokenTrie:
+    """Phrase matcher over whole tokens.
+
+    Phrases are stored token by token, so one left-to-right pass over a
+    string finds every phrase occurrence regardless of how many are stored.
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+
+    def add(self, phrase: str, value: str) -> None:
+        tokens = normalize_text(phrase).split()
+        if not tokens:
+            return
+        node = self._root
+        for tok in tokens:
+            node = node.children.setdefault(tok, _TrieNode())
+        if value not in node.values:
+            node.values.append(value)
+
+    def find_all(self, text: str) -> Set[str]:
+        tokens = normalize_text(text).split()
+        hits: Set[str] = set()
+        for i in range(len(tokens)):
+            node = self._root
+            for tok in tokens[i:]:
+                node = node.children.get(tok)  # type: ignore[assignment]
+                if node is None:
+                    break
+                hits.update(node.values)
+        return hits
+
+
+@dataclass(frozen=True)
+class SportsMatcher:
+    leagues: TokenTrie
+    teams: Dict[str, TokenTrie]
+
+
+@lru_cache(maxsize=1)
+def get_matcher() -> SportsMatcher:
+    """Tries over LEAGUES, built on first use.
+
+    Call ``get_matcher.cache_clear()`` after editing LEAGUES.
+    """
+    leagues = TokenTrie()
+    teams: Dict[str, TokenTrie] = {}
     for code, lg in LEAGUES.items():
         for nm in lg.names:
-            if nm in hay_n:
-                return code
-    return None
+            leagues.add(nm, code)
+        trie = TokenTrie()
+        for key, team in lg.team_map.items():
+            for nm in [*team.names, *team.abbrs]:
+                trie.add(nm, key)
+        teams[code] = trie
+    return SportsMatcher(leagues=leagues, teams=teams)
+
+
+def infer_league_from_fields(question: str, title: str, ticker: Optional[str]) -> Optional[str]:
+    hay = " ".join(filter(None, [question, title, ticker]))
+    hits = get_matcher().leagues.find_all(hay)
+    if not hits:
+        return None
+    # First league in LEAGUES order wins, as before
+    return next(code for code in LEAGUES if code in hits)
 
 
 def infer_team_keys(league_code: str, question: str, title: str) -> List[str]:
-    keys: List[str] = []
-    hay = normalize_text(" ".join([question, title]))
     league = LEAGUES.get(league_code)
-    if not league:
-        return keys
-    for key, team in league.team_map.items():
-        if any(nm in hay for nm in team.names) or any(ab in hay for ab in team.abbrs):
-            keys.append(key)
-    return keys
+    trie = get_matcher().teams.get(league_code)
+    if not league or trie is None:
+        return []
+    hits = trie.find_all(" ".join([question, title]))
+    return [key for key in league.team_map if key in hits]
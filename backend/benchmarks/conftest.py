@@ -0,0 +1,24 @@
+import os
+import sys
+
+# Ensure backend/ is on sys.path so `import app...` works during pytest
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import pytest  # noqa: E402
+
+from app.services._cache import reset_cache  # noqa: E402
+from synthetic import SCALES  # noqa: E402
+
+
+@pytest.fixture(params=SCALES, ids=lambda n: f"{n}")
+def scale(request) -> int:
+    return request.param
+
+
+@pytest.fixture(autouse=True)
+def _isolate_upstream_cache():
+    reset_cache()
+    yield
+    reset_cache()
@@ -0,0 +1,96 @@
+"""Synthetic upstream payloads for the benchmark suite."""
+
+import os
+import random
+from typing import Any, Dict, List
+
+# Number of Polymarket markets per dataset; BENCH_SCALES=1000,10000,100000 for the full sweep
+SCALES = [int(s) for s in os.environ.get("BENCH_SCALES", "1000,10000").split(",") if s.strip()]
+SPORTS = ["basketball_nba", "americanfootball_nfl", "baseball_mlb", "icehockey_nhl"]
+BOOKS = ["draftkings", "fanduel", "betmgm", "caesars"]
+
+
+def team(i: int) -> str:
+    return f"Team {i:05d}"
+
+
+def make_markets(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Raw /markets items: two markets per event, events spread over SPORTS."""
+    rng = random.Random(seed)
+    out: List[Dict[str, Any]] = []
+    for i in range(n):
+        ev = i // 2
+        yes = round(rng.uniform(0.05, 0.95), 3)
+        out.append(
+            {
+                "id": f"m{i}",
+                "question": f"Will {team(2 * ev)} beat {team(2 * ev + 1)}?",
+                "slug": f"market-{i}",
+                "closed": False,
+                "endDate": "2099-01-01T00:00:00Z",
+                "tags": [f"tag-{ev % len(SPORTS)}"],
+                "events": [
+                    {
+                        "id": f"e{ev}",
+                        "title": f"{team(2 * ev)} vs {team(2 * ev + 1)}",
+                        "ticker": f"t{ev}",
+                        "startTime": "2099-01-01T00:00:00Z",
+                    }
+                ],
+                "outcomes": [{"name": "Yes", "price": yes}, {"name": "No", "price": 1 - yes}],
+            }
+        )
+    return out
+
+
+def sports_map() -> Dict[str, str]:
+    return {f"tag-{i}": code for i, code in enumerate(SPORTS)}
+
+
+def make_odds_payload(n_events: int, first_event: int = 0, seed: int = 11) -> List[Dict[str, Any]]:
+    """Odds API /odds payload with h2h, spreads and totals from every book."""
+    rng = random.Random(seed)
+    out: List[Dict[str, Any]] = []
+    for ev in range(first_event, first_event + n_events):
+        home, away = team(2 * ev + 1), team(2 * ev)
+        books = []
+        for key in BOOKS:
+            h2h = [
+                {"name": away, "price": rng.randint(100, 230)},
+                {"name": home, "price": rng.randint(-250, -105)},
+            ]
+            if ev % 3 == 0:
+                # Reversed title order, so the engine join exercises the team-pair tier
+                h2h.reverse()
+            books.append(
+                {
+                    "key": key,
+                    "markets": [
+                        {"key": "h2h", "outcomes": h2h},
+                        {
+                            "key": "spreads",
+                            "outcomes": [
+                                {"name": away, "price": -110, "point": 3.5},
+                                {"name": home, "price": -110, "point": -3.5},
+                            ],
+                        },
+                        {
+                            "key": "totals",
+                            "outcomes": [
+                                {"name": "Over", "price": -105, "point": 210.5},
+                                {"name": "Under", "price": -115, "point": 210.5},
+                            ],
+                        },
+                    ],
+                }
+            )
+        out.append(
+            {
+                "id": f"sb{ev}",
+                "commence_time": "2099-01-01T00:00:00Z",
+                "home_team": home,
+                "away_team": away,
+                "bookmakers": books,
+            }
+        )
+    return out
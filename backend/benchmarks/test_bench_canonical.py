@@ -0,0 +1,30 @@
+from app.utils.canonical import _normalize_string, canonical_event_key, normalize_team_name
+
+from synthetic import SPORTS, team
+
+
+def _titles(n):
+    return [(SPORTS[i % len(SPORTS)], f"{team(2 * i)} vs. {team(2 * i + 1)}!") for i in range(n)]
+
+
+def _clear():
+    for fn in (canonical_event_key, normalize_team_name, _normalize_string):
+        fn.cache_clear()
+
+
+def test_canonical_event_key_cold(benchmark, scale):
+    titles = _titles(scale)
+
+    def run():
+        return [canonical_event_key(sport, title) for sport, title in titles]
+
+    keys = benchmark.pedantic(run, setup=_clear, rounds=5, iterations=1)
+    assert len(set(keys)) == scale
+
+
+def test_canonical_event_key_warm(benchmark, scale):
+    # Steady state: the same titles recur every refresh
+    titles = _titles(min(scale, 4096))
+    _clear()
+    keys = benchmark(lambda: [canonical_event_key(sport, title) for sport, title in titles])
+    assert len(keys) == len(titles)
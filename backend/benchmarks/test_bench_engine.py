@@ -0,0 +1,86 @@
+import asyncio
+
+from app.services import opportunities as opp_mod
+from app.services.odds_api import OddsAPIService
+from app.services.opportunities import OpportunityEngine
+from app.services.polymarket import PolymarketService
+
+from synthetic import SPORTS, make_markets, make_odds_payload, sports_map
+
+
+class _RecordedPM:
+    def __init__(self, events):
+        self.events = events
+
+    async def fetch_event_records(self):
+        return self.events
+
+    async def close(self):
+        return None
+
+
+class _RecordedOdds:
+    def __init__(self, tables):
+        self.tables = tables
+
+    async def fetch_sport_table(self, sport):
+        return self.tables[sport]
+
+    async def close(self):
+        return None
+
+
+def _inputs(scale, monkeypatch):
+    """Normalized Polymarket records and per-sport line tables, built once."""
+    markets = make_markets(scale)
+
+    async def fake_markets(self, *args, **kwargs):
+        return markets
+
+    async def fake_sports(self):
+        return sports_map()
+
+    async def fake_get(self, path, params=None):
+        sport = path.split("/")[2]
+        idx = SPORTS.index(sport)
+        # Events are assigned to sports round-robin, mirroring make_markets tags
+        return [ev for ev in payload if int(ev["id"][2:]) % len(SPORTS) == idx]
+
+    payload = make_odds_payload(scale // 2)
+    with monkeypatch.context() as m:
+        m.setattr(PolymarketService, "fetch_markets_paginated", fake_markets)
+        m.setattr(PolymarketService, "fetch_sports_map", fake_sports)
+        m.setattr(OddsAPIService, "_get", fake_get)
+        pm = PolymarketService(base_url="https://bench")
+        sb = OddsAPIService(base_url="https://bench", api_key="bench")
+        events = asyncio.run(pm.fetch_event_records())
+        tables = {s: asyncio.run(sb._load_sport_odds(s, {})) for s in SPORTS}
+        asyncio.run(pm.close())
+        asyncio.run(sb.close())
+    return events, tables
+
+
+def _patch_services(monkeypatch, events, tables):
+    monkeypatch.setattr(opp_mod, "PolymarketService", lambda *a, **k: _RecordedPM(events))
+    monkeypatch.setattr(opp_mod, "OddsAPIService", lambda *a, **k: _RecordedOdds(tables))
+    monkeypatch.setattr(opp_mod.settings, "odds_api_key", "bench")
+
+
+def test_engine_full_refresh(benchmark, scale, monkeypatch):
+    events, tables = _inputs(scale, monkeypatch)
+    _patch_services(monkeypatch, events, tables)
+
+    opps = benchmark(lambda: asyncio.run(OpportunityEngine().fetch_opportunities()))
+    assert len(opps) == scale
+    assert sum(o.comparison_basis == "sportsbook_fair" for o in opps) == scale
+
+
+def test_engine_incremental_refresh(benchmark, scale, monkeypatch):
+    # Second and later cycles with unchanged inputs reuse previous results
+    events, tables = _inputs(scale, monkeypatch)
+    _patch_services(monkeypatch, events, tables)
+    engine = OpportunityEngine()
+    asyncio.run(engine.fetch_opportunities())
+
+    opps = benchmark(lambda: asyncio.run(engine.fetch_opportunities()))
+    assert len(opps) == scale and engine.last_delta.unchanged == scale
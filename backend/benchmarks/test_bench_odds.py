@@ -0,0 +1,36 @@
+import asyncio
+
+from app.services import odds_api as odds_mod
+from app.services.odds_api import OddsAPIService
+
+from synthetic import make_odds_payload
+
+
+def test_parse_sport_odds(benchmark, scale, monkeypatch):
+    # One sport's response; 24 lines per event
+    payload = make_odds_payload(max(1, scale // 10))
+
+    async def fake_get(self, path, params=None):
+        return payload
+
+    monkeypatch.setattr(odds_mod.OddsAPIService, "_get", fake_get)
+    svc = OddsAPIService(base_url="https://bench", api_key="bench")
+
+    table = benchmark(lambda: asyncio.run(svc._load_sport_odds("basketball_nba", {})))
+    assert len(table.events) == len(payload)
+    asyncio.run(svc.close())
+
+
+def test_materialize_event_lines(benchmark, scale, monkeypatch):
+    payload = make_odds_payload(max(1, scale // 10))
+
+    async def fake_get(self, path, params=None):
+        return payload
+
+    monkeypatch.setattr(odds_mod.OddsAPIService, "_get", fake_get)
+    svc = OddsAPIService(base_url="https://bench", api_key="bench")
+    table = asyncio.run(svc._load_sport_odds("basketball_nba", {}))
+
+    events = benchmark(table.to_event_lines)
+    assert len(events) == len(payload)
+    asyncio.run(svc.close())
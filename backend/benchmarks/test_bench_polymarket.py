@@ -0,0 +1,35 @@
+import asyncio
+
+from app.services.polymarket import PolymarketService
+
+from synthetic import make_markets, sports_map
+
+
+def test_normalize_market(benchmark, scale):
+    markets = make_markets(scale)
+    svc = PolymarketService(base_url="https://bench")
+
+    def run():
+        return [svc._normalize_market(m, m["events"][0]["id"]) for m in markets]
+
+    out = benchmark(run)
+    assert len(out) == scale
+    asyncio.run(svc.close())
+
+
+def test_fetch_event_records(benchmark, scale, monkeypatch):
+    markets = make_markets(scale)
+
+    async def fake_markets(self, *args, **kwargs):
+        return markets
+
+    async def fake_sports(self):
+        return sports_map()
+
+    monkeypatch.setattr(PolymarketService, "fetch_markets_paginated", fake_markets)
+    monkeypatch.setattr(PolymarketService, "fetch_sports_map", fake_sports)
+    svc = PolymarketService(base_url="https://bench")
+
+    events = benchmark(lambda: asyncio.run(svc.fetch_event_records()))
+    assert len(events) == scale // 2
+    asyncio.run(svc.close())
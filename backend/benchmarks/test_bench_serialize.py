@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+
+from app.schemas.opportunity import Opportunity
+from app.services.refresher import OpportunitySnapshot
+
+
+def _snapshot(n):
+    now = datetime.now(timezone.utc)
+    items = tuple(
+        Opportunity(
+            id=f"polymarket:m{i}",
+            source="polymarket",
+            title=f"Will Team {i} win?",
+            sport="basketball_nba",
+            event_id=f"e{i // 2}",
+            market_id=f"m{i}",
+            canonical_event_key=f"basketball_nba:team_{i}_vs_team_{i + 1}",
+            yes_probability=0.5,
+            price=0.51,
+            ev_usd_per_share=0.02,
+            ev_percent=3.9,
+            comparison_basis="sportsbook_fair",
+            comparison_sources=["odds_api"],
+            source_attribution={"odds_api_event_id": f"sb{i}", "join_method": "exact"},
+            inputs={"pm_price": 0.51, "pm_yes_probability": 0.5, "fee_cushion": 0.025},
+            calc_notes="EV computed using sportsbook fair probability against PM price",
+            updated_at=now.isoformat(),
+        )
+        for i in range(n)
+    )
+    return OpportunitySnapshot(items=items, as_of=now, duration_seconds=0.0, version=1)
+
+
+def test_render_opportunities(benchmark, scale):
+    snaps = []
+
+    def setup():
+        # Fresh snapshot per round so the memoized body is not reused
+        snaps.append(_snapshot(scale))
+        return (snaps[-1],), {}
+
+    def run(snap):
+        return snap.render_items(False, snap.as_of, 600)
+
+    body = benchmark.pedantic(run, setup=setup, rounds=5, iterations=1)
+    assert body.startswith(b"[{")
@@ -5,3 +5,29 @@ import sys
 BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if BACKEND_DIR not in sys.path:
     sys.path.insert(0, BACKEND_DIR)
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.services._cache import reset_cache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _isolate_upstream_cache():
+    # Upstream caches are process-wide; keep tests from seeing each other's payloads
+    reset_cache()
+    yield
+    reset_cache()
+
+
+@pytest.fixture
+def db_engine():
+    """In-memory SQLite with every table, shared across threads (writers flush off-loop)."""
+    eng = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
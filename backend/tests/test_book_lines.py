@@ -0,0 +1,102 @@
+import pickle
+
+import pytest
+
+from app.schemas.odds_api import BookLine, EventLines
+from app.services import odds_api as odds_mod
+from app.services.book_lines import SportLines
+from app.services.odds_api import OddsAPIService
+from app.utils.odds import american_to_decimal, remove_vig_two_outcomes
+
+
+def _events():
+    return [
+        EventLines(
+            sport="basketball_nba",
+            event_id="e1",
+            title="A vs B",
+            commence_time="2024-03-01T00:00:00Z",
+            canonical_event_key="basketball_nba:a_vs_b",
+            lines=[
+                BookLine(
+                    bookmaker="dk", market="h2h", side="A", american_odds=150, fair_probability=0.4
+                ),
+                BookLine(
+                    bookmaker="dk", market="h2h", side="B", american_odds=-170, fair_probability=0.6
+                ),
+                BookLine(bookmaker="dk", market="spreads", side="A", american_odds=-110, point=3.5),
+            ],
+        ),
+        EventLines(sport="basketball_nba", event_id="e2", title="C vs D", lines=[]),
+    ]
+
+
+def test_round_trip_and_interning():
+    table = SportLines.from_event_lines(_events())
+    assert len(table) == 3
+    assert table.bookmakers.values == ["dk"] and table.sides.values == ["A", "B"]
+    assert table.h2h_fair(0) == {"A": 0.4, "B": 0.6}
+    assert table.h2h_fair(1) == {}
+    out = table.to_event_lines()
+    assert [e.event_id for e in out] == ["e1", "e2"]
+    assert out[0].lines[2].point == 3.5 and out[0].lines[2].fair_probability is None
+    assert out[0].lines[0].fair_decimal_odds == pytest.approx(2.5)
+    assert out[1].lines == []
+    assert pickle.loads(pickle.dumps(table)).h2h_fair(0) == {"A": 0.4, "B": 0.6}
+
+
+@pytest.mark.asyncio
+async def test_service_table_matches_scalar_pricing(monkeypatch):
+    payload = [
+        {
+            "id": "e1",
+            "commence_time": "2024-03-01T00:00:00Z",
+            "bookmakers": [
+                {
+                    "key": "bk1",
+                    "markets": [
+                        {
+                            "key": "h2h",
+                            "outcomes": [{"name": "A", "price": 150}, {"name": "B", "price": -170}],
+                        },
+                        {
+                            "key": "totals",
+                            "outcomes": [{"name": "Over", "price": -110, "point": 210.5}],
+                        },
+                    ],
+                },
+                {
+                    "key": "bk2",
+                    "markets": [
+                        {
+                            "key": "h2h",
+                            "outcomes": [{"name": "A", "price": 140}, {"name": "B", "price": -160}],
+                        }
+                    ],
+                },
+            ],
+        },
+        {"id": "e2", "home_team": "X", "bookmakers": []},
+    ]
+
+    async def fake_get(self, path, params=None):
+        return payload
+
+    monkeypatch.setattr(odds_mod.OddsAPIService, "_get", fake_get)
+    svc = OddsAPIService(base_url="https://mock", api_key="x")
+    try:
+        table = await svc.fetch_sport_table("basketball_nba")
+        events = await svc.fetch_sport_odds("basketball_nba")
+    finally:
+        await svc.close()
+
+    # Conservative pick: bk2 for A (+140), bk1 for B (-170)
+    f_a, f_b = remove_vig_two_outcomes(1 / american_to_decimal(140), 1 / american_to_decimal(-170))
+    assert table.h2h_fair(0) == {"A": f_a, "B": f_b}
+    assert table.events[0].selected_bookmaker == "bk2|bk1"
+    assert table.events[0].commence_time == "2024-03-01T00:00:00Z"
+    assert events[0].title == "A vs B" and events[1].title == "X"
+    totals = [l for l in events[0].lines if l.market == "totals"][0]
+    assert totals.point == 210.5 and totals.decimal_odds == american_to_decimal(-110)
+    assert totals.fair_probability is None
+    assert all(l.fair_probability is not None for l in events[0].lines if l.market == "h2h")
@@ -0,0 +1,103 @@
+import time
+
+from app.services import _cache as cache_mod
+from app.services._cache import SQLiteCacheBackend, TTLCache, cache_stats
+
+
+def test_ttl_cache_shared_across_instances_and_counts():
+    a = TTLCache("ns", ttl_seconds=60)
+    b = TTLCache("ns", ttl_seconds=60)
+    assert a.get(("k",)) is None
+    a.set(("k",), [1, 2])
+    assert b.get(("k",)) == [1, 2]
+    assert TTLCache("other", ttl_seconds=60).get(("k",)) is None
+    stats = cache_stats()
+    assert stats["ns"] == {"hits": 1, "misses": 1, "expired": 0, "sets": 1, "coalesced": 0}
+    assert stats["other"]["misses"] == 1
+
+
+def test_ttl_cache_expiry(monkeypatch):
+    c = TTLCache("ns", ttl_seconds=10)
+    c.set(("k",), "v")
+    now = time.time()
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now + 11)
+    assert c.get(("k",)) is None
+    assert c.stats.expired == 1
+
+
+def test_sqlite_backend_shared_between_connections(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = TTLCache("ns", ttl_seconds=60, backend=SQLiteCacheBackend(path))
+    reader = TTLCache("ns", ttl_seconds=60, backend=SQLiteCacheBackend(path))
+    writer.set(("odds", "nba"), {"a": [1, 2.5, None]})
+    assert reader.get(("odds", "nba")) == {"a": [1, 2.5, None]}
+    reader.backend.clear()
+    assert writer.get(("odds", "nba")) is None
+
+
+async def test_concurrent_fetches_coalesce_into_one_upstream_call(monkeypatch):
+    import asyncio
+
+    import httpx
+
+    from app.services import polymarket as pm_mod
+    from app.services.polymarket import PolymarketService
+
+    calls = {"n": 0}
+
+    async def slow_get(client, path, params=None, **kwargs):
+        calls["n"] += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=[{"id": "m1", "events": [{"id": "e1"}]}])
+
+    monkeypatch.setattr(pm_mod, "http_get_with_retry", slow_get)
+    svcs = [PolymarketService(base_url="https://mock") for _ in range(5)]
+    try:
+        results = await asyncio.gather(*(s.fetch_markets_paginated() for s in svcs))
+    finally:
+        for s in svcs:
+            await s.close()
+    assert calls["n"] == 1
+    assert all(r == results[0] for r in results)
+    assert cache_stats()["polymarket"]["coalesced"] == 4
+
+
+async def test_singleflight_survives_leader_cancellation():
+    import asyncio
+
+    from app.services._singleflight import SingleFlight
+
+    sf = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 42
+
+    leader = asyncio.ensure_future(sf.do("k", work))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(sf.do("k", work))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == 42
+    assert not sf.in_flight("k")
+
+
+async def test_sqlite_backend_runs_off_the_event_loop(tmp_path, monkeypatch):
+    import asyncio
+
+    offloaded = []
+    real_to_thread = asyncio.to_thread
+
+    async def to_thread(fn, *args):
+        offloaded.append(fn.__name__)
+        return await real_to_thread(fn, *args)
+
+    monkeypatch.setattr(cache_mod.asyncio, "to_thread", to_thread)
+    cache = TTLCache("ns", ttl_seconds=60, backend=SQLiteCacheBackend(str(tmp_path / "c.db")))
+
+    async def load():
+        return {"v": 1}
+
+    assert await cache.get_or_load(("k",), load) == {"v": 1}
+    assert await cache.get_or_load(("k",), load) == {"v": 1}
+    assert offloaded == ["get", "set", "get"]
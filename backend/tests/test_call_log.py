@@ -0,0 +1,74 @@
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.db.models import APICallLog
+from app.services import _http as http_mod
+from app.services.call_log import APICallRecorder
+from app.services.datagolf import DataGolfService
+from app.services.odds_api import OddsAPIService
+
+
+@pytest.fixture
+def recorder(db_engine):
+    rec = APICallRecorder(persist=True, engine=db_engine, batch_size=10, flush_interval=60)
+    http_mod.set_call_recorder(rec)
+    yield rec
+    http_mod.set_call_recorder(None)
+
+
+@pytest.mark.asyncio
+async def test_upstream_calls_are_logged_without_credentials(recorder):
+    def handler(request):
+        return httpx.Response(
+            200, json=[], headers={"x-requests-remaining": "480", "x-requests-used": "20"}
+        )
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="https://odds"
+    ) as client:
+        svc = OddsAPIService(api_key="secret", client=client)
+        await svc._get("/sports/nba/odds", {"regions": "us"})
+
+    (row,) = recorder.recent_calls()
+    assert row["service"] == "odds_api" and row["endpoint"] == "/sports/nba/odds"
+    assert row["status_code"] == 200 and row["duration_ms"] >= 0
+    assert row["meta"]["params"] == {"regions": "us"}
+    assert row["meta"]["x-requests-remaining"] == "480"
+    assert "secret" not in str(row)
+
+    await recorder.writer.flush()
+    with recorder.writer.engine.connect() as conn:
+        stored = conn.execute(select(APICallLog)).one()
+    assert stored.service == "odds_api" and stored.meta["attempt"] == 1
+
+
+@pytest.mark.asyncio
+async def test_datagolf_retries_and_logs_each_attempt(recorder):
+    calls = {"n": 0}
+
+    def handler(request):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            return httpx.Response(502)
+        return httpx.Response(200, json={"schedule": []})
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="https://dg"
+    ) as client:
+        svc = DataGolfService(api_key="k", client=client)
+        assert await svc.fetch_schedule() == []
+
+    statuses = [(r["service"], r["status_code"]) for r in recorder.recent_calls()]
+    assert statuses == [("datagolf", 502), ("datagolf", 200)]
+    assert recorder.summary()["datagolf"]["errors"] == 1
+
+
+def test_ring_keeps_calls_when_writer_backlogged(db_engine):
+    rec = APICallRecorder(persist=True, engine=db_engine, ring_size=3, batch_size=1)
+    rec.writer.max_pending = 2
+    for i in range(5):
+        rec.record("svc", f"/e{i}", status_code=200, duration_ms=1.0)
+    assert rec.writer.pending == 2 and rec.writer.dropped == 0
+    assert rec.ring_only == 3
+    assert [r["endpoint"] for r in rec.recent_calls()] == ["/e2", "/e3", "/e4"]
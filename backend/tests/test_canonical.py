@@ -0,0 +1,32 @@
+from app.utils.canonical import (
+    _normalize_string,
+    canonical_event_key,
+    canonical_team_key,
+    parse_event_title_teams,
+)
+
+
+def test_ascii_and_unicode_paths_agree():
+    assert _normalize_string("  Los Angeles  Lakers!! ") == "los angeles lakers"
+    assert _normalize_string("Atlético\tMadrid FC") == "atletico madrid fc"
+    assert _normalize_string("Montréal Canadiens") == _normalize_string("Montreal Canadiens")
+    assert _normalize_string("***") == ""
+
+
+def test_canonical_keys():
+    assert canonical_event_key("NBA", "Lakers vs. Celtics") == "nba:lakers_vs_celtics"
+    assert canonical_event_key(None, "A @ B", "2024-01-02") == ":a_b:20240102"
+    assert canonical_team_key("LA Clippers") == "los_angeles_clippers"
+    assert parse_event_title_teams("NY Knicks @ Boston Celtics") == (
+        "new york knicks",
+        "boston celtics",
+    )
+    assert parse_event_title_teams("Who wins?") is None
+
+
+def test_repeated_keys_are_memoized():
+    canonical_event_key.cache_clear()
+    for _ in range(3):
+        canonical_event_key("nba", "Team A vs Team B")
+    info = canonical_event_key.cache_info()
+    assert info.misses == 1 and info.hits == 2
@@ -0,0 +1,120 @@
+import pytest
+from sqlalchemy import LargeBinary, insert, select, text, type_coerce
+
+from app.db import types
+from app.db.compression import load_dictionaries, recompress, train_dictionary
+from app.db.models import MarketSnapshot
+from app.db.types import PLAIN, ZSTD, JSONCompressor
+
+PAYLOAD = {"market": "Will the Lakers win?", "outcomes": ["Yes", "No"], "prices": [0.41, 0.59]}
+
+
+def _stored(eng):
+    col = type_coerce(MarketSnapshot.__table__.c.snapshot, LargeBinary)
+    with eng.connect() as conn:
+        return [
+            bytes(v)
+            for v in conn.execute(select(col).order_by(MarketSnapshot.__table__.c.id)).scalars()
+        ]
+
+
+def _snapshots(eng):
+    t = MarketSnapshot.__table__
+    with eng.connect() as conn:
+        return conn.execute(select(t.c.snapshot).order_by(t.c.id)).scalars().all()
+
+
+def _insert_legacy(eng, raw: str) -> None:
+    # Rows written while the column was JSON: plain text, no tag byte
+    with eng.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO market_snapshot (captured_at, source, snapshot) "
+                "VALUES (CURRENT_TIMESTAMP, 'polymarket', :raw)"
+            ),
+            {"raw": raw},
+        )
+
+
+@pytest.fixture
+def plain_codec(monkeypatch):
+    monkeypatch.setattr(types, "codec", JSONCompressor(enabled=False))
+    return types.codec
+
+
+def test_plain_round_trip(plain_codec, db_engine):
+    with db_engine.begin() as conn:
+        conn.execute(
+            insert(MarketSnapshot.__table__), [{"source": "polymarket", "snapshot": PAYLOAD}]
+        )
+    assert _snapshots(db_engine) == [PAYLOAD]
+    assert _stored(db_engine)[0][:1] == PLAIN
+
+
+def test_legacy_rows_readable_and_recompressed(plain_codec, db_engine):
+    _insert_legacy(db_engine, '{"a": 1}')
+    with db_engine.begin() as conn:
+        conn.execute(text("UPDATE market_snapshot SET snapshot = CAST(snapshot AS BLOB)"))
+    _insert_legacy(db_engine, '{"b": 2}')
+    assert _snapshots(db_engine) == [{"a": 1}, {"b": 2}]
+
+    assert (
+        recompress(db_engine, "market_snapshot", "snapshot", batch_size=1, compressor=plain_codec)
+        == 2
+    )
+    assert all(raw[:1] == PLAIN for raw in _stored(db_engine))
+    assert _snapshots(db_engine) == [{"a": 1}, {"b": 2}]
+    # Already in the target encoding: nothing to do
+    assert recompress(db_engine, "market_snapshot", "snapshot", compressor=plain_codec) == 0
+
+
+def test_recompress_leaves_small_rows_alone(plain_codec, db_engine):
+    compressor = JSONCompressor(enabled=False)
+    # Payloads under MIN_COMPRESS_BYTES are stored plain even with compression on
+    compressor.enabled = True
+    _insert_legacy(db_engine, '{"side": "A"}')
+    with db_engine.begin() as conn:
+        conn.execute(insert(MarketSnapshot.__table__), [{"source": "polymarket", "snapshot": [1]}])
+
+    assert recompress(db_engine, "market_snapshot", "snapshot", compressor=compressor) == 1
+    assert recompress(db_engine, "market_snapshot", "snapshot", compressor=compressor) == 0
+    assert all(raw[:1] == PLAIN for raw in _stored(db_engine))
+
+
+def test_compressed_row_without_zstandard(monkeypatch):
+    monkeypatch.setattr(types, "zstd", None)
+    with pytest.raises(RuntimeError, match="zstandard"):
+        JSONCompressor(enabled=True).decode(ZSTD + b"\x28\xb5\x2f\xfd")
+    assert JSONCompressor(enabled=True).enabled is False
+
+
+def test_zstd_with_trained_dictionary(monkeypatch, db_engine):
+    pytest.importorskip("zstandard")
+    compressor = JSONCompressor(enabled=True, level=3)
+    monkeypatch.setattr(types, "codec", compressor)
+    rows = [
+        {
+            "source": "polymarket",
+            "snapshot": {**PAYLOAD, "id": i, "prices": [i / 1000, 1 - i / 1000]},
+        }
+        for i in range(500)
+    ]
+    with db_engine.begin() as conn:
+        conn.execute(insert(MarketSnapshot.__table__), rows)
+    assert all(raw[:1] == ZSTD for raw in _stored(db_engine))
+
+    with db_engine.begin() as conn:
+        dict_id = train_dictionary(
+            conn, "market_snapshot", "snapshot", dict_size=4096, compressor=compressor
+        )
+    assert compressor.active_dict_id == dict_id
+    assert recompress(db_engine, "market_snapshot", "snapshot", compressor=compressor) == len(rows)
+    assert _snapshots(db_engine) == [r["snapshot"] for r in rows]
+
+    # A fresh process must load the dictionary before it can read the rows
+    fresh = JSONCompressor(enabled=True)
+    with pytest.raises(RuntimeError, match=str(dict_id)):
+        fresh.decode(_stored(db_engine)[0])
+    with db_engine.connect() as conn:
+        assert load_dictionaries(conn, fresh) == 1
+    assert fresh.decode(_stored(db_engine)[0]) == rows[0]["snapshot"]
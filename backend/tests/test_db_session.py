@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import create_engine, func, select, text
+
+from app.db import session as session_mod
+from app.db.base import Base
+from app.db.models import OddsLog
+from app.db.writer import BulkInsertWriter
+from app.db.session import async_database_url
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite:///../data/dev.db", "sqlite+aiosqlite:///../data/dev.db"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql://u:p@h/db", "postgresql+asyncpg://u:***@h/db"),
+        ("postgresql+psycopg://u:p@h/db", "postgresql+asyncpg://u:***@h/db"),
+        ("postgres://u:p@h/db", "postgresql+asyncpg://u:***@h/db"),
+        ("sqlite+aiosqlite:///x.db", "sqlite+aiosqlite:///x.db"),
+    ],
+)
+def test_async_database_url(url, expected):
+    assert str(async_database_url(url)) == expected
+
+
+def test_sqlite_file_engine_uses_wal(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+    session_mod._enable_sqlite_wal(eng)
+    with eng.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar_one() == "wal"
+
+
+@pytest.mark.asyncio
+async def test_bulk_writer_on_async_engine(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    eng = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'w.db'}")
+    async with eng.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    w = BulkInsertWriter(OddsLog.__table__, engine=eng, batch_size=2)
+    w.enqueue(
+        {"sport": "nba", "event_id": f"e{i}", "bookmaker": "dk", "market_type": "h2h", "side": "A"}
+        for i in range(3)
+    )
+    assert await w.flush() == 3
+    async with eng.connect() as conn:
+        count = (
+            await conn.execute(select(func.count()).select_from(OddsLog.__table__))
+        ).scalar_one()
+    assert count == 3
+    await eng.dispose()
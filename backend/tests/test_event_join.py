@@ -0,0 +1,173 @@
+import pytest
+
+from app.schemas.odds_api import BookLine, EventLines
+from app.schemas.polymarket import PMEvent, PMMarket, PMOutcome
+from app.services import odds_api as odds_mod
+from app.services import opportunities as opp_mod
+from app.services.book_lines import SportLines
+from app.services.event_join import EventJoinIndex
+from app.services.opportunities import OpportunityEngine
+
+
+def _ev(eid, title, sport="basketball_nba", commence=None):
+    return EventLines(sport=sport, event_id=eid, title=title, lines=[], commence_time=commence)
+
+
+def test_exact_key_match():
+    idx = EventJoinIndex([_ev("a", "Team A vs Team B")])
+    m = idx.match("basketball_nba", "Team A vs. Team B")
+    assert m is not None and m.event.event_id == "a" and m.method == "exact"
+
+
+def test_team_pair_ignores_order_and_aliases():
+    idx = EventJoinIndex([_ev("a", "Boston Celtics vs Los Angeles Lakers")])
+    m = idx.match("basketball_nba", "Lakers @ Celtics")
+    assert m is not None and m.event.event_id == "a" and m.method == "teams"
+    assert idx.match("icehockey_nhl", "Lakers @ Celtics") is None
+
+
+def test_team_pair_uses_commence_date_to_disambiguate():
+    idx = EventJoinIndex(
+        [
+            _ev("g1", "Team A vs Team B", commence="2024-03-01T00:00:00Z"),
+            _ev("g2", "Team B vs Team A", commence="2024-03-05T00:00:00Z"),
+        ]
+    )
+    m = idx.match("basketball_nba", "Team B vs Team A", "2024-03-04T23:30:00+00:00")
+    assert m is not None and m.event.event_id == "g2"
+    assert idx.match("basketball_nba", "Team B vs Team A", "2024-04-20T00:00:00Z") is None
+    # Ambiguous without a date
+    assert idx.match("basketball_nba", "A Team - B Team") is None
+
+
+def test_similarity_fallback_with_threshold():
+    idx = EventJoinIndex([_ev("a", "Real Madrid vs Manchester City", sport="soccer_uefa")])
+    m = idx.match("soccer_uefa", "Manchester City Real Madrid Champions League")
+    assert m is not None and m.method == "similarity" and m.score >= 0.6
+    assert idx.match("soccer_uefa", "Real Betis vs Sevilla") is None
+    assert idx.match(None, "Real Madrid vs Manchester City") is None
+
+
+class PMReordered:
+    async def fetch_event_records(self):
+        return [
+            PMEvent(
+                event_id="e1",
+                title="Lakers vs. Celtics",
+                sport="basketball_nba",
+                markets=[
+                    PMMarket(
+                        market_id="m1",
+                        question="Will the Lakers win?",
+                        outcomes=[
+                            PMOutcome(name="Yes", price=0.30),
+                            PMOutcome(name="No", price=0.70),
+                        ],
+                    )
+                ],
+            )
+        ]
+
+    async def close(self):
+        return None
+
+
+class OddsReordered:
+    async def fetch_sport_table(self, sport):
+        return SportLines.from_event_lines(
+            [
+                EventLines(
+                    sport=sport,
+                    event_id="sb1",
+                    title="Boston Celtics vs Los Angeles Lakers",
+                    lines=[
+                        BookLine(
+                            bookmaker="bk",
+                            market="h2h",
+                            side="Boston Celtics",
+                            fair_probability=0.6,
+                        ),
+                        BookLine(
+                            bookmaker="bk",
+                            market="h2h",
+                            side="Los Angeles Lakers",
+                            fair_probability=0.4,
+                        ),
+                    ],
+                )
+            ]
+        )
+
+    async def close(self):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_engine_joins_reworded_titles(monkeypatch):
+    monkeypatch.setattr(opp_mod, "PolymarketService", lambda *a, **k: PMReordered())
+    monkeypatch.setattr(opp_mod, "OddsAPIService", lambda *a, **k: OddsReordered())
+    monkeypatch.setattr(odds_mod.settings, "odds_api_key", "k")
+    opps = await OpportunityEngine().fetch_opportunities()
+    assert opps[0].comparison_basis == "sportsbook_fair"
+    assert opps[0].source_attribution == {"odds_api_event_id": "sb1", "join_method": "teams"}
+
+
+def _game(eid, commence, fair_a):
+    return EventLines(
+        sport="basketball_nba",
+        event_id=eid,
+        title="Team A vs Team B",
+        commence_time=commence,
+        lines=[
+            BookLine(bookmaker="bk", market="h2h", side="Team A", fair_probability=fair_a),
+            BookLine(bookmaker="bk", market="h2h", side="Team B", fair_probability=1 - fair_a),
+        ],
+    )
+
+
+class PMTwoGames:
+    async def fetch_event_records(self):
+        return [
+            PMEvent(
+                event_id=f"e{i}",
+                title="Team A vs Team B",
+                sport="basketball_nba",
+                start_time=start,
+                markets=[
+                    PMMarket(
+                        market_id=f"m{i}",
+                        question="Will Team A win?",
+                        outcomes=[
+                            PMOutcome(name="Yes", price=0.5),
+                            PMOutcome(name="No", price=0.5),
+                        ],
+                    )
+                ],
+            )
+            for i, start in ((1, "2026-10-20T23:00:00Z"), (2, "2026-10-24T23:00:00Z"))
+        ]
+
+    async def close(self):
+        return None
+
+
+class OddsTwoGames:
+    async def fetch_sport_table(self, sport):
+        return SportLines.from_event_lines(
+            [_game("g1", "2026-10-20T23:00:00Z", 0.7), _game("g2", "2026-10-24T23:00:00Z", 0.2)]
+        )
+
+    async def close(self):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_same_matchup_games_keep_their_own_fair_probs(monkeypatch):
+    monkeypatch.setattr(opp_mod, "PolymarketService", lambda *a, **k: PMTwoGames())
+    monkeypatch.setattr(opp_mod, "OddsAPIService", lambda *a, **k: OddsTwoGames())
+    monkeypatch.setattr(odds_mod.settings, "odds_api_key", "k")
+    opps = {o.market_id: o for o in await OpportunityEngine().fetch_opportunities()}
+    assert opps["m1"].source_attribution["odds_api_event_id"] == "g1"
+    assert sorted(opps["m1"].inputs["sb_fair_probs"].values()) == pytest.approx([0.3, 0.7])
+    assert opps["m2"].source_attribution["odds_api_event_id"] == "g2"
+    assert sorted(opps["m2"].inputs["sb_fair_probs"].values()) == pytest.approx([0.2, 0.8])
@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+from app.db.models import MarketSnapshot, OddsLog
+from app.db.writer import BulkInsertWriter
+from app.schemas.odds_api import BookLine, EventLines
+from app.schemas.opportunity import Opportunity
+from app.schemas.polymarket import PMEvent, PMMarket, PMOutcome
+from app.services.book_lines import SportLines
+from app.services.history import HistoryRecorder
+from app.services.refresher import OpportunityRefresher
+
+
+def _count(eng, model) -> int:
+    with eng.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model.__table__)).scalar_one()
+
+
+def _row(i: int):
+    return {
+        "created_at": datetime.now(timezone.utc),
+        "sport": "nba",
+        "event_id": f"e{i}",
+        "bookmaker": "dk",
+        "market_type": "h2h",
+        "side": "A",
+    }
+
+
+@pytest.mark.asyncio
+async def test_bulk_writer_flushes_in_batches(db_engine):
+    w = BulkInsertWriter(OddsLog.__table__, engine=db_engine, batch_size=3, flush_interval=60)
+    w.enqueue(_row(i) for i in range(7))
+    assert w.pending == 7
+    assert await w.flush() == 7
+    assert w.pending == 0 and w.written == 7
+    assert _count(db_engine, OddsLog) == 7
+
+
+@pytest.mark.asyncio
+async def test_bulk_writer_sheds_oldest_when_full(db_engine):
+    w = BulkInsertWriter(OddsLog.__table__, engine=db_engine, batch_size=2, max_pending=4)
+    w.enqueue(_row(i) for i in range(6))
+    assert w.pending == 4 and w.dropped == 2
+    await w.stop()
+    with db_engine.connect() as conn:
+        ids = conn.execute(select(OddsLog.event_id).order_by(OddsLog.id)).scalars().all()
+    assert ids == ["e2", "e3", "e4", "e5"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_writer_keeps_rows_when_insert_fails():
+    eng = create_engine("sqlite://", poolclass=StaticPool)  # no tables
+    w = BulkInsertWriter(OddsLog.__table__, engine=eng, batch_size=10)
+    w.enqueue([_row(1)])
+    with pytest.raises(Exception):
+        await w.flush()
+    assert w.pending == 1
+
+
+class RecordingEngine:
+    def __init__(self) -> None:
+        self.last_events = [
+            PMEvent(
+                event_id="ev1",
+                sport="basketball_nba",
+                title="A vs B",
+                markets=[
+                    PMMarket(
+                        market_id="m1",
+                        question="Will A win?",
+                        outcomes=[
+                            PMOutcome(name="Yes", price=0.4),
+                            PMOutcome(name="No", price=0.6),
+                        ],
+                    )
+                ],
+            )
+        ]
+        self.last_sport_lines = [
+            SportLines.from_event_lines(
+                [
+                    EventLines(
+                        sport="basketball_nba",
+                        event_id="sb1",
+                        title="A vs B",
+                        lines=[
+                            BookLine(
+                                bookmaker="dk",
+                                market="h2h",
+                                side="A",
+                                american_odds=150,
+                                fair_probability=0.39,
+                            ),
+                            BookLine(
+                                bookmaker="dk",
+                                market="h2h",
+                                side="B",
+                                american_odds=-170,
+                                fair_probability=0.61,
+                            ),
+                        ],
+                    )
+                ]
+            )
+        ]
+
+    async def fetch_opportunities(self, include_non_sports: bool = False):
+        return [Opportunity(id="polymarket:m1", source="polymarket", title="A vs B")]
+
+
+@pytest.mark.asyncio
+async def test_recorder_persists_each_refresh(db_engine):
+    recorder = HistoryRecorder(
+        engine=db_engine, batch_size=100, flush_interval=60, keyframe_seconds=0
+    )
+    r = OpportunityRefresher(interval_seconds=60, engine_factory=RecordingEngine)
+    r.add_listener(recorder.record)
+    snap = await r.refresh_once()
+    await r.refresh_once()
+    await recorder.stop()
+
+    assert _count(db_engine, MarketSnapshot) == 2
+    assert _count(db_engine, OddsLog) == 4
+    with db_engine.connect() as conn:
+        row = conn.execute(select(MarketSnapshot).order_by(MarketSnapshot.id)).first()
+    assert row.market == "m1" and row.source == "polymarket" and row.price == 0.4
+    assert row.snapshot["outcomes"] == {"Yes": 0.4, "No": 0.6}
+    assert row.captured_at.replace(tzinfo=timezone.utc) == snap.as_of
+
+
+@pytest.mark.asyncio
+async def test_recorder_skips_unchanged_rows_until_keyframe(db_engine):
+    recorder = HistoryRecorder(
+        engine=db_engine, batch_size=100, flush_interval=60, keyframe_seconds=600
+    )
+    source = RecordingEngine()
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    class Snap:
+        def __init__(self, minutes: int) -> None:
+            self.as_of = t0 + timedelta(minutes=minutes)
+
+    recorder.record(source, Snap(0))
+    recorder.record(source, Snap(1))  # identical content: skipped
+    source.last_events[0].markets[0].outcomes[0].price = 0.45
+    recorder.record(source, Snap(2))  # price moved: market written, lines skipped
+    recorder.record(source, Snap(12))  # keyframe: everything rewritten
+    await recorder.stop()
+
+    with db_engine.connect() as conn:
+        prices = (
+            conn.execute(select(MarketSnapshot.price).order_by(MarketSnapshot.id)).scalars().all()
+        )
+        hashes = conn.execute(select(MarketSnapshot.content_hash)).scalars().all()
+    assert prices == [0.4, 0.45, 0.45]
+    assert len(hashes[0]) == 32 and hashes[0] != hashes[1] and hashes[1] == hashes[2]
+    assert _count(db_engine, OddsLog) == 4
+    assert recorder.market_changes.skipped == 1 and recorder.line_changes.skipped == 4
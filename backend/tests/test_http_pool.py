@@ -0,0 +1,45 @@
+import pytest
+
+from app.services import _http as http_mod
+from app.services.polymarket import PolymarketService
+
+
+@pytest.mark.asyncio
+async def test_services_borrow_shared_client_when_pool_open():
+    pool = http_mod.open_http_pool(http2=False)
+    try:
+        a = PolymarketService(base_url="https://mock")
+        b = PolymarketService(base_url="https://mock/")
+        assert a._client is b._client
+        await a.close()
+        # Borrowed clients survive service close; only the pool closes them
+        assert not b._client.is_closed
+    finally:
+        await http_mod.close_http_pool()
+    assert pool._clients == {}
+    assert a._client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_services_own_private_client_without_pool():
+    assert http_mod.get_http_pool() is None
+    svc = PolymarketService(base_url="https://mock")
+    await svc.close()
+    assert svc._client.is_closed
+
+
+def test_host_limits_override():
+    pool = http_mod.HTTPClientPool(
+        max_connections=20,
+        max_keepalive_connections=10,
+        host_limits=http_mod._parse_host_limits("api.example.com=4, bad, x=y"),
+    )
+    limits = pool._limits_for("https://api.example.com/v4")
+    assert limits.max_connections == 4
+    assert limits.max_keepalive_connections == 4
+    assert pool._limits_for("https://other.example.com").max_connections == 20
+
+
+def test_explicit_zero_keepalive_is_kept():
+    pool = http_mod.HTTPClientPool(max_connections=20, max_keepalive_connections=0)
+    assert pool._limits_for("https://api.example.com").max_keepalive_connections == 0
@@ -0,0 +1,53 @@
+import json
+import random
+
+import pytest
+
+from app.utils.json_stream import JSONArrayItemDecoder
+
+
+def _decode_in_chunks(text: str, sizes):
+    dec = JSONArrayItemDecoder()
+    items = []
+    pos = 0
+    for n in sizes:
+        items.extend(dec.feed(text[pos : pos + n]))
+        pos += n
+    items.extend(dec.feed(text[pos:]))
+    doc = dec.close()
+    return items, doc
+
+
+def test_array_items_decoded_across_arbitrary_chunk_boundaries():
+    payload = [
+        {"id": "m1", "question": 'Will "A" win?', "outcomes": [{"name": "Yes", "price": 0.6}]},
+        12345,
+        "str, with ] chars",
+        [1, [2, 3]],
+        None,
+        True,
+        -0.5e-3,
+    ]
+    text = json.dumps(payload, indent=1)
+    rng = random.Random(7)
+    for _ in range(20):
+        sizes = [rng.randint(1, 9) for _ in range(len(text) // 3)]
+        items, doc = _decode_in_chunks(text, sizes)
+        assert items == payload and doc is None
+    items, doc = _decode_in_chunks(text, [1] * len(text))
+    assert items == payload
+
+
+def test_empty_array_and_object_fallback():
+    assert _decode_in_chunks(" [ ] ", [2]) == ([], None)
+    items, doc = _decode_in_chunks('{"markets": [{"id": "m1"}]}', [3, 5])
+    assert items == [] and doc == {"markets": [{"id": "m1"}]}
+
+
+def test_truncated_or_malformed_arrays_raise():
+    with pytest.raises(ValueError):
+        _decode_in_chunks('[{"id": 1}, {"id"', [4])
+    with pytest.raises(ValueError):
+        _decode_in_chunks("[1 2]", [10])
+    with pytest.raises(ValueError):
+        _decode_in_chunks("", [])
@@ -0,0 +1,73 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services import _metrics
+from app.services._http import http_get_with_retry
+from app.services._metrics import Histogram, reset_metrics, span
+
+
+@pytest.fixture(autouse=True)
+def _clean_metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("t_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 3.0):
+        h.observe(v, "a")
+    text = "\n".join(h.render())
+    assert "# TYPE t_seconds histogram" in text
+    assert 't_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 't_seconds_bucket{stage="a",le="1"} 3' in text
+    assert 't_seconds_bucket{stage="a",le="+Inf"} 4' in text
+    assert 't_seconds_count{stage="a"} 4' in text
+    assert h.sum("a") == pytest.approx(4.05)
+
+
+def test_span_records_stage_and_respects_switch(monkeypatch):
+    with span("unit"):
+        pass
+    assert _metrics.STAGE_SECONDS.count("unit") == 1
+
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    with span("unit"):
+        pass
+    assert _metrics.STAGE_SECONDS.count("unit") == 1
+
+
+@pytest.mark.asyncio
+async def test_http_retry_records_latency_and_retries():
+    calls = {"n": 0}
+
+    def handler(request):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise httpx.ConnectError("boom")
+        if calls["n"] == 2:
+            return httpx.Response(503)
+        return httpx.Response(200, json={})
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport, base_url="https://up.example") as client:
+        resp = await http_get_with_retry(client, "/x", retries=3, backoff_base=0.0)
+    assert resp.status_code == 200
+    assert _metrics.UPSTREAM_SECONDS.count("up.example", "error") == 1
+    assert _metrics.UPSTREAM_SECONDS.count("up.example", "5xx") == 1
+    assert _metrics.UPSTREAM_SECONDS.count("up.example", "2xx") == 1
+    assert _metrics.UPSTREAM_RETRIES.value("up.example", "ConnectError") == 1
+    assert _metrics.UPSTREAM_RETRIES.value("up.example", "503") == 1
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    with span("engine.evaluate"):
+        pass
+    r = TestClient(app).get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'pipeline_stage_seconds_count{stage="engine.evaluate"} 1' in r.text
+    assert "# TYPE upstream_retries_total counter" in r.text
@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.utils import odds, odds_batch
+
+
+def test_american_conversion_matches_scalar():
+    american = [150, -200, 100, -110, 2500, 0]
+    dec = odds_batch.american_to_decimal(american)
+    for a, d in zip(american[:-1], dec[:-1]):
+        assert d == odds.american_to_decimal(a)
+    assert math.isnan(dec[-1])
+    assert odds_batch.implied_probability_from_american([100])[0] == pytest.approx(0.5)
+    assert np.isnan(odds_batch.implied_probability_from_decimal([1.0, 2.0])).tolist() == [
+        True,
+        False,
+    ]
+
+
+@pytest.mark.parametrize("method", ["multiplicative", "power", "shin"])
+def test_remove_vig_rows_sum_to_one(method):
+    implied = odds_batch.implied_probability_from_american([[-150, 130], [-110, -110], [200, 250]])
+    fair = odds_batch.remove_vig(implied, method)
+    assert fair.shape == (3, 2)
+    assert fair.sum(axis=1) == pytest.approx([1.0, 1.0, 1.0])
+    # Symmetric markets stay symmetric, favourites stay favourites
+    assert fair[1].tolist() == pytest.approx([0.5, 0.5])
+    assert fair[0, 0] > fair[0, 1]
+
+
+def test_remove_vig_three_way_methods_shift_toward_favourite():
+    implied = np.array([0.55, 0.30, 0.22])  # 7% overround
+    mult = odds_batch.remove_vig(implied)
+    power = odds_batch.remove_vig(implied, "power")
+    shin = odds_batch.remove_vig(implied, "shin")
+    assert mult.tolist() == pytest.approx((implied / implied.sum()).tolist())
+    for fair in (power, shin):
+        assert fair.sum() == pytest.approx(1.0)
+        # Favourite-longshot bias: margin is taken more from the longshot
+        assert fair[0] > mult[0] and fair[2] < mult[2]
+
+
+def test_remove_vig_matches_scalar_two_way():
+    p1, p2 = odds.remove_vig_two_outcomes(0.60, 0.50)
+    assert odds_batch.remove_vig([0.60, 0.50]).tolist() == pytest.approx([p1, p2])
+    assert odds_batch.remove_vig(np.empty((0, 2))).shape == (0, 2)
+    with pytest.raises(ValueError):
+        odds_batch.remove_vig([0.5, 0.5], "bogus")  # type: ignore[arg-type]
+
@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import odds_api as odds_mod
+from app.services.book_lines import SportLines
+from app.services.odds_api import OddsAPIError, OddsAPIQuota, OddsAPIService
+from app.services.opportunities import OpportunityEngine
+
+
+class TrackingOddsSvc:
+    def __init__(self, quota=None, remaining_after=None):
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+        self.quota = quota
+        self.remaining_after = remaining_after
+
+    async def fetch_sport_table(self, sport: str):
+        self.calls.append(sport)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if self.quota is not None and self.remaining_after is not None:
+            self.quota.remaining = self.remaining_after
+        if sport == "bad":
+            raise OddsAPIError("boom", status_code=404)
+        return SportLines.from_event_lines([])
+
+
+@pytest.fixture
+def fresh_quota(monkeypatch):
+    q = OddsAPIQuota()
+    monkeypatch.setattr(odds_mod, "quota", q)
+    monkeypatch.setattr(odds_mod.settings, "odds_api_concurrency", 3)
+    monkeypatch.setattr(odds_mod.settings, "odds_api_quota_low", 100)
+    monkeypatch.setattr(odds_mod.settings, "odds_api_quota_floor", 10)
+    return q
+
+
+@pytest.mark.asyncio
+async def test_fanout_is_bounded_and_tolerates_errors(fresh_quota):
+    svc = TrackingOddsSvc()
+    sports = ["a", "b", "bad", "c", "d", "e"]
+    await OpportunityEngine()._fetch_sport_lines(svc, sports)
+    assert sorted(svc.calls) == sorted(sports)
+    assert 1 < svc.peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_fanout_serializes_when_low_and_stops_when_exhausted(fresh_quota):
+    fresh_quota.remaining = 50
+    svc = TrackingOddsSvc()
+    await OpportunityEngine()._fetch_sport_lines(svc, ["a", "b", "c"])
+    assert svc.peak == 1
+
+    fresh_quota.remaining = 500
+    svc = TrackingOddsSvc(quota=fresh_quota, remaining_after=5)
+    await OpportunityEngine()._fetch_sport_lines(svc, ["a", "b", "c", "d", "e", "f"])
+    # The first wave drains the balance; queued sports are skipped
+    assert len(svc.calls) == 3
+
+    svc = TrackingOddsSvc()
+    await OpportunityEngine()._fetch_sport_lines(svc, ["a"])
+    assert svc.calls == []
+
+
+@pytest.mark.asyncio
+async def test_quota_read_from_response_headers(fresh_quota, monkeypatch):
+    async def fake_http(client, path, params=None, **kwargs):  # type: ignore[no-redef]
+        return httpx.Response(
+            200,
+            json=[],
+            headers={
+                "x-requests-remaining": "420",
+                "x-requests-used": "80",
+                "x-requests-last": "3",
+            },
+            request=httpx.Request("GET", "https://mock/sports/basketball_nba/odds"),
+        )
+
+    monkeypatch.setattr(odds_mod, "http_get_with_retry", fake_http)
+    svc = OddsAPIService(base_url="https://mock", api_key="x")
+    try:
+        await svc.fetch_sport_odds("basketball_nba")
+    finally:
+        await svc.close()
+    assert fresh_quota.as_dict() == {"remaining": 420, "used": 80, "last_cost": 3}
+
+
+@pytest.mark.asyncio
+async def test_exhausted_quota_is_probed_again_once_stale(fresh_quota, monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(odds_mod.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(odds_mod.settings, "odds_api_quota_recheck_seconds", 600)
+    fresh_quota.update_from_headers({"x-requests-remaining": "0"})
+
+    class ResetOddsSvc(TrackingOddsSvc):
+        async def fetch_sport_table(self, sport: str):
+            self.calls.append(sport)
+            fresh_quota.update_from_headers({"x-requests-remaining": self.remaining_after})
+            return SportLines.from_event_lines([])
+
+    svc = ResetOddsSvc(remaining_after="0")
+    await OpportunityEngine()._fetch_sport_lines(svc, ["a", "b"])
+    assert svc.calls == []
+
+    # Still at the floor after the recheck interval: one probe, then skip again
+    clock["now"] += 600
+    await OpportunityEngine()._fetch_sport_lines(svc, ["a", "b", "c"])
+    assert svc.calls == ["a"]
+    assert fresh_quota.exhausted
+
+    # Credits were reset upstream: the probe reads the new balance and the rest follow
+    clock["now"] += 600
+    svc = ResetOddsSvc(remaining_after="500")
+    await OpportunityEngine()._fetch_sport_lines(svc, ["a", "b", "c"])
+    assert sorted(svc.calls) == ["a", "b", "c"]
+    assert fresh_quota.remaining == 500 and not fresh_quota.exhausted
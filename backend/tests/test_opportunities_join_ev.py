@@ -4,11 +4,12 @@ from app.services import opportunities as opp_mod
 from app.services.opportunities import OpportunityEngine
 from app.schemas.polymarket import PMEvent, PMMarket, PMOutcome
 from app.schemas.odds_api import EventLines, BookLine
+from app.services.book_lines import SportLines
 from app.services.odds_api import OddsAPIError
 
 
 class PMServiceForJoin:
-    async def fetch_events_with_binary_markets(self):
+    async def fetch_event_records(self):
         return [
             PMEvent(
                 event_id="e1",
@@ -19,7 +20,10 @@ class PMServiceForJoin:
                         market_id="m1",
                         event_id="e1",
                         question="Will Team A win?",
-                        outcomes=[PMOutcome(name="Yes", price=0.50), PMOutcome(name="No", price=0.50)],
+                        outcomes=[
+                            PMOutcome(name="Yes", price=0.50),
+                            PMOutcome(name="No", price=0.50),
+                        ],
                     )
                 ],
             )
@@ -30,21 +34,23 @@ class PMServiceForJoin:
 
 
 class OddsSvcForJoin:
-    async def fetch_sport_odds(self, sport: str):
+    async def fetch_sport_table(self, sport: str):
         # Return one event with H2H fair probs after vig removal
-        return [
-            EventLines(
-                sport=sport,
-                event_id="e-sb-1",
-                title="Team A vs Team B",
-                lines=[
-                    BookLine(bookmaker="bk1", market="h2h", side="Team A", american_odds=150),
-                    BookLine(bookmaker="bk1", market="h2h", side="Team B", american_odds=-170),
-                ],
-                canonical_event_key="basketball_nba:team_a_vs_team_b",
-                selected_bookmaker="bk1|bk1",
-            )
-        ]
+        return SportLines.from_event_lines(
+            [
+                EventLines(
+                    sport=sport,
+                    event_id="e-sb-1",
+                    title="Team A vs Team B",
+                    lines=[
+                        BookLine(bookmaker="bk1", market="h2h", side="Team A", american_odds=150),
+                        BookLine(bookmaker="bk1", market="h2h", side="Team B", american_odds=-170),
+                    ],
+                    canonical_event_key="basketball_nba:team_a_vs_team_b",
+                    selected_bookmaker="bk1|bk1",
+                )
+            ]
+        )
 
     async def close(self):
         return None
@@ -68,7 +74,7 @@ async def test_join_computes_positive_ev(monkeypatch):
 
 
 class OddsSvcError:
-    async def fetch_sport_odds(self, sport: str):
+    async def fetch_sport_table(self, sport: str):
         raise OddsAPIError("boom", status_code=503)
 
     async def close(self):
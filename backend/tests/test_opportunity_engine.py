@@ -5,7 +5,7 @@ from app.schemas.polymarket import PMEvent, PMMarket, PMOutcome
 
 
 class FakePMService:
-    async def fetch_events_with_binary_markets(self):
+    async def fetch_event_records(self):
         return [
             PMEvent(
                 event_id="e1",
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.polymarket import PMEvent, PMMarket, PMOutcome
+from app.services import opportunities as opp_mod
+from app.services.opportunities import OpportunityEngine
+from app.services.refresher import OpportunityRefresher
+
+
+def _event(eid, markets):
+    return PMEvent(
+        event_id=eid,
+        title=f"Event {eid}",
+        sport="basketball_nba",
+        markets=[
+            PMMarket(
+                market_id=mid,
+                event_id=eid,
+                question=f"Q {mid}",
+                outcomes=[PMOutcome(name="Yes", price=p), PMOutcome(name="No", price=1 - p)],
+            )
+            for mid, p in markets
+        ],
+    )
+
+
+class ScriptedPM:
+    rounds = []
+
+    async def fetch_event_records(self):
+        return ScriptedPM.rounds.pop(0)
+
+    async def close(self):
+        return None
+
+
+@pytest.fixture
+def scripted(monkeypatch):
+    monkeypatch.setattr(opp_mod, "PolymarketService", lambda *a, **k: ScriptedPM())
+    built = []
+    original = OpportunityEngine._build_opportunity
+
+    def spy(self, opp_id, *args, **kwargs):
+        built.append(opp_id)
+        return original(self, opp_id, *args, **kwargs)
+
+    monkeypatch.setattr(OpportunityEngine, "_build_opportunity", spy)
+    return built
+
+
+@pytest.mark.asyncio
+async def test_only_changed_markets_are_rebuilt(scripted):
+    ScriptedPM.rounds = [
+        [_event("e1", [("m1", 0.4), ("m2", 0.5)]), _event("e2", [("m3", 0.6)])],
+        [_event("e1", [("m1", 0.4), ("m2", 0.55)]), _event("e2", [("m4", 0.3)])],
+    ]
+    eng = OpportunityEngine()
+    first = await eng.fetch_opportunities()
+    assert sorted(scripted) == ["polymarket:m1", "polymarket:m2", "polymarket:m3"]
+    assert len(eng.last_delta.added) == 3
+
+    scripted.clear()
+    second = await eng.fetch_opportunities()
+    assert sorted(scripted) == ["polymarket:m2", "polymarket:m4"]
+    delta = eng.last_delta
+    assert [o.id for o in delta.updated] == ["polymarket:m2"]
+    assert [o.id for o in delta.added] == ["polymarket:m4"]
+    assert delta.removed == ["polymarket:m3"]
+    assert delta.unchanged == 1
+
+    # Reused results are fresh copies, not the previous cycle's objects
+    m1_before = next(o for o in first if o.id == "polymarket:m1")
+    m1_after = next(o for o in second if o.id == "polymarket:m1")
+    assert m1_after is not m1_before
+    assert m1_after.model_dump(exclude={"updated_at"}) == m1_before.model_dump(
+        exclude={"updated_at"}
+    )
+
+
+def test_changes_feed_route(scripted, monkeypatch):
+    ScriptedPM.rounds = [
+        [_event("e1", [("m1", 0.4)])],
+        [_event("e1", [("m1", 0.45)])],
+        [_event("e1", [("m1", 0.45)])],
+    ]
+    r = OpportunityRefresher(interval_seconds=60)
+    for _ in range(3):
+        asyncio.run(r.refresh_once())
+    monkeypatch.setattr(app.state, "refresher", r)
+    client = TestClient(app)
+
+    body = client.get("/api/opportunities/changes?since=1").json()
+    assert body["version"] == 3 and body["reset"] is False
+    assert [c["version"] for c in body["changes"]] == [2]
+    assert body["changes"][0]["updated"][0]["yes_probability"] == pytest.approx(0.45)
+
+    assert client.get("/api/opportunities/changes?since=3").json()["changes"] == []
+    assert client.get("/api/opportunities/changes").json()["reset"] is False
+
+
+@pytest.mark.asyncio
+async def test_line_move_rebuilds_only_its_own_game(scripted, monkeypatch):
+    from app.schemas.odds_api import BookLine, EventLines
+    from app.services.book_lines import SportLines
+
+    def game(i, fair_a):
+        return EventLines(
+            sport="basketball_nba",
+            event_id=f"g{i}",
+            title="Team A vs Team B",
+            commence_time=f"2026-10-2{i}T23:00:00Z",
+            lines=[
+                BookLine(bookmaker="bk", market="h2h", side="Team A", fair_probability=fair_a),
+                BookLine(bookmaker="bk", market="h2h", side="Team B", fair_probability=1 - fair_a),
+            ],
+        )
+
+    def pm_round():
+        events = []
+        for i in (1, 4):
+            ev = _event(f"e{i}", [(f"m{i}", 0.5)])
+            events.append(
+                ev.model_copy(
+                    update={"title": "Team A vs Team B", "start_time": f"2026-10-2{i}T23:00:00Z"}
+                )
+            )
+        return events
+
+    lines = [[game(1, 0.7), game(4, 0.2)], [game(1, 0.7), game(4, 0.25)]]
+
+    class ScriptedOdds:
+        async def fetch_sport_table(self, sport):
+            return SportLines.from_event_lines(lines.pop(0))
+
+        async def close(self):
+            return None
+
+    monkeypatch.setattr(opp_mod, "OddsAPIService", lambda *a, **k: ScriptedOdds())
+    monkeypatch.setattr(opp_mod.settings, "odds_api_key", "k")
+    ScriptedPM.rounds = [pm_round(), pm_round()]
+    eng = OpportunityEngine()
+    await eng.fetch_opportunities()
+    scripted.clear()
+    opps = {o.market_id: o for o in await eng.fetch_opportunities()}
+    # Same canonical key, but only g4's line moved
+    assert scripted == ["polymarket:m4"]
+    assert opps["m1"].source_attribution["odds_api_event_id"] == "g1"
+    assert max(opps["m4"].inputs["sb_fair_probs"].values()) == pytest.approx(0.75)
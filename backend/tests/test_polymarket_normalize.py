@@ -94,3 +94,60 @@ async def test_polymarket_filters_closed_and_past(monkeypatch):
 
     # Should filter out all, leaving no events
     assert len(events) == 0
+
+
+@pytest.mark.asyncio
+async def test_event_records_and_lazy_models(monkeypatch):
+    from app.services.pm_records import PMEventRecord, PMMarketRecord, binary_prices
+
+    markets_payload = [
+        {
+            "id": "m1",
+            "question": "Will Team A win?",
+            "slug": "team-a",
+            "gameStartTime": "2030-01-01 19:00:00+00",
+            "events": [{"id": "e1", "title": "Team A vs Team B", "ticker": "ta-tb"}],
+            "outcomes": [{"name": "Yes", "price": 0.6}, {"name": "No", "price": 0.4}],
+        }
+    ]
+
+    async def fake_get(client, path, params=None, **kwargs):  # type: ignore[no-redef]
+        return httpx.Response(200, json=markets_payload)
+
+    monkeypatch.setattr(pm_mod, "http_get_with_retry", fake_get)
+
+    svc = PolymarketService(base_url="https://mock", fee_cushion=0.0)
+    try:
+        records = await svc.fetch_event_records()
+        models = await svc.fetch_events_with_binary_markets()
+    finally:
+        await svc.close()
+
+    rec = records[0]
+    assert isinstance(rec, PMEventRecord) and isinstance(rec.markets[0], PMMarketRecord)
+    assert not hasattr(rec.markets[0], "__dict__")
+    assert rec.start_time == "2030-01-01T19:00:00+00:00"
+    assert binary_prices(rec.markets[0]) == pytest.approx((0.6, 0.4))
+
+    ev = models[0]
+    assert ev.model_dump() == {
+        "event_id": "e1",
+        "sport": None,
+        "title": "Team A vs Team B",
+        "ticker": "ta-tb",
+        "slug": None,
+        "start_time": "2030-01-01T19:00:00+00:00",
+        "markets": [
+            {
+                "market_id": "m1",
+                "event_id": "e1",
+                "question": "Will Team A win?",
+                "slug": "team-a",
+                "outcomes": [
+                    {"name": "Yes", "price": 0.6},
+                    {"name": "No", "price": rec.markets[0].no_price},
+                ],
+            }
+        ],
+    }
+    assert binary_prices(ev.markets[0]) == binary_prices(rec.markets[0])
@@ -0,0 +1,105 @@
+import httpx
+import pytest
+
+from app.services import polymarket as pm_mod
+from app.services.polymarket import PolymarketService
+
+
+def _paged_handler(total: int, calls: list):
+    async def fake_get(client, path, params=None, **kwargs):  # type: ignore[no-redef]
+        limit = int(params["limit"])
+        offset = int(params.get("offset", 0))
+        calls.append(offset)
+        page = [
+            {"id": f"m{i}", "events": [{"id": f"e{i}"}]}
+            for i in range(offset, min(offset + limit, total))
+        ]
+        return httpx.Response(200, json=page)
+
+    return fake_get
+
+
+@pytest.mark.asyncio
+async def test_concurrent_pagination_collects_beyond_five_pages(monkeypatch):
+    calls: list = []
+    monkeypatch.setattr(pm_mod, "http_get_with_retry", _paged_handler(23, calls))
+    svc = PolymarketService(base_url="https://mock")
+    try:
+        markets = await svc.fetch_markets_paginated(page_limit=2, max_pages=50, concurrency=4)
+    finally:
+        await svc.close()
+    assert [m["id"] for m in markets] == [f"m{i}" for i in range(23)]
+    # Window grows 1, 2, 4, 4 ... and stops after the short page at offset 22
+    assert calls[:3] == [0, 2, 4]
+    assert max(calls) <= 22 + 2 * 3
+
+
+@pytest.mark.asyncio
+async def test_pagination_respects_max_pages_and_dedupes(monkeypatch):
+    calls: list = []
+
+    async def repeating_get(client, path, params=None, **kwargs):  # type: ignore[no-redef]
+        calls.append(params.get("offset"))
+        # API ignoring offset: every page is the same full page
+        return httpx.Response(200, json=[{"id": "a", "events": []}, {"id": "b", "events": []}])
+
+    monkeypatch.setattr(pm_mod, "http_get_with_retry", repeating_get)
+    svc = PolymarketService(base_url="https://mock")
+    try:
+        markets = await svc.fetch_markets_paginated(page_limit=2, max_pages=3, concurrency=8)
+    finally:
+        await svc.close()
+    assert [m["id"] for m in markets] == ["a", "b"]
+    assert len(calls) <= 3
+
+
+@pytest.mark.asyncio
+async def test_errors_past_the_last_page_are_ignored(monkeypatch):
+    calls: list = []
+    ok = _paged_handler(7, calls)
+    failing = {"from": 8}
+    failed: list = []
+
+    async def flaky_get(client, path, params=None, **kwargs):  # type: ignore[no-redef]
+        if int(params.get("offset", 0)) >= failing["from"]:
+            failed.append(int(params["offset"]))
+            raise httpx.ReadTimeout("page timed out")
+        return await ok(client, path, params, **kwargs)
+
+    monkeypatch.setattr(pm_mod, "http_get_with_retry", flaky_get)
+    svc = PolymarketService(base_url="https://mock")
+    try:
+        # Window 1, 2, 4: offsets 8..12 are fetched alongside the short page at 6
+        markets = await svc.fetch_markets_paginated(page_limit=2, max_pages=50, concurrency=4)
+        # A failed page before the end still fails the load
+        failing["from"] = 2
+        with pytest.raises(httpx.ReadTimeout):
+            await svc._load_markets(page_limit=2, max_pages=50, concurrency=4)
+    finally:
+        await svc.close()
+    assert [m["id"] for m in markets] == [f"m{i}" for i in range(7)]
+    assert failed[:3] == [8, 10, 12]
+
+
+@pytest.mark.asyncio
+async def test_markets_are_projected_unless_raw_requested(monkeypatch):
+    market = {
+        "id": "m1",
+        "question": "Q?",
+        "description": "x" * 1000,
+        "clobTokenIds": ["1", "2"],
+        "events": [{"id": "e1", "title": "T", "description": "long", "markets": [{}]}],
+    }
+
+    async def fake_get(client, path, params=None, **kwargs):  # type: ignore[no-redef]
+        return httpx.Response(200, json=[market])
+
+    monkeypatch.setattr(pm_mod, "http_get_with_retry", fake_get)
+    svc = PolymarketService(base_url="https://mock")
+    try:
+        projected = await svc.fetch_markets_paginated()
+        raw = await svc.fetch_markets_paginated(project=False)
+    finally:
+        await svc.close()
+    assert projected == [{"id": "m1", "question": "Q?", "events": [{"id": "e1", "title": "T"}]}]
+    assert raw == [market]
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.db.models import MarketSnapshot
+from app.db.session import get_db
+from app.main import app
+from app.services import price_history
+
+T0 = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def eng(db_engine):
+    # Two captures per minute for 10 minutes, plus another market
+    rows = [
+        {
+            "captured_at": T0 + timedelta(seconds=30 * i),
+            "source": "polymarket",
+            "market": "m1",
+            "price": 0.40 + 0.01 * i,
+            "snapshot": {},
+        }
+        for i in range(20)
+    ]
+    rows.append(
+        {"captured_at": T0, "source": "polymarket", "market": "m2", "price": 0.9, "snapshot": {}}
+    )
+    # Sparse market: two captures three hours apart
+    rows += [
+        {
+            "captured_at": T0 + timedelta(hours=h),
+            "source": "polymarket",
+            "market": "m3",
+            "price": 0.5,
+            "snapshot": {},
+        }
+        for h in (0, 3)
+    ]
+    with db_engine.begin() as conn:
+        conn.execute(insert(MarketSnapshot.__table__), rows)
+    return db_engine
+
+
+class SyncSession:
+    """Runs statements on a sync engine behind the AsyncSession call shape."""
+
+    def __init__(self, eng) -> None:
+        self.eng = eng
+
+    async def execute(self, stmt):
+        with self.eng.connect() as conn:
+            return _Result(conn.execute(stmt).fetchall())
+
+
+class _Result:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0][0] if self.rows else None
+
+
+def test_ohlc_buckets_in_sql(eng):
+    with eng.connect() as conn:
+        rows = conn.execute(price_history.ohlc_query("m1", "5m")).all()
+    points, cursor = price_history.ohlc_page(rows, "5m", 500)
+    assert cursor is None
+    assert [p["t"] for p in points] == [T0.isoformat(), (T0 + timedelta(minutes=5)).isoformat()]
+    first = points[0]
+    assert first["samples"] == 10
+    assert first["open"] == pytest.approx(0.40) and first["close"] == pytest.approx(0.49)
+    assert first["low"] == pytest.approx(0.40) and first["high"] == pytest.approx(0.49)
+
+
+@pytest.fixture
+def client(eng):
+
+    async def override():
+        yield SyncSession(eng)
+
+    app.dependency_overrides[get_db] = override
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+def test_history_route_pages_buckets(client):
+    r = client.get("/api/history/m1", params={"interval": "1m", "limit": 4})
+    body = r.json()
+    assert r.status_code == 200 and len(body["points"]) == 4
+    assert body["points"][0]["samples"] == 2
+    seen = [p["t"] for p in body["points"]]
+    while body["next_cursor"]:
+        body = client.get(
+            "/api/history/m1", params={"interval": "1m", "limit": 4, "cursor": body["next_cursor"]}
+        ).json()
+        seen += [p["t"] for p in body["points"]]
+    assert seen == [(T0 + timedelta(minutes=i)).isoformat() for i in range(10)]
+
+
+def test_history_route_scans_one_page_window_and_skips_gaps(client):
+    scan_end = price_history.ohlc_scan_end(T0 + timedelta(seconds=90), "1m", 4)
+    assert scan_end == T0 + timedelta(minutes=6)
+    body = client.get("/api/history/m3", params={"interval": "1m", "limit": 4}).json()
+    assert [p["t"] for p in body["points"]] == [T0.isoformat()]
+    assert body["next_cursor"] == str(int((T0 + timedelta(hours=3)).timestamp()))
+    body = client.get(
+        "/api/history/m3", params={"interval": "1m", "limit": 4, "cursor": body["next_cursor"]}
+    ).json()
+    assert [p["t"] for p in body["points"]] == [(T0 + timedelta(hours=3)).isoformat()]
+    assert body["next_cursor"] is None
+    assert client.get("/api/history/nope").json()["points"] == []
+
+
+def test_history_route_raw_keyset(client):
+    body = client.get("/api/history/m1", params={"interval": "raw", "limit": 15}).json()
+    assert len(body["points"]) == 15
+    rest = client.get(
+        "/api/history/m1", params={"interval": "raw", "limit": 15, "cursor": body["next_cursor"]}
+    ).json()
+    assert len(rest["points"]) == 5 and rest["next_cursor"] is None
+    assert rest["points"][0]["price"] == pytest.approx(0.55)
+
+
+def test_history_cursors_round_trip_unencoded(client):
+    # Clients splice next_cursor into the URL as-is; it must survive that
+    for interval, limit in (("1m", 4), ("raw", 7)):
+        url = f"/api/history/m1?interval={interval}&limit={limit}"
+        body = client.get(url).json()
+        seen = [p["t"] for p in body["points"]]
+        while body["next_cursor"]:
+            r = client.get(f"{url}&cursor={body['next_cursor']}")
+            assert r.status_code == 200
+            body = r.json()
+            seen += [p["t"] for p in body["points"]]
+        assert len(seen) == len(set(seen)) == (10 if interval == "1m" else 20)
+
+
+def test_history_route_rejects_bad_cursor(client):
+    r = client.get("/api/history/m1", params={"interval": "raw", "cursor": "nope"})
+    assert r.status_code == 400
+    r = client.get("/api/history/m1", params={"interval": "1m", "cursor": "9" * 30})
+    assert r.status_code == 400
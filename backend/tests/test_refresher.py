@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.opportunity import Opportunity
+from app.services.refresher import OpportunityRefresher
+
+
+class CountingEngine:
+    calls = 0
+
+    async def fetch_opportunities(self, include_non_sports: bool = False):
+        CountingEngine.calls += 1
+        return [
+            Opportunity(id="polymarket:s", source="polymarket", title="S", sport="basketball_nba"),
+            Opportunity(id="polymarket:n", source="polymarket", title="N", sport=None),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_refresh_once_publishes_snapshot():
+    r = OpportunityRefresher(interval_seconds=60, engine_factory=CountingEngine)
+    assert r.snapshot is None
+    snap = await r.refresh_once()
+    assert r.snapshot is snap and snap.version == 1
+    assert [o.id for o in snap.select()] == ["polymarket:s"]
+    assert len(snap.select(include_non_sports=True)) == 2
+
+    snap2 = await r.refresh_once()
+    assert snap2.version == 2 and r.snapshot is snap2
+
+
+@pytest.mark.asyncio
+async def test_background_loop_start_stop():
+    r = OpportunityRefresher(interval_seconds=60, engine_factory=CountingEngine)
+    r.start()
+    assert r.running
+    snap = await r.wait_ready(timeout=1.0)
+    assert snap is not None
+    await r.stop()
+    assert not r.running
+
+
+def test_routes_serve_snapshot_without_engine(monkeypatch):
+    r = OpportunityRefresher(interval_seconds=60, engine_factory=CountingEngine)
+    asyncio.run(r.refresh_once())
+    CountingEngine.calls = 0
+    monkeypatch.setattr(app.state, "refresher", r)
+
+    client = TestClient(app)
+    data = client.get("/api/opportunities").json()
+    assert [o["id"] for o in data] == ["polymarket:s"]
+    meta = client.get("/api/opportunities/meta").json()
+    assert len(meta["items"]) == 1
+    dbg = client.get("/api/debug/opportunity/polymarket:n")
+    assert dbg.status_code == 200
+    assert CountingEngine.calls == 0
+    # Shared snapshot items are never mutated by request handling
+    assert all(o.is_stale is None for o in r.snapshot.items)
@@ -0,0 +1,58 @@
+import json
+import pathlib
+import time
+
+import httpx
+import pytest
+
+from app.services import _http as http_mod
+from app.services._replay import ReplayTransport, replay_session
+from app.services.opportunities import OpportunityEngine
+
+SNAP = pathlib.Path(__file__).resolve().parents[2] / "data" / "snapshots"
+
+
+@pytest.mark.asyncio
+async def test_engine_runs_offline_from_snapshots(monkeypatch):
+    monkeypatch.setattr(http_mod.settings, "odds_api_key", None)
+    async with replay_session(SNAP) as transport:
+        assert http_mod.replaying()
+        opps = await OpportunityEngine().fetch_opportunities()
+        served = transport.requests
+    assert not http_mod.replaying()
+    assert [o.id for o in opps] == ["polymarket:m1"]
+    assert opps[0].sport == "basketball_nba"
+    assert opps[0].comparison_basis == "sportsbook_fair"
+    # /sports, one /markets page, one odds call
+    assert served == 3
+
+
+@pytest.mark.asyncio
+async def test_pagination_latency_and_missing_routes(tmp_path):
+    (tmp_path / "pm_markets.json").write_text(json.dumps([{"id": str(i)} for i in range(5)]))
+    (tmp_path / "sb_odds_icehockey_nhl.json").write_text("[1]")
+    transport = ReplayTransport(tmp_path, speed=2.0, latency_ms=100)
+    async with httpx.AsyncClient(base_url="https://gamma.example", transport=transport) as c:
+        page = await c.get("/markets", params={"limit": 2, "offset": 4})
+        assert page.json() == [{"id": "4"}]
+        assert (await c.get("/markets", params={"limit": 2, "offset": 6})).json() == []
+
+        started = time.perf_counter()
+        odds = await c.get("https://odds.example/v4/sports/icehockey_nhl/odds")
+        assert odds.json() == [1]
+        assert time.perf_counter() - started >= 0.05
+
+        assert (await c.get("https://odds.example/v4/sports/soccer_epl/odds")).status_code == 404
+        assert (await c.get("/unknown")).status_code == 404
+    assert transport.requests == 5
+
+
+@pytest.mark.asyncio
+async def test_replay_session_refuses_open_pool():
+    http_mod.open_http_pool(http2=False)
+    try:
+        with pytest.raises(RuntimeError):
+            async with replay_session(SNAP):
+                pass
+    finally:
+        await http_mod.close_http_pool()
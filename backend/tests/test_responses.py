@@ -0,0 +1,73 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.opportunity import Opportunity
+from app.services.refresher import OpportunityRefresher
+
+client = TestClient(app)
+
+
+def test_default_responses_are_compact():
+    r = client.get("/health")
+    assert r.content == b'{"status":"ok"}'
+    assert r.headers["content-type"].startswith("application/json")
+
+
+def test_pretty_query_param_indents():
+    r = client.get("/health?pretty=true")
+    assert r.content == b'{\n  "status": "ok"\n}'
+    assert int(r.headers["content-length"]) == len(r.content)
+    assert client.get("/health?pretty=0").content == b'{"status":"ok"}'
+
+
+class FixedEngine:
+    async def fetch_opportunities(self, include_non_sports: bool = False):
+        now = datetime.now(timezone.utc)
+        return [
+            Opportunity(
+                id="polymarket:a",
+                source="polymarket",
+                title="A",
+                sport="basketball_nba",
+                updated_at=now.isoformat(),
+                inputs={"pm_price": 0.5},
+            ),
+            Opportunity(
+                id="polymarket:old",
+                source="polymarket",
+                title="Old",
+                sport="basketball_nba",
+                updated_at=(now - timedelta(days=1)).isoformat(),
+            ),
+        ]
+
+
+def test_snapshot_bodies_are_serialized_once_and_match_models(monkeypatch):
+    r = OpportunityRefresher(interval_seconds=60, engine_factory=FixedEngine)
+    snap = asyncio.run(r.refresh_once())
+    monkeypatch.setattr(app.state, "refresher", r)
+
+    first = client.get("/api/opportunities")
+    second = client.get("/api/opportunities")
+    assert first.content == second.content
+    assert len(snap._rendered) == 1
+
+    data = first.json()
+    expected = [o.model_dump(mode="json") for o in snap.items]
+    for row, exp in zip(data, expected):
+        assert {k: v for k, v in row.items() if k != "is_stale"} == {
+            k: v for k, v in exp.items() if k != "is_stale"
+        }
+    assert [row["is_stale"] for row in data] == [False, True]
+
+    meta = client.get("/api/opportunities/meta").json()
+    assert set(meta) == {"as_of", "staleness_seconds", "items"}
+    assert meta["items"] == data
+
+    pretty = client.get("/api/opportunities/meta?pretty=true")
+    assert pretty.content.startswith(b"{\n")
+    assert json.loads(pretty.content)["items"] == data
@@ -0,0 +1,36 @@
+from app.utils.sports_config import (
+    TokenTrie,
+    infer_league_from_fields,
+    infer_team_keys,
+)
+
+
+def test_league_inference_matches_whole_tokens():
+    assert (
+        infer_league_from_fields("Will the Lakers win?", "NBA: Lakers vs Celtics", None)
+        == "basketball_nba"
+    )
+    assert (
+        infer_league_from_fields("", "National Basketball Association finals", None)
+        == "basketball_nba"
+    )
+    assert infer_league_from_fields("", "Politics", "NBA-2024") == "basketball_nba"
+    # Substrings of other words no longer count
+    assert infer_league_from_fields("", "Snbad election", None) is None
+
+
+def test_team_keys_in_league_order():
+    keys = infer_team_keys("basketball_nba", "Will LAL beat BOS?", "LA Lakers at Boston Celtics")
+    assert keys == ["boston_celtics", "los_angeles_lakers"]
+    assert infer_team_keys("basketball_nba", "Lalaland", "Bossy") == []
+    assert infer_team_keys("unknown", "lakers", "") == []
+
+
+def test_token_trie_multi_token_phrases():
+    trie = TokenTrie()
+    trie.add("new york knicks", "nyk")
+    trie.add("new york", "ny")
+    trie.add("knicks", "nyk")
+    assert trie.find_all("The New-York Knicks!") == {"nyk", "ny"}
+    assert trie.find_all("york knicks") == {"nyk"}
+    assert trie.find_all("new jersey") == set()
@@ -0,0 +1,21 @@
+#!/usr/bin/env bash
+# Opportunity pipeline benchmarks.
+#   scripts/bench.sh            compare against the stored baseline; fail on regression
+#   scripts/bench.sh save       record a new baseline (commit benchmarks/.baselines afterwards)
+# BENCH_SCALES=1000,10000,100000 widens the dataset sweep; BENCH_FAIL_PCT sets the threshold.
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")"/.. && pwd)"
+cd "$ROOT_DIR/backend"
+
+STORAGE="benchmarks/.baselines"
+FAIL_PCT="${BENCH_FAIL_PCT:-25}"
+ARGS=(benchmarks --benchmark-only --benchmark-storage="$STORAGE" --benchmark-sort=fullname
+      --benchmark-columns=min,median,mean,stddev,rounds)
+
+if [ "${1:-compare}" = "save" ]; then
+  python -m pytest "${ARGS[@]}" --benchmark-save=baseline
+else
+  # Median is less sensitive to scheduler noise than mean on shared CI runners
+  python -m pytest "${ARGS[@]}" --benchmark-compare --benchmark-compare-fail="median:${FAIL_PCT}%"
+fi